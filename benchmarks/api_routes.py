@@ -0,0 +1,80 @@
+"""
+Throughput benchmark for the Flask API's list endpoints.
+
+Runs the app in-process through Flask's test client (no HTTP server, so the
+numbers are the app's own cost) against DATABASE_URL. For each route it pages
+through --pages pages of --limit rows, once per JSON backend (orjson, or
+Flask's default provider for comparison) and response encoding (identity,
+gzip, zstd), and reports rows/s and the bytes per row that would go on the
+wire.
+
+Usage (from the repository root):
+
+    DATABASE_URL=postgresql://... python -m benchmarks.api_routes --routes orders,lineitem --limit 1000 --pages 20
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tpch_api"))
+
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+
+from app import create_app  # noqa: E402
+from app.compression import available_encodings  # noqa: E402
+from app.serialization import OrjsonProvider  # noqa: E402
+
+ROUTES = ["region", "nation", "part", "supplier", "partsupp", "customer", "orders", "lineitem"]
+
+
+def walk(client, route, limit, pages, encoding, count_rows=False):
+    """Follows X-Next-Cursor from the first page; returns (requests, rows or None, body bytes, seconds)."""
+    headers = {"Accept-Encoding": encoding}
+    url = f"/{route}/?limit={limit}"
+    requests = rows = size = 0
+    start = time.perf_counter()
+    while url and requests < pages:
+        response = client.get(url, headers=headers)
+        if response.status_code != 200:
+            raise RuntimeError(f"GET {url}: {response.status_code} {response.get_data(as_text=True)[:200]}")
+        requests += 1
+        size += len(response.get_data())
+        if count_rows:
+            rows += len(response.get_json())
+        cursor = response.headers.get("X-Next-Cursor")
+        url = cursor and f"/{route}/?limit={limit}&after={cursor}"
+    return requests, rows if count_rows else None, size, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure list endpoint throughput per JSON backend and response encoding.")
+    parser.add_argument("--routes", default=",".join(ROUTES), help="Comma-separated routes.")
+    parser.add_argument("--limit", type=int, default=1000, help="Rows per page.")
+    parser.add_argument("--pages", type=int, default=20, help="Pages per measurement (fewer if the table runs out).")
+    parser.add_argument("--backends", default="orjson,flask", help="JSON backends to compare: orjson, flask.")
+    parser.add_argument("--encodings", default=",".join(["identity", *available_encodings()]), help="Accept-Encoding values to compare.")
+    options = parser.parse_args()
+
+    app = create_app()
+    app.config["PAGE_SIZE_MAX"] = max(app.config["PAGE_SIZE_MAX"], options.limit)
+    # Cached tables (region, nation) would be served from the table cache after the warm-up
+    # pass, measuring neither the query nor the JSON backend
+    app.config["CACHED_TABLES"] = set()
+    client = app.test_client()
+    providers = {"orjson": OrjsonProvider(app), "flask": DefaultJSONProvider(app)}
+
+    print(f"{'route':>9} {'backend':>7} {'encoding':>8} {'pages':>6} {'rows/s':>10} {'req/s':>8} {'bytes/row':>10}")
+    for route in options.routes.split(","):
+        # One untimed pass so every measurement reads warm pages; it also counts the rows they hold
+        _, rows, _, _ = walk(client, route, options.limit, options.pages, "identity", count_rows=True)
+        for backend in options.backends.split(","):
+            app.json = providers[backend]
+            for encoding in options.encodings.split(","):
+                requests, _, size, elapsed = walk(client, route, options.limit, options.pages, encoding)
+                print(f"{route:>9} {backend:>7} {encoding:>8} {requests:>6} {rows / elapsed:>10,.0f} {requests / elapsed:>8.1f} {size / max(rows, 1):>10.1f}")
+    app.json = providers["orjson"]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Load-throughput benchmark for the data generator's loaders.
+
+Generates lineitem rows once, then loads them into a scratch copy of the
+lineitem table with the original executemany INSERT path and with COPY in
+text and binary format at each batch size, truncating in between. Generation
+time is excluded; only the load is timed. Reports rows/second per loader.
+
+Usage (from the repository root, with the schema created):
+
+    DATABASE_URL=postgresql://... python -m benchmarks.bulk_load --rows 200000 --batch-sizes 10000 50000
+"""
+import argparse
+import itertools
+import os
+import time
+
+import psycopg2
+
+from data_generation import bulk_loader, generate_data
+
+TABLE = "bench_lineitem"
+
+
+def make_rows(count):
+    # Faker is slow, so generate a pool of rows once and renumber copies of it
+    pool = list(itertools.islice(generate_data.generate_lineitem_data(0.01), min(count, 20000)))
+    rows = []
+    for i in range(count):
+        row = pool[i % len(pool)]
+        rows.append((row[0], row[1], row[2], i + 1) + row[4:])
+    return rows
+
+
+def reset(conn):
+    with conn.cursor() as cursor:
+        cursor.execute(f"TRUNCATE {TABLE}")
+    conn.commit()
+
+
+def timed(conn, load):
+    reset(conn)
+    start = time.perf_counter()
+    load()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare executemany INSERT and COPY load throughput.")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[10000, 50000])
+    parser.add_argument("--insert-rows", type=int, default=20000,
+                        help="executemany is slow; it loads only this many rows and is scaled to rows/s.")
+    options = parser.parse_args()
+
+    columns = generate_data.TABLE_COLUMNS["lineitem"]
+    rows = make_rows(options.rows)
+    conn = psycopg2.connect(os.environ["DATABASE_URL"])
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(f"CREATE TEMP TABLE {TABLE} (LIKE lineitem INCLUDING ALL)")
+        conn.commit()
+
+        results = []
+        insert_rows = rows[:options.insert_rows]
+        elapsed = timed(conn, lambda: generate_data.insert_data(conn, TABLE, columns, insert_rows))
+        results.append(("executemany", "-", len(insert_rows), elapsed))
+        for copy_format in bulk_loader.COPY_FORMATS:
+            for batch_size in options.batch_sizes:
+                elapsed = timed(conn, lambda: bulk_loader.copy_data(conn, TABLE, columns, iter(rows), copy_format, batch_size))
+                results.append((f"copy {copy_format}", batch_size, len(rows), elapsed))
+    finally:
+        conn.close()
+
+    print(f"\n{'loader':>12} {'batch':>7} {'rows':>9} {'seconds':>9} {'rows/s':>11}")
+    baseline = results[0][2] / results[0][3]
+    for loader, batch_size, count, elapsed in results:
+        rate = count / elapsed
+        print(f"{loader:>12} {batch_size:>7} {count:>9} {elapsed:>9.2f} {rate:>11,.0f}  ({rate / baseline:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Concurrency benchmark for the query_database tool.
+
+Runs the same query from 1, 2, 4, ... simultaneous clients and reports how
+throughput scales. With the blocking executor throughput stays flat as clients
+are added; with the async executor it should grow until the connection pool or
+the database saturates.
+
+Every call carries an always-true filter with its own value, so the result
+cache can't answer the repeated query and each call reaches the database;
+the filter is a bind parameter, so the SQL and its plan stay the same.
+
+Usage (from the repository root):
+
+    # Through a running MCP server, one StreamableHttp session per client
+    python -m benchmarks.mcp_concurrency --target mcp --url http://localhost:8001/mcp/
+
+    # In-process, comparing the blocking and async executors directly
+    DATABASE_URL=postgresql://... python -m benchmarks.mcp_concurrency --target inprocess
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import time
+
+DEFAULT_ARGS = {"table_name": "lineitem", "select_columns": ["*"], "limit": 1000}
+
+_call_numbers = itertools.count(1)
+
+
+def uncached_args(tool_args):
+    """
+    `tool_args` plus a filter no row fails (the table's first column, a
+    non-negative key, >= minus a fresh number), which gives every call its own
+    result cache key.
+    """
+    from mcp_server.database_handlers.query_builder import load_schema
+
+    key_column = next(iter(load_schema()[tool_args["table_name"].lower()]))
+    cache_buster = {"column": key_column, "op": ">=", "value": -next(_call_numbers)}
+    return {**tool_args, "filters": [*(tool_args.get("filters") or []), cache_buster]}
+
+
+async def _mcp_client_loop(url, tool_args, calls):
+    from fastmcp.client import Client
+    from fastmcp.client.transports import StreamableHttpTransport
+
+    latencies = []
+    async with Client(StreamableHttpTransport(url)) as client:
+        for _ in range(calls):
+            arguments = uncached_args(tool_args)
+            start = time.perf_counter()
+            await client.call_tool("query_database", arguments)
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def _inprocess_client_loop(tool_args, calls, use_async):
+    from mcp_server.database_handlers import async_executor, query_executor
+
+    latencies = []
+    for _ in range(calls):
+        arguments = uncached_args(tool_args)
+        start = time.perf_counter()
+        if use_async:
+            await async_executor.execute_query_prompt_async(arguments)
+        else:
+            # What the sync tool used to do: block the event loop for the whole query
+            query_executor.execute_query_prompt(arguments)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def run_level(clients, calls, make_loop):
+    start = time.perf_counter()
+    results = await asyncio.gather(*(make_loop() for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+    latencies = sorted(latency for client_latencies in results for latency in client_latencies)
+    return {
+        "clients": clients,
+        "calls": len(latencies),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_per_s": round(len(latencies) / elapsed, 2),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Measure query_database throughput against simultaneous clients.")
+    parser.add_argument("--target", choices=["mcp", "inprocess"], default="mcp")
+    parser.add_argument("--url", default="http://localhost:8001/mcp/")
+    parser.add_argument("--levels", default="1,2,4,8,16,32", help="Comma-separated client counts.")
+    parser.add_argument("--calls", type=int, default=20, help="Calls per client at each level.")
+    parser.add_argument("--args", default=json.dumps(DEFAULT_ARGS), help="query_database arguments as JSON.")
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    options = parser.parse_args()
+
+    tool_args = json.loads(options.args)
+    levels = [int(level) for level in options.levels.split(",")]
+
+    if options.target == "mcp":
+        modes = {"mcp": lambda: _mcp_client_loop(options.url, tool_args, options.calls)}
+    else:
+        modes = {
+            "blocking": lambda: _inprocess_client_loop(tool_args, options.calls, use_async=False),
+            "async": lambda: _inprocess_client_loop(tool_args, options.calls, use_async=True),
+        }
+
+    report = {"args": tool_args, "results": {}}
+    for mode, make_loop in modes.items():
+        print(f"== {mode} ==")
+        print(f"{'clients':>8} {'calls':>7} {'elapsed_s':>10} {'calls/s':>9} {'p50_ms':>9} {'max_ms':>9}")
+        rows = []
+        for clients in levels:
+            row = await run_level(clients, options.calls, make_loop)
+            rows.append(row)
+            print(f"{row['clients']:>8} {row['calls']:>7} {row['elapsed_s']:>10} {row['throughput_per_s']:>9} {row['p50_ms']:>9} {row['max_ms']:>9}")
+        report["results"][mode] = rows
+
+    if options.output:
+        with open(options.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,292 @@
+"""
+Load test for the MCP server: many concurrent StreamableHttp sessions running
+a weighted mix of query_database calls.
+
+Each session opens its own fastmcp Client (as gradio_app.py does) and calls
+query_database back to back, optionally with a think time, drawing each call
+from the mix with random keys. Every --interval seconds it prints the window's
+throughput, error rate, latency percentiles and the server's RSS (from the
+metrics://process resource); at the end it prints totals per mix entry and
+the server's pool and cache counters, and can write everything as JSON.
+
+Run it before and after a pooling, caching or executor change with the same
+settings and compare the reports. --hot-keys draws keys from a small set, so
+repeated calls can hit the result cache.
+
+Usage (from the repository root, with the MCP server running against a loaded database):
+
+    python -m benchmarks.mcp_load_test --sessions 32 --duration 60 --scale-factor 1 --output load.json
+    python -m benchmarks.mcp_load_test --sessions 8 --mix customer_point=1,lineitem_scan=1 --hot-keys 100
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+
+from data_generation.spec import NATIONS, order_key, table_cardinalities
+
+
+def _key(rng, count, options):
+    return rng.randint(1, min(count, options.hot_keys) if options.hot_keys else count)
+
+
+def _customer_point(rng, cardinalities, options):
+    return {"table_name": "customer", "filters": [{"column": "c_custkey", "op": "=", "value": _key(rng, cardinalities["customer"], options)}]}
+
+
+def _orders_by_customer(rng, cardinalities, options):
+    return {
+        "table_name": "orders",
+        "select_columns": ["o_orderkey", "o_orderstatus", "o_totalprice", "o_orderdate"],
+        "filters": [{"column": "o_custkey", "op": "=", "value": _key(rng, cardinalities["customer"], options)}],
+        "order_by": "o_orderdate DESC",
+        "limit": 20,
+    }
+
+
+def _lineitem_by_order(rng, cardinalities, options):
+    orderkey = order_key(_key(rng, cardinalities["orders"], options) - 1)
+    return {"table_name": "lineitem", "filters": [{"column": "l_orderkey", "op": "=", "value": orderkey}]}
+
+
+def _part_search(rng, cardinalities, options):
+    low = rng.randint(1, 45)
+    return {
+        "table_name": "part",
+        "select_columns": ["p_partkey", "p_name", "p_retailprice"],
+        "filters": [
+            {"column": "p_brand", "op": "=", "value": f"Brand#{rng.randint(1, 5)}{rng.randint(1, 5)}"},
+            {"column": "p_size", "op": "between", "value": [low, low + 5]},
+        ],
+        "limit": 50,
+    }
+
+
+def _customer_orders_join(rng, cardinalities, options):
+    year, month = rng.randint(1992, 1998), rng.randint(1, 7)
+    return {
+        "table_name": "customer",
+        "select_columns": ["c_name", "o_orderkey", "o_totalprice"],
+        "join_tables": ["orders"],
+        "join_conditions": ["customer.c_custkey = orders.o_custkey"],
+        "filters": [
+            {"column": "c_nationkey", "op": "=", "value": rng.randrange(len(NATIONS))},
+            {"column": "o_orderdate", "op": "between", "value": [f"{year}-{month:02d}-01", f"{year}-{month + 1:02d}-01"]},
+        ],
+        "limit": 100,
+    }
+
+
+def _lineitem_scan(rng, cardinalities, options):
+    return {"table_name": "lineitem", "select_columns": ["l_orderkey", "l_partkey", "l_quantity", "l_shipdate"], "limit": 1000}
+
+
+# name: (default weight, function returning query_database arguments)
+DEFAULT_MIX = {
+    "customer_point": (40, _customer_point),
+    "orders_by_customer": (25, _orders_by_customer),
+    "lineitem_by_order": (20, _lineitem_by_order),
+    "part_search": (10, _part_search),
+    "customer_orders_join": (4, _customer_orders_join),
+    "lineitem_scan": (1, _lineitem_scan),
+}
+
+
+def build_mix(options):
+    """[(name, weight, make_arguments)] from the defaults, --mix weights and --mix-file entries."""
+    mix = {name: (weight, make_arguments) for name, (weight, make_arguments) in DEFAULT_MIX.items()}
+    if options.mix_file:
+        # Each entry is {"name": ..., "weight": ..., "args": {query_database arguments}}, used as is
+        with open(options.mix_file) as f:
+            for entry in json.load(f):
+                mix[entry["name"]] = (entry.get("weight", 1), lambda rng, cardinalities, options, args=entry["args"]: dict(args))
+    if options.mix:
+        weights = dict(item.split("=") for item in options.mix.split(","))
+        unknown = set(weights) - set(mix)
+        if unknown:
+            raise ValueError(f"Unknown mix entries: {', '.join(sorted(unknown))}. Known: {', '.join(mix)}.")
+        # Naming some entries runs only those
+        mix = {name: (float(weights[name]), make_arguments) for name, (_, make_arguments) in mix.items() if name in weights}
+    return [(name, weight, make_arguments) for name, (weight, make_arguments) in mix.items() if weight > 0]
+
+
+def mcp_client(url):
+    from fastmcp.client import Client
+    from fastmcp.client.transports import StreamableHttpTransport
+
+    return Client(StreamableHttpTransport(url))
+
+
+def tool_payload(result):
+    # fastmcp returns dict results as structured content; older versions only as JSON text
+    structured = getattr(result, "structured_content", None)
+    if structured:
+        return structured
+    content = result.content if hasattr(result, "content") else result
+    return json.loads(content[0].text)
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))]
+
+
+def summarize(records, seconds):
+    latencies = sorted(latency for _, _, latency, _ in records)
+    errors = sum(1 for *_, error in records if error)
+    return {
+        "calls": len(records),
+        "errors": errors,
+        "error_rate": errors / len(records) if records else 0.0,
+        "throughput_per_s": len(records) / seconds if seconds > 0 else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000 if latencies else None,
+        "p95_ms": percentile(latencies, 0.95) * 1000 if latencies else None,
+        "p99_ms": percentile(latencies, 0.99) * 1000 if latencies else None,
+        "max_ms": latencies[-1] * 1000 if latencies else None,
+    }
+
+
+async def session_loop(session, options, mix, cardinalities, start_at, stop_at, records):
+    """One client session: calls query_database until stop_at, appending (time, name, latency, error) records."""
+    rng = random.Random(f"{options.seed}:{session}")
+    names, weights, makers = zip(*mix)
+    await asyncio.sleep(max(0.0, start_at - time.perf_counter()))
+    async with mcp_client(options.url) as client:
+        while time.perf_counter() < stop_at:
+            index = rng.choices(range(len(names)), weights)[0]
+            arguments = makers[index](rng, cardinalities, options)
+            error = None
+            started = time.perf_counter()
+            try:
+                payload = tool_payload(await client.call_tool("query_database", arguments))
+                if payload.get("status") != "success":
+                    error = payload.get("message") or "error"
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+            finished = time.perf_counter()
+            records.append((finished, names[index], finished - started, error))
+            if options.think_time:
+                await asyncio.sleep(options.think_time / 1000)
+
+
+async def read_metrics(client, uri):
+    contents = await client.read_resource(uri)
+    return json.loads(contents[0].text)
+
+
+async def monitor(options, measure_from, stop_at, records, windows, rss_samples):
+    """Prints a line per --interval and samples the server's RSS from metrics://process."""
+    async with mcp_client(options.url) as client:
+        print(f"{'t_s':>6} {'calls':>7} {'calls/s':>9} {'err%':>6} {'p50_ms':>8} {'p95_ms':>8} {'p99_ms':>8} {'rss_mb':>8}")
+        window_start = time.perf_counter()
+        while window_start < stop_at:
+            # Close a window where the warmup ends, so none mixes warmup and measured calls
+            boundary = min(window_start + options.interval, stop_at)
+            if window_start < measure_from < boundary:
+                boundary = measure_from
+            await asyncio.sleep(max(0.0, boundary - time.perf_counter()))
+            window_end = time.perf_counter()
+            try:
+                rss = (await read_metrics(client, "metrics://process")).get("rss_bytes")
+            except Exception as e:
+                print(f"Could not read metrics://process: {e}")
+                rss = None
+            rss_samples.append({"t_s": round(window_end - measure_from, 1), "rss_bytes": rss})
+            window = summarize([record for record in records if window_start <= record[0] < window_end], window_end - window_start)
+            window["t_s"] = round(window_end - measure_from, 1)
+            window["rss_bytes"] = rss
+            window["warmup"] = window_end <= measure_from
+            windows.append(window)
+            print(f"{window['t_s']:>6} {window['calls']:>7} {window['throughput_per_s']:>9.1f} {window['error_rate'] * 100:>6.2f} "
+                  f"{_ms(window['p50_ms'])} {_ms(window['p95_ms'])} {_ms(window['p99_ms'])} "
+                  f"{rss / 2 ** 20 if rss else 0:>8.1f}" + ("  (warmup)" if window["warmup"] else ""))
+            window_start = window_end
+
+
+def _ms(value):
+    return f"{value:>8.1f}" if value is not None else f"{'-':>8}"
+
+
+async def server_counters(options):
+    try:
+        async with mcp_client(options.url) as client:
+            return {uri: await read_metrics(client, uri) for uri in ("metrics://pool", "metrics://cache", "metrics://process")}
+    except Exception as e:
+        print(f"Could not read the server's metrics resources: {e}")
+        return {}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Load-test the MCP server with concurrent sessions running a mix of query_database calls.")
+    parser.add_argument("--url", default="http://localhost:8001/mcp/")
+    parser.add_argument("--sessions", type=int, default=16, help="Concurrent MCP client sessions.")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds of measured load, after the warmup.")
+    parser.add_argument("--warmup", type=float, default=5, help="Seconds of load before measuring starts.")
+    parser.add_argument("--ramp-up", type=float, default=0, help="Spread session starts over this many seconds.")
+    parser.add_argument("--think-time", type=float, default=0, help="Milliseconds each session waits between calls.")
+    parser.add_argument("--interval", type=float, default=5, help="Seconds per reporting window.")
+    parser.add_argument("--scale-factor", type=float, default=1.0, help="Scale factor of the loaded database, for valid random keys.")
+    parser.add_argument("--hot-keys", type=int, default=0, help="Draw keys from the first N only (0: all keys).")
+    parser.add_argument("--mix", help=f"Comma-separated name=weight; only the named entries run. Entries: {', '.join(DEFAULT_MIX)}.")
+    parser.add_argument("--mix-file", help='JSON list of extra entries: {"name": ..., "weight": ..., "args": {query_database arguments}}.')
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the report as JSON to this file.")
+    options = parser.parse_args()
+
+    mix = build_mix(options)
+    cardinalities = table_cardinalities(options.scale_factor)
+    print(f"{options.sessions} sessions, mix: " + ", ".join(f"{name}={weight:g}" for name, weight, _ in mix))
+
+    before = await server_counters(options)
+    records, windows, rss_samples = [], [], []
+    now = time.perf_counter()
+    measure_from = now + options.warmup
+    stop_at = measure_from + options.duration
+    sessions = [
+        session_loop(session, options, mix, cardinalities, now + options.ramp_up * session / options.sessions, stop_at, records)
+        for session in range(options.sessions)
+    ]
+    results = await asyncio.gather(monitor(options, measure_from, stop_at, records, windows, rss_samples), *sessions, return_exceptions=True)
+    failed_sessions = [result for result in results if isinstance(result, Exception)]
+    for error in failed_sessions[:5]:
+        print(f"Session failed: {type(error).__name__}: {error}")
+    after = await server_counters(options)
+
+    measured = [record for record in records if record[0] >= measure_from]
+    report = {
+        "settings": {name: getattr(options, name) for name in ("url", "sessions", "duration", "warmup", "think_time", "scale_factor", "hot_keys", "seed")},
+        "mix": {name: weight for name, weight, _ in mix},
+        "total": summarize(measured, options.duration),
+        "by_entry": {name: summarize([record for record in measured if record[1] == name], options.duration) for name, _, _ in mix},
+        "errors": dict(Counter(error[:200] for *_, error in measured if error).most_common(10)),
+        "failed_sessions": len(failed_sessions),
+        "windows": windows,
+        "rss": rss_samples,
+        "server_before": before,
+        "server_after": after,
+    }
+
+    print(f"\n{'entry':>22} {'calls':>7} {'calls/s':>9} {'err%':>6} {'p50_ms':>8} {'p95_ms':>8} {'p99_ms':>8} {'max_ms':>8}")
+    for name, row in list(report["by_entry"].items()) + [("total", report["total"])]:
+        print(f"{name:>22} {row['calls']:>7} {row['throughput_per_s']:>9.1f} {row['error_rate'] * 100:>6.2f} "
+              f"{_ms(row['p50_ms'])} {_ms(row['p95_ms'])} {_ms(row['p99_ms'])} {_ms(row['max_ms'])}")
+    for message, count in report["errors"].items():
+        print(f"  {count} x {message}")
+    rss_values = [sample["rss_bytes"] for sample in rss_samples if sample["rss_bytes"]]
+    if rss_values:
+        print(f"Server RSS: {rss_values[0] / 2 ** 20:.1f} MB -> {rss_values[-1] / 2 ** 20:.1f} MB (max {max(rss_values) / 2 ** 20:.1f} MB)")
+    cache = after.get("metrics://cache", {})
+    if cache:
+        print("Result cache: " + ", ".join(f"{name}={value}" for name, value in cache.items() if not isinstance(value, dict)))
+
+    if options.output:
+        with open(options.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,260 @@
+"""
+Replays query_database calls recorded by the MCP server (MCP_RECORD_LOG) and
+diffs latency distributions between runs.
+
+replay re-issues every recorded call against a server, keeping the recorded
+gaps between calls (--speed 1), compressing them (--speed 4 is four times
+faster) or ignoring them (--speed 0, as fast as --sessions allow). Calls that
+continue a streamed result (continuation_token) are skipped, since the tokens
+only meant something to the recording server; each replayed stream is closed
+with close_result_stream as soon as its first page is back. The report has
+every call's client-side latency and how late it started against its
+schedule. Replay against a server that isn't recording to the same log, or
+the replayed calls are appended to it.
+
+diff compares two runs, overall and per query shape (table plus joined
+tables), and exits with status 1 if a p95 or p99 grew by more than
+--threshold, so it can gate a deploy. Either side may be a replay report or
+a recorded log; a log's durations are server-side, a report's client-side,
+so compare like with like.
+
+Usage (from the repository root):
+
+    MCP_RECORD_LOG=calls.jsonl python mcp_server/server.py          # record production traffic
+    python -m benchmarks.mcp_replay replay calls.jsonl --url http://localhost:8001/mcp/ --output before.json
+    python -m benchmarks.mcp_replay replay calls.jsonl --speed 0 --sessions 16 --output after.json
+    python -m benchmarks.mcp_replay diff before.json after.json --threshold 1.10
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import defaultdict
+
+from benchmarks.mcp_load_test import mcp_client, percentile, tool_payload
+
+
+def read_log(path):
+    """The recorded calls, in time order. Lines that don't parse (e.g. a torn last line) are skipped."""
+    calls = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                calls.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    calls.sort(key=lambda call: call["ts"])
+    return calls
+
+
+def shape(tool, arguments):
+    """Groups calls by what they query, e.g. query_database:orders+lineitem."""
+    tables = [arguments.get("table_name") or "?"] + list(arguments.get("join_tables") or [])
+    return f"{tool}:{'+'.join(str(table).lower() for table in tables)}"
+
+
+async def issue(client, call, started_late):
+    started = time.perf_counter()
+    result = {"shape": shape(call["tool"], call["arguments"]), "lag_ms": round(started_late * 1000, 3), "error": None, "rows": None}
+    # The log has the server's filled-in defaults; nulls don't pass the tool's schema, so they're left out
+    arguments = {name: value for name, value in call["arguments"].items() if value is not None}
+    try:
+        payload = tool_payload(await client.call_tool(call["tool"], arguments))
+        if payload.get("status") != "success":
+            result["error"] = payload.get("message") or "error"
+        elif isinstance(payload.get("data"), list):
+            result["rows"] = len(payload["data"])
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+        payload = {}
+    result["latency_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    result["recorded_ms"] = call.get("duration_ms")
+    if payload.get("continuation_token"):
+        # A streamed call holds a server-side cursor until it is drained or closed, and the
+        # server only keeps a few open; the continuations aren't replayed, so close it now
+        try:
+            closed = tool_payload(await client.call_tool("close_result_stream", {"continuation_token": payload["continuation_token"]}))
+            if closed.get("status") != "success":
+                result["error"] = f"close_result_stream: {closed.get('message') or 'error'}"
+        except Exception as e:
+            result["error"] = f"close_result_stream: {type(e).__name__}: {e}"
+    return result
+
+
+async def replay(calls, options):
+    """Issues the calls over --sessions client sessions, on the recorded schedule scaled by --speed."""
+    clients = [mcp_client(options.url) for _ in range(options.sessions)]
+    idle = asyncio.Queue()
+    for client in clients:
+        await client.__aenter__()
+        idle.put_nowait(client)
+    results = [None] * len(calls)
+    first_ts = calls[0]["ts"]
+    start = time.perf_counter()
+
+    async def run(index, call):
+        due = start + (call["ts"] - first_ts) / options.speed if options.speed else start
+        await asyncio.sleep(max(0.0, due - time.perf_counter()))
+        # A call waits for a free session; that wait shows up as lag
+        client = await idle.get()
+        try:
+            results[index] = await issue(client, call, max(0.0, time.perf_counter() - due) if options.speed else 0.0)
+        finally:
+            idle.put_nowait(client)
+        done = sum(1 for result in results if result is not None)
+        if done % options.progress == 0:
+            print(f"  {done}/{len(calls)} calls, {time.perf_counter() - start:.1f}s")
+
+    try:
+        await asyncio.gather(*(run(index, call) for index, call in enumerate(calls)))
+    finally:
+        for client in clients:
+            await client.__aexit__(None, None, None)
+    return results, time.perf_counter() - start
+
+
+def distribution(latencies):
+    latencies = sorted(latencies)
+    if not latencies:
+        return {"calls": 0}
+    return {
+        "calls": len(latencies),
+        "mean_ms": sum(latencies) / len(latencies),
+        "p50_ms": percentile(latencies, 0.50),
+        "p95_ms": percentile(latencies, 0.95),
+        "p99_ms": percentile(latencies, 0.99),
+        "max_ms": latencies[-1],
+    }
+
+
+def distributions(samples):
+    """{"total": ..., shape: ...} latency distributions from (shape, latency_ms) samples."""
+    by_shape = defaultdict(list)
+    for call_shape, latency in samples:
+        by_shape[call_shape].append(latency)
+    result = {"total": distribution([latency for _, latency in samples])}
+    result.update({call_shape: distribution(latencies) for call_shape, latencies in sorted(by_shape.items())})
+    return result
+
+
+def load_samples(path):
+    """
+    (shape, latency_ms) pairs of the successful calls in a replay report
+    (client-side) or a recorded log (server-side), and how many calls failed.
+    """
+    with open(path, encoding="utf-8") as f:
+        head = f.read(1)
+    if head == "{":
+        try:
+            with open(path, encoding="utf-8") as f:
+                report = json.load(f)
+            samples = [(call["shape"], call["latency_ms"]) for call in report["calls"] if not call["error"]]
+            return samples, len(report["calls"]) - len(samples)
+        except (json.JSONDecodeError, KeyError):
+            pass  # A JSONL log also starts with "{"
+    calls = read_log(path)
+    samples = [(shape(call["tool"], call["arguments"]), call["duration_ms"]) for call in calls if call.get("status") == "success"]
+    return samples, len(calls) - len(samples)
+
+
+def command_replay(options):
+    calls = read_log(options.log)
+    skipped = [call for call in calls if call["arguments"].get("continuation_token")]
+    calls = [call for call in calls if not call["arguments"].get("continuation_token")][:options.limit or None]
+    if not calls:
+        print(f"No replayable calls in {options.log}.")
+        return 1
+    span = calls[-1]["ts"] - calls[0]["ts"]
+    pace = f"{options.speed:g}x ({span / options.speed:.1f}s)" if options.speed else "as fast as possible"
+    print(f"Replaying {len(calls)} calls recorded over {span:.1f}s at {pace} on {options.sessions} sessions"
+          + (f"; skipping {len(skipped)} stream continuations" if skipped else ""))
+
+    results, elapsed = asyncio.run(replay(calls, options))
+    errors = [result for result in results if result["error"]]
+    lags = sorted(result["lag_ms"] for result in results)
+    report = {
+        "settings": {"log": options.log, "url": options.url, "speed": options.speed, "sessions": options.sessions},
+        "elapsed_s": elapsed,
+        "throughput_per_s": len(results) / elapsed,
+        "errors": len(errors),
+        "lag_p95_ms": percentile(lags, 0.95),
+        "latency": distributions([(result["shape"], result["latency_ms"]) for result in results if not result["error"]]),
+        "calls": results,
+    }
+    print(f"{len(results)} calls in {elapsed:.1f}s ({report['throughput_per_s']:.1f}/s), {len(errors)} errors, "
+          f"p95 start lag {report['lag_p95_ms']:.1f} ms")
+    print_distributions(report["latency"])
+    for result in errors[:5]:
+        print(f"  {result['shape']}: {result['error']}")
+    if options.output:
+        with open(options.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+def print_distributions(latency):
+    print(f"{'shape':>36} {'calls':>7} {'mean_ms':>9} {'p50_ms':>9} {'p95_ms':>9} {'p99_ms':>9}")
+    for name, row in latency.items():
+        if row["calls"]:
+            print(f"{name:>36} {row['calls']:>7} {row['mean_ms']:>9.1f} {row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f}")
+
+
+def command_diff(options):
+    (base_samples, base_failed), (new_samples, new_failed) = load_samples(options.base), load_samples(options.new)
+    base, new = distributions(base_samples), distributions(new_samples)
+    if base_failed or new_failed:
+        # Failed calls have no comparable latency; a run with many of them is measuring something else
+        print(f"Failed calls left out: {base_failed} in the base run, {new_failed} in the new run.")
+    if not base["total"]["calls"] or not new["total"]["calls"]:
+        print("Nothing to compare: a run has no successful calls.")
+        return 1
+    print(f"{'shape':>36} {'calls':>13} {'p50_ms':>22} {'p95_ms':>22} {'p99_ms':>22}")
+    regressions = []
+    for name in base:
+        if name not in new or not base[name]["calls"] or not new[name]["calls"]:
+            continue
+        cells = []
+        for stat in ("p50_ms", "p95_ms", "p99_ms"):
+            ratio = new[name][stat] / base[name][stat] if base[name][stat] else float("inf")
+            cells.append(f"{base[name][stat]:>7.1f} ->{new[name][stat]:>7.1f} {ratio:>5.2f}x")
+            # Tail percentiles of a handful of calls are noise, so they don't gate
+            if stat != "p50_ms" and ratio > options.threshold and new[name]["calls"] >= options.min_calls:
+                regressions.append(f"{name} {stat} {base[name][stat]:.1f} -> {new[name][stat]:.1f} ms ({ratio:.2f}x)")
+        print(f"{name:>36} {base[name]['calls']:>6}/{new[name]['calls']:<6} " + " ".join(cells))
+    for name in sorted(set(base) ^ set(new)):
+        print(f"{name:>36} only in {'the base' if name in base else 'the new'} run")
+    if regressions:
+        print(f"Regressions over {options.threshold:.2f}x:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    print(f"No p95/p99 regression over {options.threshold:.2f}x.")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded MCP tool calls and diff latency distributions between runs.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    replay_parser = commands.add_parser("replay", help="Re-issue a recorded call log against a server.")
+    replay_parser.add_argument("log", help="JSONL call log written by the server with MCP_RECORD_LOG.")
+    replay_parser.add_argument("--url", default="http://localhost:8001/mcp/")
+    replay_parser.add_argument("--speed", type=float, default=1.0, help="Schedule multiplier: 1 keeps the recorded gaps, 2 halves them, 0 ignores them.")
+    replay_parser.add_argument("--sessions", type=int, default=8, help="Client sessions; calls beyond this many in flight wait for one.")
+    replay_parser.add_argument("--limit", type=int, default=0, help="Replay only the first N calls.")
+    replay_parser.add_argument("--progress", type=int, default=1000, help="Print progress every N calls.")
+    replay_parser.add_argument("--output", help="Write the replay report as JSON to this file.")
+
+    diff_parser = commands.add_parser("diff", help="Compare latency distributions of two replay reports or call logs.")
+    diff_parser.add_argument("base")
+    diff_parser.add_argument("new")
+    diff_parser.add_argument("--threshold", type=float, default=1.10, help="Fail when a p95 or p99 grows by more than this factor.")
+    diff_parser.add_argument("--min-calls", type=int, default=20, help="Ignore shapes with fewer calls than this in the new run.")
+
+    options = parser.parse_args()
+    sys.exit(command_replay(options) if options.command == "replay" else command_diff(options))
+
+
+if __name__ == "__main__":
+    main()
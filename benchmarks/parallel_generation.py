@@ -0,0 +1,68 @@
+"""
+Generation-throughput benchmark for the chunked, seeded data generator.
+
+Generates one table at a scale factor with 1, 2, 4, ... worker processes,
+without touching a database, and reports rows/second and the speedup over a
+single worker. Each run also prints a digest of the generated rows: it must
+be the same for every worker count, since chunk seeds depend only on
+(seed, table, chunk index).
+
+Usage (from the repository root):
+
+    python -m benchmarks.parallel_generation --table lineitem --scale-factor 0.1 --workers 1 2 4 8
+"""
+import argparse
+import hashlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from data_generation import bulk_loader, generate_data
+
+
+def chunk_digest(table_name, scale_factor, chunk_index, start, stop, seed, engine):
+    digest = hashlib.sha256()
+    count = 0
+    for row in generate_data.generate_chunk(table_name, scale_factor, chunk_index, start, stop, seed, engine):
+        digest.update(bulk_loader.encode_text_row(row))
+        count += 1
+    return count, digest.hexdigest()
+
+
+def run(options, workers):
+    chunks = generate_data.table_chunks(options.table, options.scale_factor, options.chunk_size)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(chunk_digest, options.table, options.scale_factor, index, chunk_start, chunk_stop, options.seed, options.engine)
+            for index, chunk_start, chunk_stop in chunks
+        ]
+        results = [future.result() for future in futures]
+    elapsed = time.perf_counter() - start
+    # Combine the chunk digests in chunk order, whichever worker produced them
+    digest = hashlib.sha256("".join(chunk for _, chunk in results).encode("utf-8")).hexdigest()[:16]
+    return sum(count for count, _ in results), elapsed, digest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure how data generation scales with worker processes.")
+    parser.add_argument("--table", choices=list(generate_data.GENERATORS), default="lineitem")
+    parser.add_argument("--scale-factor", type=float, default=0.05)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument("--chunk-size", type=int, default=generate_data.DEFAULT_CHUNK_SIZE // 10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--engine", choices=["numpy", "faker"], default="numpy")
+    options = parser.parse_args()
+
+    print(f"{'workers':>7} {'rows':>10} {'seconds':>9} {'rows/s':>10} {'speedup':>8}  digest")
+    baseline = None
+    for workers in sorted(set(options.workers)):
+        rows, elapsed, digest = run(options, workers)
+        rate = rows / elapsed
+        baseline = baseline or rate
+        print(f"{workers:>7} {rows:>10} {elapsed:>9.2f} {rate:>10,.0f} {rate / baseline:>7.2f}x  {digest}")
+    print(f"({os.cpu_count()} CPUs available)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Planning-time benchmark for prepared statement reuse.
+
+Runs the same query shape many times with different values, once as a fresh
+SQL text with inlined literals per call (what raw where_conditions produce)
+and once through the executor's per-connection prepared statement cache
+(what structured filters produce). Reports the mean planning time PostgreSQL
+reports for each, and the wall-clock time per call.
+
+Usage (from the repository root):
+
+    DATABASE_URL=postgresql://... python -m benchmarks.prepared_statements --iterations 2000
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import time
+
+import psycopg2
+
+from mcp_server.database_handlers import query_builder, query_executor
+
+FILTERS = [
+    {"column": "o_orderdate", "op": ">=", "value": None},
+    {"column": "o_orderstatus", "op": "=", "value": None},
+    {"column": "customer.c_mktsegment", "op": "=", "value": None},
+]
+
+
+def random_filters(rng):
+    filters = [dict(item) for item in FILTERS]
+    filters[0]["value"] = f"199{rng.randint(2, 8)}-{rng.randint(1, 12):02d}-01"
+    filters[1]["value"] = rng.choice("OFP")
+    filters[2]["value"] = rng.choice(["AUTOMOBILE", "BUILDING", "FURNITURE", "MACHINERY", "HOUSEHOLD"])
+    return filters
+
+
+def build(filters):
+    return query_executor.build_query(
+        "orders", ["o_orderkey", "o_totalprice", "c_name"], [], "o_totalprice DESC", 10,
+        ["customer"], ["customer.c_custkey = orders.o_custkey"], filters,
+    )
+
+
+def planning_time(cursor, sql, params):
+    cursor.execute("EXPLAIN (ANALYZE, FORMAT JSON) " + sql, tuple(params))
+    result = cursor.fetchone()[0]
+    if isinstance(result, str):
+        result = json.loads(result)
+    return result[0]["Planning Time"]
+
+
+def run(connection, iterations, prepared, seed):
+    rng = random.Random(seed)
+    planning = []
+    wall = []
+    with connection.cursor() as cursor:
+        for _ in range(iterations):
+            sql, params = build(random_filters(rng))
+            if prepared:
+                sql, params = query_builder.prepare(connection, cursor, sql, params)
+            else:
+                # Inline the values so every call is a brand-new statement text
+                sql, params = cursor.mogrify(sql, tuple(params)).decode(), []
+            planning.append(planning_time(cursor, sql, params))
+            start = time.perf_counter()
+            cursor.execute(sql, tuple(params))
+            cursor.fetchall()
+            wall.append((time.perf_counter() - start) * 1000)
+    return {
+        "mean_planning_ms": round(statistics.mean(planning), 4),
+        "mean_call_ms": round(statistics.mean(wall), 4),
+        "p95_call_ms": round(sorted(wall)[int(len(wall) * 0.95)], 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare planning time of literal SQL and reused prepared statements.")
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=7)
+    options = parser.parse_args()
+
+    connection = psycopg2.connect(os.environ["DATABASE_URL"])
+    connection.autocommit = True
+    try:
+        literal = run(connection, options.iterations, prepared=False, seed=options.seed)
+        prepared = run(connection, options.iterations, prepared=True, seed=options.seed)
+    finally:
+        connection.close()
+
+    print(f"{'mode':>10} {'planning_ms':>12} {'call_ms':>9} {'p95_ms':>9}")
+    for mode, result in (("literal", literal), ("prepared", prepared)):
+        print(f"{mode:>10} {result['mean_planning_ms']:>12} {result['mean_call_ms']:>9} {result['p95_call_ms']:>9}")
+    saved = literal["mean_planning_ms"] - prepared["mean_planning_ms"]
+    print(f"Planning time saved per call: {saved:.4f} ms ({saved * options.iterations:.1f} ms over {options.iterations} calls)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Serialization benchmark for the query_database result formats.
+
+Encodes synthetic lineitem rows (16 columns, the same Python types psycopg2
+returns) in each result_format, serializes the tool response to JSON the way
+the MCP transport does, and reports encode time and payload size. No database
+is needed.
+
+Usage (from the repository root):
+
+    python -m benchmarks.result_encoding --rows 1000,10000,100000
+"""
+import argparse
+import json
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from mcp_server.database_handlers import result_encoding
+
+LINEITEM_COLUMNS = [
+    "l_orderkey", "l_partkey", "l_suppkey", "l_linenumber", "l_quantity", "l_extendedprice", "l_discount", "l_tax",
+    "l_returnflag", "l_linestatus", "l_shipdate", "l_commitdate", "l_receiptdate", "l_shipinstruct", "l_shipmode", "l_comment",
+]
+# int4 x4, numeric x4, bpchar x2, date x3, varchar x3
+LINEITEM_TYPE_CODES = [23, 23, 23, 23, 1700, 1700, 1700, 1700, 1042, 1042, 1082, 1082, 1082, 1043, 1043, 1043]
+
+
+def make_lineitem_rows(count, seed=42):
+    rng = random.Random(seed)
+    start = date(1992, 1, 1)
+    rows = []
+    for i in range(count):
+        ship = start + timedelta(days=rng.randint(0, 2500))
+        rows.append((
+            i // 4 + 1, rng.randint(1, 200000), rng.randint(1, 10000), i % 4 + 1,
+            Decimal(rng.randint(1, 50)), Decimal(rng.randint(90000, 10500000)) / 100,
+            Decimal(rng.randint(0, 10)) / 100, Decimal(rng.randint(0, 8)) / 100,
+            rng.choice("RAN"), rng.choice("OF"),
+            ship, ship + timedelta(days=rng.randint(1, 30)), ship + timedelta(days=rng.randint(1, 60)),
+            rng.choice(["DELIVER IN PERSON", "COLLECT COD", "NONE", "TAKE BACK RETURN"]),
+            rng.choice(["AIR", "RAIL", "TRUCK", "SHIP", "MAIL", "FOB", "REG AIR"]),
+            "carefully final deposits detect slyly agai"[: rng.randint(10, 43)],
+        ))
+    return rows
+
+
+def measure(result_format, rows, repeat):
+    best = None
+    payload = b""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = {
+            "status": "success",
+            **result_encoding.encode_result(LINEITEM_COLUMNS, rows, LINEITEM_TYPE_CODES, result_format),
+            "column_names": LINEITEM_COLUMNS,
+        }
+        # default=str is how Decimal/date end up in the row-dict format today
+        payload = json.dumps(response, default=str).encode("utf-8")
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, len(payload)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare query_database result formats by encode time and payload size.")
+    parser.add_argument("--rows", default="1000,10000,100000", help="Comma-separated row counts.")
+    parser.add_argument("--repeat", type=int, default=3, help="Best-of-N timing.")
+    options = parser.parse_args()
+
+    formats = ["rows", "columnar"]
+    try:
+        import pyarrow  # noqa: F401
+        formats.append("arrow")
+    except ImportError:
+        print("pyarrow not installed; skipping the arrow format.")
+
+    print(f"{'rows':>8} {'format':>9} {'encode_ms':>10} {'bytes':>12} {'vs rows':>8}")
+    for count in [int(value) for value in options.rows.split(",")]:
+        rows = make_lineitem_rows(count)
+        baseline = None
+        for result_format in formats:
+            elapsed, size = measure(result_format, rows, options.repeat)
+            if baseline is None:
+                baseline = size
+            print(f"{count:>8} {result_format:>9} {elapsed * 1000:>10.1f} {size:>12,} {size / baseline:>7.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,378 @@
+"""
+TPC-H power and throughput test driver (spec clause 5.3) with QphH-style metrics.
+
+The power test runs RF1, query stream 0 (the 22 queries in Appendix A's order
+for stream 0) and RF2, one after another. The throughput test runs query
+streams 1..S at the same time, each in its own Appendix A order, next to one
+refresh stream that runs S RF1/RF2 pairs. From the timings:
+
+    Power@Size      = 3600 * SF / (product of the 22 query and 2 refresh times) ** (1/24)
+    Throughput@Size = S * 22 * 3600 / (throughput test seconds) * SF
+    QphH@Size       = sqrt(Power@Size * Throughput@Size)
+
+Queries go straight to PostgreSQL (--target postgres) or through a running MCP
+server's tpch_q1..tpch_q22 tools (--target mcp), which run on the same pooled,
+prepared-statement path as query_database. Refresh functions always run
+against PostgreSQL, since the MCP server has no write tools. Timings follow the
+spec's rule of raising intervals below 1/1000 of the longest one, but are not
+rounded up to 0.1 s, so that small scale factors still compare across commits.
+
+Each RF1 refresh set can only be applied once, so pass the "next_refresh_set"
+of the previous report as --first-set, or reload the data.
+
+Usage (from the repository root, against a database loaded at --scale-factor):
+
+    DATABASE_URL=postgresql://... python -m benchmarks.tpch_driver --scale-factor 1 --streams 2 --output tpch.json
+    DATABASE_URL=postgresql://... python -m benchmarks.tpch_driver --target mcp --url http://localhost:8001/mcp/ --first-set 4
+    python -m benchmarks.tpch_driver --scale-factor 1 --output new.json --baseline old.json
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import math
+import random
+import subprocess
+import time
+from decimal import Decimal
+
+from data_generation import refresh, vectorized
+from data_generation.generate_data import get_db_connection
+from data_generation.spec import NATIONS
+from mcp_server.database_handlers import tpch_queries
+
+# Appendix A: the order of the 22 queries in query stream 0 (power test) and streams 1-40 (throughput test)
+QUERY_ORDERS = [
+    [14, 2, 9, 20, 6, 17, 18, 8, 21, 13, 3, 22, 16, 4, 11, 15, 1, 10, 19, 5, 7, 12],
+    [21, 3, 18, 5, 11, 7, 6, 20, 17, 12, 16, 15, 13, 10, 2, 8, 14, 19, 9, 22, 1, 4],
+    [6, 17, 14, 16, 19, 10, 9, 2, 15, 8, 5, 22, 12, 7, 13, 18, 1, 4, 20, 3, 11, 21],
+    [8, 5, 4, 6, 17, 7, 1, 18, 22, 14, 9, 10, 15, 11, 20, 2, 21, 19, 13, 16, 12, 3],
+    [5, 21, 14, 19, 15, 17, 12, 6, 4, 9, 8, 16, 11, 2, 10, 18, 1, 13, 7, 22, 3, 20],
+    [21, 15, 4, 6, 7, 16, 19, 18, 14, 22, 11, 13, 3, 1, 2, 5, 8, 20, 12, 17, 10, 9],
+    [10, 3, 15, 13, 6, 8, 9, 7, 4, 11, 22, 18, 12, 1, 5, 16, 2, 14, 19, 20, 17, 21],
+    [18, 8, 20, 21, 2, 4, 22, 17, 1, 11, 9, 19, 3, 13, 5, 7, 10, 16, 6, 14, 15, 12],
+    [19, 1, 15, 17, 5, 8, 9, 12, 14, 7, 4, 3, 20, 16, 6, 22, 10, 13, 2, 21, 18, 11],
+    [8, 13, 2, 20, 17, 3, 6, 21, 18, 11, 19, 10, 15, 4, 22, 1, 7, 12, 9, 14, 5, 16],
+    [6, 15, 18, 17, 12, 1, 7, 2, 22, 13, 21, 10, 14, 9, 3, 16, 20, 19, 11, 4, 8, 5],
+    [15, 14, 18, 17, 10, 20, 16, 11, 1, 8, 4, 22, 5, 12, 3, 9, 21, 2, 13, 6, 19, 7],
+    [1, 7, 16, 17, 18, 22, 12, 6, 8, 9, 11, 4, 2, 5, 20, 21, 13, 10, 19, 3, 14, 15],
+    [21, 17, 7, 3, 1, 10, 12, 22, 9, 16, 6, 11, 2, 4, 5, 14, 8, 20, 13, 18, 15, 19],
+    [2, 9, 5, 4, 18, 1, 20, 15, 16, 17, 7, 21, 13, 14, 19, 8, 22, 11, 10, 3, 12, 6],
+    [16, 9, 17, 8, 14, 11, 10, 12, 6, 21, 7, 3, 15, 5, 22, 20, 1, 13, 19, 2, 4, 18],
+    [1, 3, 6, 5, 2, 16, 14, 22, 17, 20, 4, 9, 10, 11, 15, 8, 12, 19, 18, 13, 7, 21],
+    [3, 16, 5, 11, 21, 9, 2, 15, 10, 18, 17, 7, 8, 19, 14, 13, 1, 4, 22, 20, 6, 12],
+    [14, 4, 13, 5, 21, 11, 8, 6, 3, 17, 2, 20, 1, 19, 10, 9, 12, 18, 15, 7, 22, 16],
+    [4, 12, 22, 14, 5, 15, 16, 2, 8, 10, 17, 9, 21, 7, 3, 6, 13, 18, 11, 20, 19, 1],
+    [16, 15, 14, 13, 4, 22, 18, 19, 7, 1, 12, 17, 5, 10, 20, 3, 9, 21, 11, 2, 6, 8],
+    [20, 14, 21, 12, 15, 17, 4, 19, 13, 10, 11, 1, 16, 5, 18, 7, 8, 22, 9, 6, 3, 2],
+    [16, 14, 13, 2, 21, 10, 11, 4, 1, 22, 18, 12, 19, 5, 7, 8, 6, 3, 15, 20, 9, 17],
+    [18, 15, 9, 14, 12, 2, 8, 11, 22, 21, 16, 1, 6, 17, 5, 10, 19, 4, 20, 13, 3, 7],
+    [7, 3, 10, 14, 13, 21, 18, 6, 20, 4, 9, 8, 22, 15, 2, 1, 5, 12, 19, 17, 11, 16],
+    [18, 1, 13, 7, 16, 10, 14, 2, 19, 5, 21, 11, 22, 15, 8, 17, 20, 3, 4, 12, 6, 9],
+    [13, 2, 22, 5, 11, 21, 20, 14, 7, 10, 4, 9, 19, 18, 6, 3, 1, 8, 15, 12, 17, 16],
+    [14, 17, 21, 8, 2, 9, 6, 4, 5, 13, 22, 7, 15, 3, 1, 18, 16, 11, 10, 12, 20, 19],
+    [10, 22, 1, 12, 13, 18, 21, 20, 2, 14, 16, 7, 15, 3, 4, 17, 5, 19, 6, 8, 9, 11],
+    [10, 8, 9, 18, 12, 6, 1, 5, 20, 11, 17, 22, 16, 3, 13, 2, 15, 21, 14, 19, 7, 4],
+    [7, 17, 22, 5, 3, 10, 13, 18, 9, 1, 14, 15, 21, 19, 16, 12, 8, 6, 11, 20, 4, 2],
+    [2, 9, 21, 3, 4, 7, 1, 11, 16, 5, 20, 19, 18, 8, 17, 13, 10, 12, 15, 6, 14, 22],
+    [15, 12, 8, 4, 22, 13, 16, 17, 18, 3, 7, 5, 6, 1, 9, 11, 21, 10, 14, 20, 19, 2],
+    [15, 16, 2, 11, 17, 7, 5, 14, 20, 4, 21, 3, 10, 9, 12, 8, 13, 6, 18, 19, 22, 1],
+    [1, 13, 11, 3, 4, 21, 6, 14, 15, 22, 18, 9, 7, 5, 10, 20, 12, 16, 17, 8, 19, 2],
+    [14, 17, 22, 20, 8, 16, 5, 10, 1, 13, 2, 21, 12, 9, 4, 18, 3, 7, 6, 19, 15, 11],
+    [9, 17, 7, 4, 5, 13, 21, 18, 11, 3, 22, 1, 6, 16, 20, 14, 15, 10, 8, 2, 12, 19],
+    [13, 14, 5, 22, 19, 11, 9, 6, 18, 15, 8, 10, 7, 4, 17, 16, 3, 1, 12, 2, 21, 20],
+    [20, 5, 4, 14, 11, 1, 6, 16, 8, 22, 7, 3, 2, 12, 21, 19, 17, 13, 10, 15, 18, 9],
+    [3, 7, 14, 15, 6, 5, 21, 20, 18, 10, 4, 16, 19, 1, 13, 9, 8, 17, 11, 12, 22, 2],
+    [13, 15, 17, 1, 22, 11, 3, 4, 7, 20, 14, 21, 9, 8, 2, 18, 16, 6, 10, 12, 5, 19],
+]
+MAX_STREAMS = len(QUERY_ORDERS) - 1
+
+
+def _random_date(rng, minimum, maximum):
+    # The parameter ranges say whether the spec draws a day, the first of a month or January 1st
+    if minimum.day == maximum.day == 1:
+        if minimum.month == maximum.month == 1:
+            return datetime.date(rng.randint(minimum.year, maximum.year), 1, 1)
+        months = (maximum.year - minimum.year) * 12 + maximum.month - minimum.month
+        month = minimum.month - 1 + rng.randint(0, months)
+        return datetime.date(minimum.year + month // 12, month % 12 + 1, 1)
+    return minimum + datetime.timedelta(days=rng.randint(0, (maximum - minimum).days))
+
+
+def _random_value(rng, param):
+    kind = param.kind[:-5] if param.kind.endswith("_list") else param.kind
+    if param.choices is not None:
+        pool = param.choices
+    elif kind == "int":
+        pool = range(param.minimum, param.maximum + 1)
+    elif kind == "decimal":
+        cents = rng.randint(int(param.minimum * 100), int(param.maximum * 100))
+        return float(Decimal(cents) / 100)
+    else:
+        return _random_date(rng, param.minimum, param.maximum).isoformat()
+    if param.kind.endswith("_list"):
+        return list(rng.sample(pool, param.length))
+    return rng.choice(pool)
+
+
+def query_arguments(query_id, scale_factor, rng=None):
+    """
+    Substitution parameters for one query execution: the spec's validation
+    defaults, or with `rng` a random draw from each parameter's allowed values
+    (an approximation of qgen). Values are JSON types, for either target.
+    """
+    arguments = {}
+    params = tpch_queries.QUERIES[query_id]["params"]
+    if rng is not None:
+        arguments = {name: _random_value(rng, param) for name, param in params.items()}
+        if query_id == "Q7":
+            arguments["nation1"], arguments["nation2"] = rng.sample(tpch_queries.NATIONS, 2)
+        if query_id == "Q8":
+            arguments["region"] = tpch_queries.REGIONS[dict(NATIONS)[arguments["nation"]]]
+        if query_id == "Q18":
+            arguments["quantity"] = rng.randint(312, 315)
+    if query_id == "Q11":
+        arguments["fraction"] = min(1.0, 0.0001 / scale_factor)
+    return arguments
+
+
+def stream_arguments(stream, options):
+    rng = random.Random(f"{options.seed}:{stream}") if options.parameters == "random" else None
+    return {f"Q{number}": query_arguments(f"Q{number}", options.scale_factor, rng) for number in QUERY_ORDERS[stream]}
+
+
+class PostgresSession:
+    """Runs queries on a connection of its own, off the event loop."""
+
+    async def __aenter__(self):
+        self.conn = await asyncio.to_thread(get_db_connection)
+        return self
+
+    async def __aexit__(self, *exc):
+        self.conn.close()
+
+    def _execute(self, query_id, arguments):
+        sql, params = tpch_queries.bind(query_id, arguments)
+        try:
+            with self.conn.cursor() as cursor:
+                cursor.execute(sql, params)
+                return len(cursor.fetchall())
+        finally:
+            self.conn.rollback()
+
+    async def run(self, query_id, arguments):
+        return await asyncio.to_thread(self._execute, query_id, arguments)
+
+
+class MCPSession:
+    """Runs queries through the MCP server's tpch_qN tools over one StreamableHttp session."""
+
+    def __init__(self, url):
+        from fastmcp.client import Client
+        from fastmcp.client.transports import StreamableHttpTransport
+
+        self.client = Client(StreamableHttpTransport(url))
+
+    async def __aenter__(self):
+        await self.client.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.client.__aexit__(*exc)
+
+    async def run(self, query_id, arguments):
+        result = await self.client.call_tool(f"tpch_{query_id.lower()}", arguments)
+        payload = getattr(result, "structured_content", None) or json.loads(result.content[0].text)
+        if payload.get("status") != "success":
+            raise RuntimeError(payload.get("message"))
+        return len(payload.get("data") or [])
+
+
+def open_session(options):
+    return MCPSession(options.url) if options.target == "mcp" else PostgresSession()
+
+
+async def run_query_stream(stream, options, errors):
+    """Runs one query stream in its Appendix A order. Returns {query: seconds}."""
+    timings = {}
+    arguments = stream_arguments(stream, options)
+    async with open_session(options) as session:
+        for number in QUERY_ORDERS[stream]:
+            query_id = f"Q{number}"
+            start = time.perf_counter()
+            try:
+                rows = await session.run(query_id, arguments[query_id])
+            except Exception as e:
+                errors.append({"stream": stream, "query": query_id, "error": str(e)})
+                print(f"  stream {stream} {query_id} failed: {e}")
+                continue
+            timings[query_id] = time.perf_counter() - start
+            print(f"  stream {stream} {query_id}: {timings[query_id]:.3f}s, {rows} rows")
+    return timings
+
+
+def _refresh(conn, function, refresh_set, options):
+    start = time.perf_counter()
+    refresh.run_refresh_set(conn, function, refresh_set, options.scale_factor, options.refresh_batch_size, options.seed)
+    return time.perf_counter() - start
+
+
+async def run_refresh(conn, function, refresh_set, options, errors):
+    try:
+        seconds = await asyncio.to_thread(_refresh, conn, function, refresh_set, options)
+    except Exception as e:
+        errors.append({"refresh_set": refresh_set, "function": function, "error": str(e)})
+        print(f"  {function.upper()} set {refresh_set} failed: {e}")
+        return None
+    print(f"  {function.upper()} set {refresh_set}: {seconds:.3f}s")
+    return seconds
+
+
+async def run_refresh_stream(refresh_sets, options, errors):
+    """The throughput test's refresh stream: one RF1/RF2 pair per query stream, in sequence."""
+    conn = await asyncio.to_thread(get_db_connection)
+    pairs = []
+    try:
+        for refresh_set in refresh_sets:
+            pairs.append({
+                "set": refresh_set,
+                "RF1": await run_refresh(conn, "rf1", refresh_set, options, errors),
+                "RF2": await run_refresh(conn, "rf2", refresh_set, options, errors),
+            })
+    finally:
+        conn.close()
+    return pairs
+
+
+def power_metric(intervals, scale_factor):
+    """3600 * SF over the geometric mean of the timing intervals, after the spec's max/1000 floor."""
+    if not intervals:
+        return None
+    floor = max(intervals) / 1000
+    log_mean = sum(math.log(max(interval, floor)) for interval in intervals) / len(intervals)
+    return 3600 * scale_factor / math.exp(log_mean)
+
+
+async def power_test(options, errors):
+    print("Power test")
+    start = time.perf_counter()
+    result = {"queries": {}, "refresh": {}}
+    conn = None
+    if options.refresh:
+        conn = await asyncio.to_thread(get_db_connection)
+    try:
+        if conn:
+            result["refresh"]["RF1"] = await run_refresh(conn, "rf1", options.first_set, options, errors)
+        result["queries"] = await run_query_stream(0, options, errors)
+        if conn:
+            result["refresh"]["RF2"] = await run_refresh(conn, "rf2", options.first_set, options, errors)
+    finally:
+        if conn:
+            conn.close()
+    result["seconds"] = time.perf_counter() - start
+    complete = len(result["queries"]) == 22 and None not in result["refresh"].values()
+    intervals = list(result["queries"].values()) + list(result["refresh"].values())
+    result["power_at_size"] = power_metric(intervals, options.scale_factor) if complete else None
+    return result
+
+
+async def throughput_test(options, errors):
+    print(f"Throughput test: {options.streams} query streams" + (" and a refresh stream" if options.refresh else ""))
+    tasks = [run_query_stream(stream, options, errors) for stream in range(1, options.streams + 1)]
+    if options.refresh:
+        tasks.append(run_refresh_stream(range(options.first_set + 1, options.first_set + 1 + options.streams), options, errors))
+    start = time.perf_counter()
+    results = await asyncio.gather(*tasks)
+    seconds = time.perf_counter() - start
+    streams = {str(stream): timings for stream, timings in zip(range(1, options.streams + 1), results)}
+    complete = all(len(timings) == 22 for timings in streams.values()) and not any(
+        None in (pair["RF1"], pair["RF2"]) for pair in (results[-1] if options.refresh else []))
+    return {
+        "streams": streams,
+        "refresh": results[-1] if options.refresh else [],
+        "seconds": seconds,
+        "throughput_at_size": options.streams * 22 * 3600 / seconds * options.scale_factor if complete else None,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _cell(value):
+    return f"{value:>11.3f}" if value is not None else f"{'-':>11}"
+
+
+def print_comparison(report, baseline):
+    """Per-metric and per-query (power test) ratios of this run over a baseline report."""
+    print(f"Compared with {baseline.get('commit') or 'baseline'}:")
+    print(f"{'':>18} {'baseline':>11} {'this run':>11} {'ratio':>7}")
+    rows = [(name, baseline.get(name), report.get(name)) for name in ("power_at_size", "throughput_at_size", "qphh_at_size")]
+    if "power" in baseline and "power" in report:
+        rows += [(f"{query_id} seconds", baseline["power"]["queries"].get(query_id), report["power"]["queries"].get(query_id))
+                 for query_id in tpch_queries.QUERIES]
+    for name, old, new in rows:
+        ratio = f"{new / old:>7.2f}" if old and new else f"{'-':>7}"
+        print(f"{name:>18} {_cell(old)} {_cell(new)} {ratio}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Run the TPC-H power and throughput tests and report QphH@Size as JSON.")
+    parser.add_argument("--target", choices=["postgres", "mcp"], default="postgres")
+    parser.add_argument("--url", default="http://localhost:8001/mcp/", help="MCP server URL for --target mcp.")
+    parser.add_argument("--scale-factor", type=float, default=1.0, help="Scale factor of the loaded database.")
+    parser.add_argument("--streams", type=int, default=2, help=f"Query streams in the throughput test, 1 to {MAX_STREAMS}.")
+    parser.add_argument("--tests", nargs="+", choices=["power", "throughput"], default=["power", "throughput"])
+    parser.add_argument("--parameters", choices=["validation", "random"], default="validation",
+                        help="validation uses the spec's validation values in every stream, so runs compare; random draws per stream from --seed.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-refresh", dest="refresh", action="store_false", help="Skip RF1/RF2; the metrics then cover queries only.")
+    parser.add_argument("--first-set", type=int, default=1, help="Refresh set for the power test; the throughput test uses the next --streams sets.")
+    parser.add_argument("--refresh-batch-size", type=int, default=refresh.DEFAULT_BATCH_SIZE, help="Orders per refresh transaction.")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout.")
+    parser.add_argument("--baseline", help="A previous JSON report to compare this run with.")
+    options = parser.parse_args()
+    if not 1 <= options.streams <= MAX_STREAMS:
+        parser.error(f"--streams must be between 1 and {MAX_STREAMS}.")
+
+    if options.refresh:
+        # Build RF1's text pool up front so it isn't charged to the first refresh
+        vectorized.text_pool(options.seed)
+
+    errors = []
+    report = {
+        "commit": git_commit(),
+        "started_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "settings": {name: getattr(options, name) for name in ("target", "scale_factor", "streams", "parameters", "seed", "refresh", "first_set")},
+    }
+    if "power" in options.tests:
+        report["power"] = await power_test(options, errors)
+        report["power_at_size"] = report["power"]["power_at_size"]
+    if "throughput" in options.tests:
+        report["throughput"] = await throughput_test(options, errors)
+        report["throughput_at_size"] = report["throughput"]["throughput_at_size"]
+    power, throughput = report.get("power_at_size"), report.get("throughput_at_size")
+    report["qphh_at_size"] = math.sqrt(power * throughput) if power and throughput else None
+    report["next_refresh_set"] = options.first_set
+    if options.refresh:
+        report["next_refresh_set"] += 1 + (options.streams if "throughput" in options.tests else 0)
+    report["errors"] = errors
+
+    for name in ("power_at_size", "throughput_at_size", "qphh_at_size"):
+        if name in report:
+            print(f"{name}: {report[name]:,.2f}" if report[name] is not None else f"{name}: - (incomplete run)")
+    if options.baseline:
+        with open(options.baseline) as f:
+            print_comparison(report, json.load(f))
+    if options.output:
+        with open(options.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,55 @@
+"""
+Generation microbenchmark: per-row Faker generators against the NumPy engine.
+
+Generates the first N lineitem rows of an SF 1 database with each engine, in
+the same chunks the loader uses, and reports rows/second. Rows are only
+consumed (and encoded as COPY text, as the loader would), not loaded.
+
+Usage (from the repository root):
+
+    python -m benchmarks.vectorized_generation --rows 1000000
+"""
+import argparse
+import time
+
+from data_generation import bulk_loader, generate_data
+
+
+def run(engine, table_name, rows, chunk_size, seed, encode):
+    count = 0
+    start = time.perf_counter()
+    for chunk_index, chunk_start, chunk_stop in generate_data.table_chunks(table_name, 1, chunk_size):
+        for row in generate_data.generate_chunk(table_name, 1, chunk_index, chunk_start, chunk_stop, seed, engine):
+            if encode:
+                bulk_loader.encode_text_row(row)
+            count += 1
+        if count >= rows:
+            break
+    return count, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare Faker and NumPy data generation throughput.")
+    parser.add_argument("--table", choices=list(generate_data.GENERATORS), default="lineitem")
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--chunk-size", type=int, default=generate_data.DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--engines", nargs="+", choices=["faker", "numpy"], default=["faker", "numpy"])
+    parser.add_argument("--no-encode", action="store_true", help="Only generate rows; skip COPY text encoding.")
+    options = parser.parse_args()
+
+    # Build the text pool up front so it isn't charged to the first chunk
+    generate_data.vectorized.text_pool(options.seed)
+
+    print(f"{'engine':>7} {'rows':>10} {'seconds':>9} {'rows/s':>11}")
+    rates = {}
+    for engine in options.engines:
+        count, elapsed = run(engine, options.table, options.rows, options.chunk_size, options.seed, not options.no_encode)
+        rates[engine] = count / elapsed
+        print(f"{engine:>7} {count:>10} {elapsed:>9.2f} {rates[engine]:>11,.0f}")
+    if len(rates) == 2:
+        print(f"numpy is {rates['numpy'] / rates['faker']:.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
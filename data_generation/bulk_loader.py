@@ -0,0 +1,219 @@
+import io
+import struct
+import functools
+import datetime
+import itertools
+from decimal import Decimal
+
+from psycopg2 import Error
+
+COPY_FORMATS = ("text", "binary")
+DEFAULT_BATCH_SIZE = 50000
+
+# Binary COPY framing: signature, flags, header extension length; the trailer is a -1 field count
+BINARY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack(">ii", 0, 0)
+BINARY_TRAILER = struct.pack(">h", -1)
+NULL_FIELD = struct.pack(">i", -1)
+PG_EPOCH = datetime.date(2000, 1, 1)
+
+_END = object()
+
+
+def _text_value(value):
+    if value is None:
+        return "\\N"
+    if isinstance(value, str):
+        return value.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+    return str(value)
+
+
+def encode_text_row(row):
+    """Encodes one row in COPY's default text format (tab separated, \\N for NULL)."""
+    return ("\t".join(_text_value(value) for value in row) + "\n").encode("utf-8")
+
+
+def _encode_numeric(value):
+    """PostgreSQL's binary numeric: base-10000 digit groups with weight, sign and display scale."""
+    # Work from the decimal text, which for floats is the shortest round-tripping repr
+    text = repr(value) if isinstance(value, float) else str(value)
+    if "e" in text or "E" in text or "n" in text or "N" in text:
+        if not Decimal(text).is_finite():
+            return NUMERIC_NAN
+        text = format(Decimal(text), "f")
+    negative = text.startswith("-")
+    whole, _, fraction = text.lstrip("+-").partition(".")
+    dscale = len(fraction)
+    # Scale the digits so the fraction is a whole number of 4-digit groups
+    fraction_groups = (dscale + 3) // 4
+    number = int(whole + fraction) * 10 ** (fraction_groups * 4 - dscale)
+
+    groups = []
+    while number:
+        number, group = divmod(number, 10000)
+        groups.append(group)
+    weight = len(groups) - 1 - fraction_groups
+    groups.reverse()
+    while groups and groups[-1] == 0:
+        groups.pop()
+    if not groups:
+        weight = 0
+    count = len(groups)
+    return struct.pack(f">ihhHh{count}h", 8 + 2 * count, count, weight, 0x4000 if negative and count else 0, dscale, *groups)
+
+
+def _encode_text(value):
+    data = str(value).encode("utf-8")
+    return struct.pack(">i", len(data)) + data
+
+
+def _encode_date(value):
+    if isinstance(value, str):
+        value = datetime.date.fromisoformat(value)
+    return _DATE.pack(4, (value - PG_EPOCH).days)
+
+
+# Each encoder returns the whole field: its int32 length followed by the value
+NUMERIC_NAN = struct.pack(">ihhHh", 8, 0, 0, 0xC000, 0)
+_DATE = struct.Struct(">ii")
+BINARY_ENCODERS = {
+    "smallint": functools.partial(struct.Struct(">ih").pack, 2),
+    "integer": functools.partial(struct.Struct(">ii").pack, 4),
+    "bigint": functools.partial(struct.Struct(">iq").pack, 8),
+    "real": functools.partial(struct.Struct(">if").pack, 4),
+    "double precision": functools.partial(struct.Struct(">id").pack, 8),
+    "boolean": functools.partial(struct.Struct(">i?").pack, 1),
+    "numeric": _encode_numeric,
+    "date": _encode_date,
+    "text": _encode_text,
+    "character varying": _encode_text,
+    "character": _encode_text,
+}
+
+
+def column_types(conn, table_name, columns):
+    """Looks up the PostgreSQL type of each column, which binary COPY has to match exactly."""
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT attname, format_type(atttypid, NULL) FROM pg_attribute "
+            "WHERE attrelid = %s::regclass AND attnum > 0 AND NOT attisdropped",
+            (table_name,),
+        )
+        types = dict(cursor.fetchall())
+    missing = [column for column in columns if column not in types]
+    if missing:
+        raise ValueError(f"Columns not found in {table_name}: {', '.join(missing)}")
+    return [types[column] for column in columns]
+
+
+def binary_row_encoder(types):
+    """Returns a function encoding one row in COPY's binary format for the given column types."""
+    unsupported = [column_type for column_type in types if column_type not in BINARY_ENCODERS]
+    if unsupported:
+        raise ValueError(f"No binary COPY encoder for column type(s): {', '.join(sorted(set(unsupported)))}")
+    encoders = [BINARY_ENCODERS[column_type] for column_type in types]
+    field_count = struct.pack(">h", len(encoders))
+
+    def encode(row):
+        return field_count + b"".join([NULL_FIELD if value is None else encoder(value) for encoder, value in zip(encoders, row)])
+
+    return encode
+
+
+class CopyStream(io.RawIOBase):
+    """
+    File-like object that copy_expert reads from.
+
+    Rows are pulled from the iterator and encoded only as COPY asks for more
+    bytes, so a batch is never materialized in memory. Stops after `limit` rows
+    (a negative limit means no limit).
+    """
+
+    def __init__(self, rows, encode_row, limit, header=b"", trailer=b""):
+        self._rows = rows
+        self._encode_row = encode_row
+        self._remaining = limit
+        self._buffer = bytearray(header)
+        self._trailer = trailer
+        self._finished = False
+        self.row_count = 0
+
+    def readable(self):
+        return True
+
+    def _fill(self, size):
+        while not self._finished and (size < 0 or len(self._buffer) < size):
+            row = next(self._rows, _END) if self._remaining else _END
+            if row is _END:
+                self._buffer += self._trailer
+                self._finished = True
+                break
+            self._buffer += self._encode_row(row)
+            self._remaining -= 1
+            self.row_count += 1
+
+    def read(self, size=-1):
+        self._fill(size)
+        if size < 0:
+            size = len(self._buffer)
+        chunk = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return chunk
+
+
+def copy_plan(conn, table_name, columns, copy_format="text"):
+    """Returns (statement, encode_row, header, trailer) for COPYing rows into table_name."""
+    if copy_format not in COPY_FORMATS:
+        raise ValueError(f"Unknown COPY format '{copy_format}'. Expected one of: {', '.join(COPY_FORMATS)}")
+    column_names = ", ".join(columns)
+    if copy_format == "binary":
+        encode_row = binary_row_encoder(column_types(conn, table_name, columns))
+        return f"COPY {table_name} ({column_names}) FROM STDIN WITH (FORMAT binary)", encode_row, BINARY_HEADER, BINARY_TRAILER
+    return f"COPY {table_name} ({column_names}) FROM STDIN", encode_text_row, b"", b""
+
+
+def copy_rows(cursor, table_name, columns, rows, copy_format="text"):
+    """
+    Runs a single COPY of all `rows` on cursor and returns the row count.
+    Doesn't commit, so the caller can make it part of a larger transaction.
+    """
+    statement, encode_row, header, trailer = copy_plan(cursor.connection, table_name, columns, copy_format)
+    stream = CopyStream(iter(rows), encode_row, -1, header, trailer)
+    cursor.copy_expert(statement, stream)
+    return stream.row_count
+
+
+def copy_data(conn, table_name, columns, rows, copy_format="text", batch_size=DEFAULT_BATCH_SIZE, verbose=True):
+    """
+    Loads rows into table_name with COPY FROM STDIN, committing after every batch.
+
+    `rows` can be any iterable, including a generator; it is consumed lazily.
+    Unlike insert_data there is no ON CONFLICT handling, so the rows must not
+    collide with keys already in the table. Returns the number of rows loaded.
+    A failed batch is rolled back and its error re-raised; earlier batches stay
+    committed.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+    statement, encode_row, header, trailer = copy_plan(conn, table_name, columns, copy_format)
+
+    rows = iter(rows)
+    loaded = 0
+    cursor = conn.cursor()
+    try:
+        while True:
+            first = next(rows, _END)
+            if first is _END:
+                break
+            stream = CopyStream(itertools.chain([first], rows), encode_row, batch_size, header, trailer)
+            cursor.copy_expert(statement, stream)
+            conn.commit()
+            loaded += stream.row_count
+        if verbose:
+            print(f"Successfully copied {loaded} rows into {table_name}.")
+    except Error as e:
+        conn.rollback()
+        print(f"Error copying data into {table_name} after {loaded} rows: {e}")
+        raise
+    finally:
+        cursor.close()
+    return loaded
@@ -0,0 +1,127 @@
+import os
+import csv
+import json
+import hashlib
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from data_generation import bulk_loader
+
+FILE_FORMATS = ("tbl", "csv", "parquet")
+MANIFEST_NAME = "manifest.json"
+
+
+def chunk_path(output_dir, dataset, table_name, chunk_index, file_format):
+    """
+    One file per table and chunk under the dataset's id, e.g.
+    8f3100d0c52211ec/lineitem/lineitem.00042.tbl. Exports with other settings
+    write elsewhere, so a resumed export only ever reuses its own chunks.
+    """
+    return os.path.join(output_dir, dataset, table_name, f"{table_name}.{chunk_index:05d}.{file_format}")
+
+
+def _text(value):
+    return "" if value is None else str(value)
+
+
+def write_tbl(path, columns, rows):
+    """dbgen's format: '|' after every field, including the last, and no header."""
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        for row in rows:
+            f.write("|".join(_text(value) for value in row) + "|\n")
+            count += 1
+    return count
+
+
+def write_csv(path, columns, rows):
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow(["" if value is None else value for value in row])
+            count += 1
+    return count
+
+
+def write_parquet(path, columns, rows):
+    rows = list(rows)
+    values = list(zip(*rows)) if rows else [() for _ in columns]
+    # pyarrow infers int64, double, string and date32 from the Python values
+    table = pa.table({column: pa.array(list(column_values)) for column, column_values in zip(columns, values)})
+    pq.write_table(table, path)
+    return len(rows)
+
+
+WRITERS = {"tbl": write_tbl, "csv": write_csv, "parquet": write_parquet}
+
+
+def write_chunk(path, file_format, columns, rows):
+    """
+    Writes one chunk file and returns its row count. The file is written under
+    a temporary name and renamed into place, so an interrupted export never
+    leaves a partial file that looks finished.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    partial = path + ".partial"
+    count = WRITERS[file_format](partial, columns, rows)
+    os.replace(partial, path)
+    return count
+
+
+def count_rows(path, file_format):
+    """Row count of an existing chunk file, used when an export resumes and skips it."""
+    if file_format == "parquet":
+        return pq.ParquetFile(path).metadata.num_rows
+    with open(path, "rb") as f:
+        lines = sum(1 for _ in f)
+    return lines - 1 if file_format == "csv" else lines
+
+
+def dataset_id(settings):
+    """Stable identifier for a generated dataset, from the settings that determine its contents."""
+    return hashlib.sha256(json.dumps(settings, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def write_manifest(output_dir, settings, chunks):
+    """
+    Records what an export produced: the settings, a dataset id and, per
+    table, the chunk files in order with their row counts.
+    """
+    manifest = {"dataset": dataset_id(settings), "settings": settings, "tables": chunks}
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    with open(path + ".partial", "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + ".partial", path)
+    return manifest
+
+
+def read_manifest(input_dir):
+    path = os.path.join(input_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        raise ValueError(f"No {MANIFEST_NAME} in {input_dir}; export the dataset with generate_data.py --output-dir first.")
+    with open(path) as f:
+        return json.load(f)
+
+
+def copy_file(cursor, table_name, columns, path, file_format):
+    """COPYs one chunk file into table_name on cursor, without committing. Returns the rows copied."""
+    column_names = ", ".join(columns)
+    if file_format == "csv":
+        with open(path, "rb") as f:
+            cursor.copy_expert(f"COPY {table_name} ({column_names}) FROM STDIN WITH (FORMAT csv, HEADER true)", f)
+        return cursor.rowcount
+    if file_format == "tbl":
+        with open(path, "rb") as f:
+            # Drop dbgen's trailing '|' so the field count matches; the rest is COPY's text format
+            stream = bulk_loader.CopyStream(iter(f), lambda line: line.rstrip(b"\r\n")[:-1] + b"\n", -1)
+            cursor.copy_expert(f"COPY {table_name} ({column_names}) FROM STDIN WITH (DELIMITER '|')", stream)
+        return stream.row_count
+    rows = (
+        row
+        for batch in pq.ParquetFile(path).iter_batches(columns=columns)
+        for row in zip(*(column.to_pylist() for column in batch.columns))
+    )
+    return bulk_loader.copy_rows(cursor, table_name, columns, rows)
@@ -1,14 +1,35 @@
 import os
+import sys
+import argparse
+import hashlib
+import itertools
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import psycopg2
 from psycopg2 import Error
 from faker import Faker
 import random
 from datetime import date, timedelta
 
+from data_generation import bulk_loader, flat_files, schema, vectorized
+from data_generation.spec import REGIONS, NATIONS, SUPPLIERS_PER_PART, MAX_LINES_PER_ORDER, table_cardinalities, order_key, partsupp_suppkey
+
 fake = Faker()
 
 DATABASE_URL = os.environ.get("DATABASE_URL")
 
+# Load order respects the foreign keys between tables
+TABLE_COLUMNS = {
+    "region": ["r_regionkey", "r_name", "r_comment"],
+    "nation": ["n_nationkey", "n_name", "n_regionkey", "n_comment"],
+    "part": ["p_partkey", "p_name", "p_mfgr", "p_brand", "p_type", "p_size", "p_container", "p_retailprice", "p_comment"],
+    "supplier": ["s_suppkey", "s_name", "s_address", "s_nationkey", "s_phone", "s_acctbal", "s_comment"],
+    "partsupp": ["ps_partkey", "ps_suppkey", "ps_availqty", "ps_supplycost", "ps_comment"],
+    "customer": ["c_custkey", "c_name", "c_address", "c_nationkey", "c_phone", "c_acctbal", "c_mktsegment", "c_comment"],
+    "orders": ["o_orderkey", "o_custkey", "o_orderstatus", "o_totalprice", "o_orderdate", "o_orderpriority", "o_clerk", "o_shippriority", "o_comment"],
+    "lineitem": ["l_orderkey", "l_partkey", "l_suppkey", "l_linenumber", "l_quantity", "l_extendedprice", "l_discount", "l_tax", "l_returnflag", "l_linestatus", "l_shipdate", "l_commitdate", "l_receiptdate", "l_shipinstruct", "l_shipmode", "l_comment"],
+}
+
 def get_db_connection():
     """Establishes and returns a database connection."""
     if not DATABASE_URL:
@@ -20,179 +41,170 @@ def get_db_connection():
         print(f"Error connecting to the database: {e}")
         raise
 
-def generate_region_data(num_rows=20):
+DEFAULT_CHUNK_SIZE = 10000
+
+# Each generator yields the rows for the driving-key indexes [start, stop) of
+# its table (parts for partsupp, orders for lineitem), drawing randomness only
+# from `rng` and `fake` so that a chunk can be reproduced from its seed.
+
+def generate_region_data(scale_factor=None, start=0, stop=None, rng=random, fake=fake):
     """Generates data for the REGION table."""
-    data = []
-    for i in range(num_rows):
-        r_regionkey = i
-        r_name = fake.word().upper()[:25]
+    for r_regionkey, r_name in list(enumerate(REGIONS))[start:stop]:
         r_comment = fake.sentence(nb_words=20)[:152]
-        data.append((r_regionkey, r_name, r_comment))
-    return data
+        yield (r_regionkey, r_name, r_comment)
 
-def generate_nation_data(num_rows=20, region_keys=None):
+def generate_nation_data(scale_factor=None, start=0, stop=None, rng=random, fake=fake):
     """Generates data for the NATION table."""
-    if region_keys is None:
-        # Fallback if region_keys are not provided, though they should be from generated region data
-        region_keys = list(range(20)) # Assuming 20 regions were generated
-
-    data = []
-    for i in range(num_rows):
-        n_nationkey = i
-        n_name = fake.country()[:25]
-        n_regionkey = random.choice(region_keys) # Link to existing region keys
+    for n_nationkey, (n_name, n_regionkey) in list(enumerate(NATIONS))[start:stop]:
         n_comment = fake.sentence(nb_words=20)[:152]
-        data.append((n_nationkey, n_name, n_regionkey, n_comment))
-    return data
+        yield (n_nationkey, n_name, n_regionkey, n_comment)
 
-def generate_part_data(num_rows=20):
+def generate_part_data(scale_factor, start=0, stop=None, rng=random, fake=fake):
     """Generates data for the PART table."""
-    data = []
-    for i in range(num_rows):
-        p_partkey = i
+    for p_partkey in range(start + 1, (stop or table_cardinalities(scale_factor)["part"]) + 1):
         p_name = fake.sentence(nb_words=5)[:55]
         p_mfgr = fake.company()[:25]
         p_brand = fake.word().upper()[:10]
         p_type = f"{fake.word().upper()}{fake.word().upper()}"[:25]
-        p_size = random.randint(1, 50)
-        p_container = random.choice(["SM CASE", "LG BOX", "MED BAG", "JUMBO PKG"])[:10]
-        p_retailprice = round(random.uniform(10.0, 1000.0), 2)
+        p_size = rng.randint(1, 50)
+        p_container = rng.choice(["SM CASE", "LG BOX", "MED BAG", "JUMBO PKG"])[:10]
+        p_retailprice = round(rng.uniform(10.0, 1000.0), 2)
         p_comment = fake.sentence(nb_words=10)[:23]
-        data.append((p_partkey, p_name, p_mfgr, p_brand, p_type, p_size, p_container, p_retailprice, p_comment))
-    return data
+        yield (p_partkey, p_name, p_mfgr, p_brand, p_type, p_size, p_container, p_retailprice, p_comment)
 
-def generate_supplier_data(num_rows=20, nation_keys=None):
-    """
-    Generates data for the SUPPLIER table.
-    Requires nation_keys from the NATION table.
-    """
-    if nation_keys is None:
-        nation_keys = list(range(20)) # Assuming 20 nations were generated
-
-    data = []
-    for i in range(num_rows):
-        s_suppkey = i
-        s_name = fake.company()[:25]
+def generate_supplier_data(scale_factor, start=0, stop=None, rng=random, fake=fake):
+    """Generates data for the SUPPLIER table."""
+    for s_suppkey in range(start + 1, (stop or table_cardinalities(scale_factor)["supplier"]) + 1):
+        s_name = f"Supplier#{s_suppkey:09d}"
         s_address = fake.address().replace("\n", ", ")[:40]
-        s_nationkey = random.choice(nation_keys)
+        s_nationkey = rng.randrange(len(NATIONS))
         s_phone = fake.phone_number()[:15]
-        s_acctbal = round(random.uniform(100.0, 10000.0), 2)
+        s_acctbal = round(rng.uniform(-999.99, 9999.99), 2)
         s_comment = fake.sentence(nb_words=20)[:101]
-        data.append((s_suppkey, s_name, s_address, s_nationkey, s_phone, s_acctbal, s_comment))
-    return data
+        yield (s_suppkey, s_name, s_address, s_nationkey, s_phone, s_acctbal, s_comment)
 
-def generate_partsupp_data(num_rows=20, part_keys=None, supp_keys=None):
-    """
-    Generates data for the PARTSUPP table.
-    Requires part_keys from PART and supp_keys from SUPPLIER.
-    """
-    if part_keys is None:
-        part_keys = list(range(20))
-    if supp_keys is None:
-        supp_keys = list(range(20))
-
-    data = []
-    # Ensure unique combinations for primary key (ps_partkey, ps_suppkey)
-    generated_combinations = set()
-    for i in range(num_rows):
-        while True:
-            ps_partkey = random.choice(part_keys)
-            ps_suppkey = random.choice(supp_keys)
-            if (ps_partkey, ps_suppkey) not in generated_combinations:
-                generated_combinations.add((ps_partkey, ps_suppkey))
-                break
-        
-        ps_availqty = random.randint(1, 1000)
-        ps_supplycost = round(random.uniform(1.0, 1000.0), 2)
-        ps_comment = fake.sentence(nb_words=20)[:199]
-        data.append((ps_partkey, ps_suppkey, ps_availqty, ps_supplycost, ps_comment))
-    return data
-
-def generate_customer_data(num_rows=20, nation_keys=None):
+def generate_partsupp_data(scale_factor, start=0, stop=None, rng=random, fake=fake):
     """
-    Generates data for the CUSTOMER table.
-    Requires nation_keys from the NATION table.
+    Generates data for the PARTSUPP table: 4 suppliers per part, chosen with
+    the spec's formula so the (partkey, suppkey) pairs are unique by construction.
     """
-    if nation_keys is None:
-        nation_keys = list(range(20))
-
-    data = []
-    for i in range(num_rows):
-        c_custkey = i
-        c_name = fake.name()[:25]
+    cardinalities = table_cardinalities(scale_factor)
+    suppliers = cardinalities["supplier"]
+    for ps_partkey in range(start + 1, (stop or cardinalities["part"]) + 1):
+        for i in range(SUPPLIERS_PER_PART):
+            ps_suppkey = partsupp_suppkey(ps_partkey, i, suppliers)
+            ps_availqty = rng.randint(1, 9999)
+            ps_supplycost = round(rng.uniform(1.0, 1000.0), 2)
+            ps_comment = fake.sentence(nb_words=20)[:199]
+            yield (ps_partkey, ps_suppkey, ps_availqty, ps_supplycost, ps_comment)
+
+def generate_customer_data(scale_factor, start=0, stop=None, rng=random, fake=fake):
+    """Generates data for the CUSTOMER table."""
+    for c_custkey in range(start + 1, (stop or table_cardinalities(scale_factor)["customer"]) + 1):
+        c_name = f"Customer#{c_custkey:09d}"
         c_address = fake.address().replace("\n", ", ")[:40]
-        c_nationkey = random.choice(nation_keys)
+        c_nationkey = rng.randrange(len(NATIONS))
         c_phone = fake.phone_number()[:15]
-        c_acctbal = round(random.uniform(-1000.0, 10000.0), 2)
-        c_mktsegment = random.choice(["AUTOMOBILE", "BUILDING", "FURNITURE", "MACHINERY", "HOUSEHOLD"])[:10]
+        c_acctbal = round(rng.uniform(-999.99, 9999.99), 2)
+        c_mktsegment = rng.choice(["AUTOMOBILE", "BUILDING", "FURNITURE", "MACHINERY", "HOUSEHOLD"])[:10]
         c_comment = fake.sentence(nb_words=20)[:117]
-        data.append((c_custkey, c_name, c_address, c_nationkey, c_phone, c_acctbal, c_mktsegment, c_comment))
-    return data
-
-def generate_orders_data(num_rows=20, cust_keys=None):
-    """
-    Generates data for the ORDERS table.
-    Requires cust_keys from the CUSTOMER table.
-    """
-    if cust_keys is None:
-        cust_keys = list(range(20))
-
-    data = []
-    for i in range(num_rows):
-        o_orderkey = i
-        o_custkey = random.choice(cust_keys)
-        o_orderstatus = random.choice(["O", "F", "P"]) # Open, Finished, Pending
-        o_totalprice = round(random.uniform(100.0, 100000.0), 2)
-        o_orderdate = fake.date_between(start_date="-5y", end_date="today")
-        o_orderpriority = random.choice(["1-URGENT", "2-HIGH", "3-MEDIUM", "4-NOT SPECIFIED", "5-LOW"])[:15]
-        o_clerk = fake.name()[:15]
+        yield (c_custkey, c_name, c_address, c_nationkey, c_phone, c_acctbal, c_mktsegment, c_comment)
+
+def generate_orders_data(scale_factor, start=0, stop=None, rng=random, fake=fake):
+    """Generates data for the ORDERS table."""
+    customers = table_cardinalities(scale_factor)["customer"]
+    for index in range(start, stop or table_cardinalities(scale_factor)["orders"]):
+        o_orderkey = order_key(index)
+        # A third of the customers (custkey divisible by 3) never place orders
+        o_custkey = rng.randint(1, customers)
+        while o_custkey % 3 == 0:
+            o_custkey = rng.randint(1, customers)
+        o_orderstatus = rng.choice(["O", "F", "P"]) # Open, Finished, Pending
+        o_totalprice = round(rng.uniform(100.0, 100000.0), 2)
+        o_orderdate = fake.date_between(start_date=date(1992, 1, 1), end_date=date(1998, 8, 2))
+        o_orderpriority = rng.choice(["1-URGENT", "2-HIGH", "3-MEDIUM", "4-NOT SPECIFIED", "5-LOW"])[:15]
+        o_clerk = f"Clerk#{rng.randint(1, max(1, int(scale_factor * 1000))):09d}"
         o_shippriority = 0 # Always 0 in TPC-H
         o_comment = fake.sentence(nb_words=20)[:79]
-        data.append((o_orderkey, o_custkey, o_orderstatus, o_totalprice, o_orderdate, o_orderpriority, o_clerk, o_shippriority, o_comment))
-    return data
+        yield (o_orderkey, o_custkey, o_orderstatus, o_totalprice, o_orderdate, o_orderpriority, o_clerk, o_shippriority, o_comment)
 
-def generate_lineitem_data(num_rows=20, order_keys=None, part_supp_keys=None):
+def generate_lineitem_data(scale_factor, start=0, stop=None, rng=random, fake=fake):
     """
-    Generates data for the LINEITEM table.
-    Requires order_keys from ORDERS and part_supp_keys (tuples of (partkey, suppkey)) from PARTSUPP.
+    Generates data for the LINEITEM table: 1-7 lines for every order, each
+    for a (part, supplier) pair that exists in PARTSUPP.
     """
-    if order_keys is None:
-        order_keys = list(range(20))
-    if part_supp_keys is None:
-        # Assuming part_supp_keys are (partkey, suppkey) tuples
-        part_supp_keys = [(i, i) for i in range(20)] # Placeholder
-
-    data = []
-    for i in range(num_rows):
-        l_orderkey = random.choice(order_keys)
-        l_linenumber = i + 1 # Unique per orderkey
-        
-        # Ensure part_supp_key is valid
-        if part_supp_keys:
-            l_partkey, l_suppkey = random.choice(part_supp_keys)
-        else:
-            l_partkey = random.randint(0, 19) # Fallback
-            l_suppkey = random.randint(0, 19) # Fallback
-
-        l_quantity = round(random.uniform(1.0, 50.0), 2)
-        l_extendedprice = round(random.uniform(100.0, 5000.0), 2)
-        l_discount = round(random.uniform(0.0, 0.10), 2)
-        l_tax = round(random.uniform(0.01, 0.08), 2)
-        l_returnflag = random.choice(["R", "A", "N"]) # Returned, Approved, None
-        l_linestatus = random.choice(["O", "F"]) # Open, Finished
-        
-        ship_date = fake.date_between(start_date="-2y", end_date="today")
-        commit_date = ship_date + timedelta(days=random.randint(1, 30))
-        receipt_date = commit_date + timedelta(days=random.randint(1, 30))
-
-        l_shipinstruct = random.choice(["DELIVER IN PERSON", "COLLECT COD", "NONE", "TAKE BACK RETURN"])[:25]
-        l_shipmode = random.choice(["AIR", "RAIL", "TRUCK", "SHIP"])[:10]
-        l_comment = fake.sentence(nb_words=10)[:44]
-        data.append((l_orderkey, l_partkey, l_suppkey, l_linenumber, l_quantity, l_extendedprice, l_discount, l_tax, l_returnflag, l_linestatus, ship_date, commit_date, receipt_date, l_shipinstruct, l_shipmode, l_comment))
-    return data
+    cardinalities = table_cardinalities(scale_factor)
+    parts, suppliers = cardinalities["part"], cardinalities["supplier"]
+    for index in range(start, stop or cardinalities["orders"]):
+        l_orderkey = order_key(index)
+        for l_linenumber in range(1, rng.randint(1, MAX_LINES_PER_ORDER) + 1):
+            l_partkey = rng.randint(1, parts)
+            l_suppkey = partsupp_suppkey(l_partkey, rng.randrange(SUPPLIERS_PER_PART), suppliers)
+
+            l_quantity = rng.randint(1, 50)
+            l_extendedprice = round(rng.uniform(100.0, 5000.0), 2)
+            l_discount = round(rng.uniform(0.0, 0.10), 2)
+            l_tax = round(rng.uniform(0.0, 0.08), 2)
+            l_returnflag = rng.choice(["R", "A", "N"]) # Returned, Approved, None
+            l_linestatus = rng.choice(["O", "F"]) # Open, Finished
+
+            ship_date = fake.date_between(start_date=date(1992, 1, 2), end_date=date(1998, 12, 1))
+            commit_date = ship_date + timedelta(days=rng.randint(1, 30))
+            receipt_date = commit_date + timedelta(days=rng.randint(1, 30))
+
+            l_shipinstruct = rng.choice(["DELIVER IN PERSON", "COLLECT COD", "NONE", "TAKE BACK RETURN"])[:25]
+            l_shipmode = rng.choice(["REG AIR", "AIR", "RAIL", "SHIP", "TRUCK", "MAIL", "FOB"])[:10]
+            l_comment = fake.sentence(nb_words=10)[:44]
+            yield (l_orderkey, l_partkey, l_suppkey, l_linenumber, l_quantity, l_extendedprice, l_discount, l_tax, l_returnflag, l_linestatus, ship_date, commit_date, receipt_date, l_shipinstruct, l_shipmode, l_comment)
+
+GENERATORS = {
+    "region": generate_region_data,
+    "nation": generate_nation_data,
+    "part": generate_part_data,
+    "supplier": generate_supplier_data,
+    "partsupp": generate_partsupp_data,
+    "customer": generate_customer_data,
+    "orders": generate_orders_data,
+    "lineitem": generate_lineitem_data,
+}
+
+# Tables in the same stage only reference tables from earlier stages, so their chunks can load together
+LOAD_STAGES = [["region"], ["nation"], ["part", "supplier", "customer"], ["partsupp", "orders"], ["lineitem"]]
+
+def driving_count(table_name, scale_factor):
+    """Number of driving keys the table's chunks are cut from (parts for partsupp, orders for lineitem)."""
+    cardinalities = table_cardinalities(scale_factor)
+    return {"partsupp": cardinalities["part"], "lineitem": cardinalities["orders"]}.get(table_name, cardinalities[table_name])
+
+def table_chunks(table_name, scale_factor, chunk_size):
+    """Splits a table's driving key range into (chunk_index, start, stop) ranges."""
+    count = driving_count(table_name, scale_factor)
+    return [(index, start, min(start + chunk_size, count)) for index, start in enumerate(range(0, count, chunk_size))]
+
+def chunk_seed(table_name, chunk_index, seed=0):
+    """Seed for one chunk, derived only from (seed, table, chunk index) so it doesn't depend on who generates it."""
+    digest = hashlib.sha256(f"{seed}:{table_name}:{chunk_index}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big")
+
+def generate_chunk(table_name, scale_factor, chunk_index, start, stop, seed=0, engine="numpy"):
+    """Yields one chunk of a table with its own seeded random and Faker state, or NumPy generator."""
+    if engine == "numpy":
+        # Orders are aggregates of their lineitems, so an orders chunk and the
+        # lineitem chunk with the same index are generated from the same seed
+        seed_table = "orders" if table_name == "lineitem" else table_name
+        return vectorized.generate(table_name, scale_factor, start, stop, chunk_seed(seed_table, chunk_index, seed), text_seed=seed)
+    chunk_rng = random.Random(chunk_seed(table_name, chunk_index, seed))
+    fake.seed_instance(chunk_seed(table_name, chunk_index, seed))
+    return GENERATORS[table_name](scale_factor, start, stop, rng=chunk_rng, fake=fake)
+
+def generate_table(table_name, scale_factor, chunk_size, seed=0, engine="numpy"):
+    """Yields a whole table chunk by chunk, identical to what the parallel mode loads."""
+    for chunk_index, start, stop in table_chunks(table_name, scale_factor, chunk_size):
+        yield from generate_chunk(table_name, scale_factor, chunk_index, start, stop, seed, engine)
 
 def insert_data(conn, table_name, columns, data):
     """Inserts generated data into the specified table."""
+    data = list(data)
     if not data:
         print(f"No data to insert for {table_name}.")
         return
@@ -209,62 +221,175 @@ def insert_data(conn, table_name, columns, data):
     except Error as e:
         conn.rollback()
         print(f"Error inserting data into {table_name}: {e}")
+        raise
     finally:
         cursor.close()
 
-def main():
+def load_data(conn, table_name, data, options, verbose=True):
+    """Loads rows into table_name with the loader chosen on the command line. Returns the rows loaded; a database error is re-raised."""
+    columns = TABLE_COLUMNS[table_name]
+    start = time.perf_counter()
+    if options.loader == "copy":
+        loaded = bulk_loader.copy_data(conn, table_name, columns, data, options.copy_format, options.batch_size, verbose=verbose)
+    else:
+        loaded = 0
+        data = iter(data)
+        while True:
+            batch = list(itertools.islice(data, options.batch_size))
+            if not batch:
+                break
+            insert_data(conn, table_name, columns, batch)
+            loaded += len(batch)
+    elapsed = time.perf_counter() - start
+    if verbose and loaded and elapsed > 0:
+        print(f"  {table_name}: {loaded / elapsed:,.0f} rows/s ({options.loader})")
+    return loaded
+
+_worker_conn = None
+
+def load_chunk(table_name, chunk_index, start, stop, options):
+    """Process pool task: generates one chunk and loads it over the worker's own connection."""
+    global _worker_conn
+    if _worker_conn is None:
+        _worker_conn = get_db_connection()
+    rows = generate_chunk(table_name, options.scale_factor, chunk_index, start, stop, options.seed, options.engine)
+    return load_data(_worker_conn, table_name, rows, options, verbose=False)
+
+def load_parallel(options):
+    """Generates and loads every table's chunks across a process pool, stage by stage. Returns the number of failed chunks."""
+    with ProcessPoolExecutor(max_workers=options.workers) as executor:
+        for stage in LOAD_STAGES:
+            stage_start = time.perf_counter()
+            futures = {}
+            for table_name in stage:
+                print(f"Generating and inserting {table_name.upper()} data...")
+                for chunk_index, start, stop in table_chunks(table_name, options.scale_factor, options.chunk_size):
+                    future = executor.submit(load_chunk, table_name, chunk_index, start, stop, options)
+                    futures[future] = (table_name, chunk_index)
+            loaded = dict.fromkeys(stage, 0)
+            failed = 0
+            for future in as_completed(futures):
+                table_name, chunk_index = futures[future]
+                try:
+                    loaded[table_name] += future.result()
+                except Error as e:
+                    failed += 1
+                    print(f"Error loading {table_name} chunk {chunk_index}: {e}")
+            elapsed = time.perf_counter() - stage_start
+            for table_name in stage:
+                print(f"  {table_name}: {loaded[table_name]:,} rows, {loaded[table_name] / elapsed:,.0f} rows/s ({options.workers} workers)")
+            if failed:
+                # Later stages load rows referencing these tables, so stop here
+                print(f"{failed} chunk(s) failed in stage {', '.join(stage)}; not loading the remaining tables.")
+                return failed
+    return 0
+
+def load_all(conn, options):
+    """Generates and loads every table, across a process pool when --workers > 1. Returns the number of failed tables or chunks."""
+    if options.workers > 1:
+        return load_parallel(options)
+    # Generate and insert data for each table in dependency order; rows are
+    # generated lazily as the loader consumes them, so memory stays flat
+    for table_name in GENERATORS:
+        print(f"Generating and inserting {table_name.upper()} data...")
+        try:
+            load_data(conn, table_name, generate_table(table_name, options.scale_factor, options.chunk_size, options.seed, options.engine), options)
+        except Error:
+            # The error was printed by the loader; the tables after this one reference it
+            print(f"Loading {table_name} failed; not loading the remaining tables.")
+            return 1
+    return 0
+
+def export_chunk(table_name, chunk_index, start, stop, dataset, options):
+    """Writes one chunk to its flat file, skipping chunks a previous export of this dataset already finished."""
+    path = flat_files.chunk_path(options.output_dir, dataset, table_name, chunk_index, options.output_format)
+    if os.path.exists(path):
+        return flat_files.count_rows(path, options.output_format)
+    rows = generate_chunk(table_name, options.scale_factor, chunk_index, start, stop, options.seed, options.engine)
+    return flat_files.write_chunk(path, options.output_format, TABLE_COLUMNS[table_name], rows)
+
+def export_data(options):
+    """Generates every table into per-chunk flat files under --output-dir and writes the manifest."""
+    settings = {
+        "scale_factor": options.scale_factor,
+        "seed": options.seed,
+        "chunk_size": options.chunk_size,
+        "engine": options.engine,
+        "format": options.output_format,
+    }
+    # Chunk files live under the id of the settings that produced them
+    dataset = flat_files.dataset_id(settings)
+    tasks = [(table_name, *chunk) for table_name in GENERATORS for chunk in table_chunks(table_name, options.scale_factor, options.chunk_size)]
+    if options.workers > 1:
+        with ProcessPoolExecutor(max_workers=options.workers) as executor:
+            counts = list(executor.map(export_chunk, *zip(*tasks), [dataset] * len(tasks), [options] * len(tasks)))
+    else:
+        counts = [export_chunk(*task, dataset, options) for task in tasks]
+
+    chunks = {table_name: [] for table_name in GENERATORS}
+    for (table_name, chunk_index, _, _), count in zip(tasks, counts):
+        path = flat_files.chunk_path(options.output_dir, dataset, table_name, chunk_index, options.output_format)
+        chunks[table_name].append({"file": os.path.relpath(path, options.output_dir), "rows": count})
+    manifest = flat_files.write_manifest(options.output_dir, settings, chunks)
+    for table_name, files in chunks.items():
+        print(f"  {table_name}: {sum(entry['rows'] for entry in files):,} rows in {len(files)} {options.output_format} files")
+    print(f"Wrote dataset {manifest['dataset']} to {options.output_dir}.")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate TPC-H style data and load it into DATABASE_URL.")
+    parser.add_argument("--scale-factor", type=float, default=float(os.environ.get("TPCH_SCALE_FACTOR", "0.01")),
+                        help="TPC-H scale factor; 1 is about 1 GB (6M lineitems).")
+    parser.add_argument("--loader", choices=["copy", "insert"], default=os.environ.get("TPCH_LOADER", "copy"),
+                        help="copy streams rows through COPY FROM STDIN; insert uses executemany with ON CONFLICT DO NOTHING.")
+    parser.add_argument("--copy-format", choices=bulk_loader.COPY_FORMATS, default=os.environ.get("TPCH_COPY_FORMAT", "text"))
+    parser.add_argument("--batch-size", type=int, default=int(os.environ.get("TPCH_COPY_BATCH_SIZE", bulk_loader.DEFAULT_BATCH_SIZE)),
+                        help="Rows per COPY; each batch is committed on its own.")
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("TPCH_WORKERS", "1")),
+                        help="Processes generating and loading chunks in parallel.")
+    parser.add_argument("--chunk-size", type=int, default=int(os.environ.get("TPCH_CHUNK_SIZE", DEFAULT_CHUNK_SIZE)),
+                        help="Driving keys per chunk. The output depends on the seed and chunk size, never on --workers.")
+    parser.add_argument("--seed", type=int, default=int(os.environ.get("TPCH_SEED", "0")))
+    parser.add_argument("--engine", choices=["numpy", "faker"], default=os.environ.get("TPCH_ENGINE", "numpy"),
+                        help="numpy builds whole columns per chunk with spec value rules; faker generates row by row.")
+    parser.add_argument("--output-dir", default=os.environ.get("TPCH_OUTPUT_DIR"),
+                        help="Write per-chunk flat files and a manifest here instead of loading the database; load them with load_files.py.")
+    parser.add_argument("--output-format", choices=flat_files.FILE_FORMATS, default=os.environ.get("TPCH_OUTPUT_FORMAT", "tbl"))
+    parser.add_argument("--defer-constraints", action="store_true", default=os.environ.get("TPCH_DEFER_CONSTRAINTS", "").lower() in ("1", "true", "yes"),
+                        help="Load into bare tables, then build keys and indexes in --workers parallel sessions and ANALYZE.")
+    parser.add_argument("--truncate", action="store_true", help="With --defer-constraints, empty the TPC-H tables before loading.")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    options = parse_args(argv)
     conn = None
     try:
+        cardinalities = table_cardinalities(options.scale_factor)
+        print(f"Scale factor {options.scale_factor}: " + ", ".join(f"{table}={count:,}" for table, count in cardinalities.items()))
+
+        if options.output_dir:
+            export_data(options)
+            return
+
         conn = get_db_connection()
 
-        # Generate and insert data for each table in dependency order
-        print("Generating and inserting REGION data...")
-        region_data = generate_region_data()
-        insert_data(conn, "region", ["r_regionkey", "r_name", "r_comment"], region_data)
-        region_keys = [row[0] for row in region_data]
-
-        print("Generating and inserting NATION data...")
-        nation_data = generate_nation_data(region_keys=region_keys)
-        insert_data(conn, "nation", ["n_nationkey", "n_name", "n_regionkey", "n_comment"], nation_data)
-        nation_keys = [row[0] for row in nation_data]
-
-        print("Generating and inserting PART data...")
-        part_data = generate_part_data()
-        insert_data(conn, "part", ["p_partkey", "p_name", "p_mfgr", "p_brand", "p_type", "p_size", "p_container", "p_retailprice", "p_comment"], part_data)
-        part_keys = [row[0] for row in part_data]
-
-        print("Generating and inserting SUPPLIER data...")
-        supplier_data = generate_supplier_data(nation_keys=nation_keys)
-        insert_data(conn, "supplier", ["s_suppkey", "s_name", "s_address", "s_nationkey", "s_phone", "s_acctbal", "s_comment"], supplier_data)
-        supplier_keys = [row[0] for row in supplier_data]
-
-        print("Generating and inserting PARTSUPP data...")
-        partsupp_data = generate_partsupp_data(part_keys=part_keys, supp_keys=supplier_keys)
-        insert_data(conn, "partsupp", ["ps_partkey", "ps_suppkey", "ps_availqty", "ps_supplycost", "ps_comment"], partsupp_data)
-        part_supp_keys = [(row[0], row[1]) for row in partsupp_data]
-
-        print("Generating and inserting CUSTOMER data...")
-        customer_data = generate_customer_data(nation_keys=nation_keys)
-        insert_data(conn, "customer", ["c_custkey", "c_name", "c_address", "c_nationkey", "c_phone", "c_acctbal", "c_mktsegment", "c_comment"], customer_data)
-        customer_keys = [row[0] for row in customer_data]
-
-        print("Generating and inserting ORDERS data...")
-        orders_data = generate_orders_data(cust_keys=customer_keys)
-        insert_data(conn, "orders", ["o_orderkey", "o_custkey", "o_orderstatus", "o_totalprice", "o_orderdate", "o_orderpriority", "o_clerk", "o_shippriority", "o_comment"], orders_data)
-        order_keys = [row[0] for row in orders_data]
-
-        print("Generating and inserting LINEITEM data...")
-        lineitem_data = generate_lineitem_data(order_keys=order_keys, part_supp_keys=part_supp_keys)
-        insert_data(conn, "lineitem", ["l_orderkey", "l_partkey", "l_suppkey", "l_linenumber", "l_quantity", "l_extendedprice", "l_discount", "l_tax", "l_returnflag", "l_linestatus", "l_shipdate", "l_commitdate", "l_receiptdate", "l_shipinstruct", "l_shipmode", "l_comment"], lineitem_data)
+        if options.defer_constraints:
+            # deferred_load skips the key and index phases when the load reports failures
+            failed = schema.deferred_load(conn, get_db_connection, lambda: load_all(conn, options), options.workers, options.truncate)
+        else:
+            failed = load_all(conn, options)
 
+        if failed:
+            return 1
         print("Data generation and insertion complete.")
 
     except Exception as e:
         print(f"An error occurred during data generation: {e}")
+        return 1
     finally:
         if conn:
             conn.close()
             print("Database connection closed.")
+    return 0
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,150 @@
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from psycopg2 import Error
+
+from data_generation import flat_files, schema
+from data_generation.generate_data import LOAD_STAGES, TABLE_COLUMNS, get_db_connection
+
+# Finished chunks, keyed by the dataset id from the export manifest. A chunk's
+# row is inserted in the same transaction as its COPY, so the two can't disagree.
+MANIFEST_TABLE = "tpch_load_manifest"
+
+
+def ensure_manifest_table(conn):
+    with conn.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {MANIFEST_TABLE} ("
+            "dataset text NOT NULL, table_name text NOT NULL, chunk_file text NOT NULL, "
+            "row_count bigint NOT NULL, loaded_at timestamptz NOT NULL DEFAULT now(), "
+            "PRIMARY KEY (dataset, table_name, chunk_file))"
+        )
+    conn.commit()
+
+
+def finished_chunks(conn, dataset):
+    with conn.cursor() as cursor:
+        cursor.execute(f"SELECT table_name, chunk_file FROM {MANIFEST_TABLE} WHERE dataset = %s", (dataset,))
+        return set(cursor.fetchall())
+
+
+def forget_dataset(conn, dataset):
+    """Empties the TPC-H tables and the dataset's progress, for a load from scratch."""
+    with conn.cursor() as cursor:
+        cursor.execute(f"TRUNCATE {', '.join(TABLE_COLUMNS)} CASCADE")
+        cursor.execute(f"DELETE FROM {MANIFEST_TABLE} WHERE dataset = %s", (dataset,))
+    conn.commit()
+
+
+def load_file(conn, dataset, table_name, entry, input_dir, file_format):
+    """Loads one chunk file and records it as finished, in a single transaction."""
+    path = os.path.join(input_dir, entry["file"])
+    try:
+        with conn.cursor() as cursor:
+            copied = flat_files.copy_file(cursor, table_name, TABLE_COLUMNS[table_name], path, file_format)
+            if copied != entry["rows"]:
+                raise ValueError(f"{entry['file']} has {copied} rows but the manifest lists {entry['rows']}")
+            cursor.execute(
+                f"INSERT INTO {MANIFEST_TABLE} (dataset, table_name, chunk_file, row_count) VALUES (%s, %s, %s, %s)",
+                (dataset, table_name, entry["file"], copied),
+            )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return copied
+
+
+_worker_conn = None
+
+
+def load_file_task(dataset, table_name, entry, input_dir, file_format):
+    """Process pool task: loads one chunk file over the worker's own connection."""
+    global _worker_conn
+    if _worker_conn is None:
+        _worker_conn = get_db_connection()
+    return load_file(_worker_conn, dataset, table_name, entry, input_dir, file_format)
+
+
+def load_dataset(conn, input_dir, workers=1, fresh=False):
+    """
+    Loads an exported dataset stage by stage, skipping chunks already recorded
+    as finished. Returns the number of chunks that failed; rerunning resumes.
+    """
+    manifest = flat_files.read_manifest(input_dir)
+    dataset, file_format = manifest["dataset"], manifest["settings"]["format"]
+    ensure_manifest_table(conn)
+    if fresh:
+        forget_dataset(conn, dataset)
+    done = finished_chunks(conn, dataset)
+    print(f"Dataset {dataset} ({manifest['settings']}): {len(done)} chunks already loaded.")
+
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        for stage in LOAD_STAGES:
+            stage_start = time.perf_counter()
+            pending = [(table_name, entry) for table_name in stage for entry in manifest["tables"][table_name] if (table_name, entry["file"]) not in done]
+            if not pending:
+                continue
+            loaded = dict.fromkeys(stage, 0)
+            failed = 0
+            if executor:
+                futures = {executor.submit(load_file_task, dataset, table_name, entry, input_dir, file_format): (table_name, entry) for table_name, entry in pending}
+                outcomes = ((futures[future], future) for future in as_completed(futures))
+            else:
+                outcomes = (((table_name, entry), None) for table_name, entry in pending)
+            for (table_name, entry), future in outcomes:
+                try:
+                    loaded[table_name] += future.result() if future else load_file(conn, dataset, table_name, entry, input_dir, file_format)
+                except (Error, ValueError, OSError) as e:
+                    failed += 1
+                    print(f"Error loading {entry['file']}: {e}")
+            elapsed = time.perf_counter() - stage_start
+            for table_name in stage:
+                if loaded[table_name]:
+                    print(f"  {table_name}: {loaded[table_name]:,} rows, {loaded[table_name] / elapsed:,.0f} rows/s")
+            if failed:
+                # Later stages reference these tables, so stop here; the next run picks up the missing chunks
+                print(f"{failed} chunk(s) failed in stage {', '.join(stage)}. Rerun to resume.")
+                return failed
+    finally:
+        if executor:
+            executor.shutdown()
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load a dataset exported by generate_data.py --output-dir, resuming where a previous run stopped.")
+    parser.add_argument("input_dir")
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("TPCH_WORKERS", "1")))
+    parser.add_argument("--fresh", action="store_true", help="Truncate the TPC-H tables and forget this dataset's progress first.")
+    parser.add_argument("--defer-constraints", action="store_true",
+                        help="Load into bare tables, then build keys and indexes in --workers parallel sessions and ANALYZE.")
+    options = parser.parse_args(argv)
+
+    conn = None
+    try:
+        conn = get_db_connection()
+        if options.defer_constraints:
+            # Rows already in the tables are chunks the manifest recorded, so a resumed load may keep them
+            failed = schema.deferred_load(conn, get_db_connection, lambda: load_dataset(conn, options.input_dir, options.workers, options.fresh),
+                                          options.workers, allow_rows=True)
+        else:
+            failed = load_dataset(conn, options.input_dir, options.workers, options.fresh)
+        if failed:
+            return 1
+        print("Dataset load complete.")
+    except Exception as e:
+        print(f"An error occurred during the load: {e}")
+        return 1
+    finally:
+        if conn:
+            conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
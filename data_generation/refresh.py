@@ -0,0 +1,225 @@
+"""
+TPC-H refresh functions (clause 2.5), run as concurrent refresh streams.
+
+RF1 inserts SF * 1500 new orders with their lineitems; RF2 deletes as many of
+the oldest orders and their lineitems. New orders take the orderkeys the
+initial load leaves unused (spec.order_key slots 1-3), so refresh set n of
+RF1 inserts the n-th group of unused keys and refresh set n of RF2 deletes
+the n-th group of initial keys; after any number of pairs the tables keep
+their size. Each stream runs whole refresh sets, RF1 then RF2, in
+transactions of --batch-size orders, and every batch's latency is reported.
+
+Usage (from the repository root, against a database loaded at the same scale factor):
+
+    python -m data_generation.refresh --scale-factor 1 --streams 4 --sets-per-stream 2
+"""
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+from psycopg2 import Error
+
+from data_generation import bulk_loader, vectorized
+from data_generation.generate_data import TABLE_COLUMNS, chunk_seed, get_db_connection
+from data_generation.spec import REFRESH_SLOTS, order_key, refresh_set_size, table_cardinalities
+
+# Must match INVALIDATION_CHANNEL in tpch_api/app/cache_invalidation.py, so
+# the MCP server's result cache drops entries for the tables refreshed
+INVALIDATION_CHANNEL = "tpch_table_changed"
+
+REFRESH_FUNCTIONS = ("rf1", "rf2")
+DEFAULT_BATCH_SIZE = 100
+
+
+def key_runs(first, stop, orders):
+    """
+    Splits refresh positions [first, stop) into (slot, start, stop) runs of
+    order indexes within one key slot. Position p is order index p % orders
+    in slot p // orders: slot 0 holds the initial orders, RF1 fills 1-3.
+    """
+    while first < stop:
+        slot, index = divmod(first, orders)
+        count = min(stop - first, orders - index)
+        yield slot, index, index + count
+        first += count
+
+
+def set_batches(function, refresh_set, scale_factor, batch_size):
+    """(slot, start, stop) batches of at most batch_size orders for refresh set `refresh_set` (1-based) of RF1 or RF2."""
+    orders = table_cardinalities(scale_factor)["orders"]
+    size = refresh_set_size(scale_factor)
+    # RF1 works one slot ahead of RF2, so set n deletes what set n - 1000 (at SF 1) inserted once the initial orders are gone
+    first = (refresh_set - 1) * size + (orders if function == "rf1" else 0)
+    if first + size > (REFRESH_SLOTS + 1) * orders:
+        raise ValueError(f"refresh set {refresh_set} is past the last unused orderkey at scale factor {scale_factor}.")
+    for slot, start, stop in key_runs(first, first + size, orders):
+        for batch_start in range(start, stop, batch_size):
+            yield slot, batch_start, min(batch_start + batch_size, stop)
+
+
+def _notify(cursor, *table_names):
+    for table_name in table_names:
+        cursor.execute("SELECT pg_notify(%s, %s)", (INVALIDATION_CHANNEL, table_name))
+
+
+def rf1_batch(conn, scale_factor, slot, start, stop, seed=0, copy_format="text"):
+    """Inserts new orders [start, stop) of a key slot and their lineitems in one transaction."""
+    orders, lineitems = vectorized.refresh_orders(scale_factor, start, stop, slot, chunk_seed(f"rf1.{slot}", start, seed), seed)
+    try:
+        with conn.cursor() as cursor:
+            bulk_loader.copy_rows(cursor, "orders", TABLE_COLUMNS["orders"], orders, copy_format)
+            bulk_loader.copy_rows(cursor, "lineitem", TABLE_COLUMNS["lineitem"], lineitems, copy_format)
+            _notify(cursor, "orders", "lineitem")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return len(orders), len(lineitems)
+
+
+def rf2_batch(conn, scale_factor, slot, start, stop, seed=0, copy_format="text"):
+    """Deletes orders [start, stop) of a key slot and their lineitems in one transaction."""
+    keys = order_key(np.arange(start, stop), slot).tolist()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("DELETE FROM lineitem WHERE l_orderkey = ANY(%s)", (keys,))
+            lineitems = cursor.rowcount
+            cursor.execute("DELETE FROM orders WHERE o_orderkey = ANY(%s)", (keys,))
+            orders = cursor.rowcount
+            _notify(cursor, "orders", "lineitem")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return orders, lineitems
+
+
+BATCH_FUNCTIONS = {"rf1": rf1_batch, "rf2": rf2_batch}
+
+
+def run_refresh_set(conn, function, refresh_set, scale_factor, batch_size=DEFAULT_BATCH_SIZE, seed=0, copy_format="text"):
+    """Runs all batches of one RF1 or RF2 refresh set. Returns the orders and lineitems inserted or deleted."""
+    orders = lineitems = 0
+    for slot, start, stop in set_batches(function, refresh_set, scale_factor, batch_size):
+        batch_orders, batch_lineitems = BATCH_FUNCTIONS[function](conn, scale_factor, slot, start, stop, seed, copy_format)
+        orders += batch_orders
+        lineitems += batch_lineitems
+    return orders, lineitems
+
+
+def _error_message(error):
+    # A database error's first line says what went wrong; anything else is named by its type
+    if isinstance(error, Error):
+        return str(error).strip().splitlines()[0]
+    return f"{type(error).__name__}: {error}"
+
+
+def run_stream(stream, refresh_sets, options):
+    """
+    Runs refresh sets on the stream's own connection. Returns one record per
+    batch, and one per refresh set whose batches couldn't be planned at all.
+    """
+    conn = get_db_connection()
+    records = []
+    try:
+        for refresh_set in refresh_sets:
+            for function in options.functions:
+                try:
+                    batches = list(set_batches(function, refresh_set, options.scale_factor, options.batch_size))
+                except ValueError as e:
+                    records.append({"stream": stream, "set": refresh_set, "function": function, "batch": None,
+                                    "orders": 0, "lineitems": 0, "error": _error_message(e), "seconds": None})
+                    print(f"  stream {stream} set {refresh_set} {function} FAILED: {e}")
+                    continue
+                for batch, (slot, start, stop) in enumerate(batches):
+                    record = {"stream": stream, "set": refresh_set, "function": function, "batch": batch, "orders": 0, "lineitems": 0, "error": None}
+                    batch_start = time.perf_counter()
+                    try:
+                        record["orders"], record["lineitems"] = BATCH_FUNCTIONS[function](
+                            conn, options.scale_factor, slot, start, stop, options.seed, options.copy_format)
+                    except Exception as e:
+                        record["error"] = _error_message(e)
+                    record["seconds"] = time.perf_counter() - batch_start
+                    records.append(record)
+                    if not options.quiet or record["error"]:
+                        print(f"  stream {stream} set {refresh_set} {function} batch {batch}: {record['orders']} orders, "
+                              f"{record['lineitems']} lineitems, {record['seconds'] * 1000:.1f} ms"
+                              + (f" FAILED: {record['error']}" if record["error"] else ""))
+    finally:
+        conn.close()
+    return records
+
+
+def print_summary(records, elapsed):
+    print(f"{'function':>8} {'batches':>8} {'errors':>7} {'orders':>9} {'lineitems':>10} "
+          f"{'mean ms':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for function in REFRESH_FUNCTIONS:
+        # Refresh sets that never got to run a batch have no latency
+        selected = [record for record in records if record["function"] == function and record["seconds"] is not None]
+        if not selected:
+            continue
+        latencies = np.array([record["seconds"] for record in selected]) * 1000
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        print(f"{function:>8} {len(selected):>8} {sum(1 for record in selected if record['error']):>7} "
+              f"{sum(record['orders'] for record in selected):>9} {sum(record['lineitems'] for record in selected):>10} "
+              f"{latencies.mean():>9.1f} {p50:>8.1f} {p95:>8.1f} {p99:>8.1f} {latencies.max():>8.1f}")
+    batches = sum(1 for record in records if record["seconds"] is not None)
+    print(f"{batches} batches in {elapsed:.2f}s ({batches / elapsed:,.1f} batches/s)")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run TPC-H refresh functions RF1/RF2 as concurrent refresh streams.")
+    parser.add_argument("--scale-factor", type=float, default=float(os.environ.get("TPCH_SCALE_FACTOR", "0.01")),
+                        help="Scale factor the database was loaded at; sets the refresh set size and orderkeys.")
+    parser.add_argument("--streams", type=int, default=1, help="Concurrent refresh streams, each on its own connection.")
+    parser.add_argument("--sets-per-stream", type=int, default=1)
+    parser.add_argument("--first-set", type=int, default=1,
+                        help="First refresh set to run. Stream s runs the sets after those of streams 0..s-1; "
+                             "a set's RF1 can only be applied once, so continue from the next unused set.")
+    parser.add_argument("--functions", nargs="+", choices=REFRESH_FUNCTIONS, default=list(REFRESH_FUNCTIONS))
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Orders per transaction.")
+    parser.add_argument("--copy-format", choices=bulk_loader.COPY_FORMATS, default=os.environ.get("TPCH_COPY_FORMAT", "text"))
+    parser.add_argument("--seed", type=int, default=int(os.environ.get("TPCH_SEED", "0")))
+    parser.add_argument("--quiet", action="store_true", help="Only print failed batches and the summary.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Runs the refresh streams. Returns 1 if a batch, refresh set or stream failed, 0 otherwise."""
+    options = parse_args(argv)
+    size = refresh_set_size(options.scale_factor)
+    streams = {
+        stream: range(options.first_set + stream * options.sets_per_stream, options.first_set + (stream + 1) * options.sets_per_stream)
+        for stream in range(options.streams)
+    }
+    print(f"{options.streams} refresh stream(s), {size} orders per set: "
+          + ", ".join(f"stream {stream} sets {sets.start}-{sets.stop - 1}" for stream, sets in streams.items()))
+
+    # Build the text pool up front so it isn't charged to the first RF1 batch
+    vectorized.text_pool(options.seed)
+    records = []
+    stopped = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=options.streams) as executor:
+        futures = {executor.submit(run_stream, stream, sets, options): stream for stream, sets in streams.items()}
+        for future in as_completed(futures):
+            try:
+                records.extend(future.result())
+            except Exception as e:
+                stopped += 1
+                print(f"Refresh stream {futures[future]} stopped: {e}")
+    if any(record["seconds"] is not None for record in records):
+        print_summary(records, time.perf_counter() - start)
+    failed_sets = sorted({(record["set"], record["function"]) for record in records if record["error"]})
+    if failed_sets or stopped:
+        print(f"Failed: {len(failed_sets)} refresh set(s) ({', '.join(f'{function} set {refresh_set}' for refresh_set, function in failed_sets)}), "
+              f"{stopped} stream(s) stopped.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
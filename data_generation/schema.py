@@ -0,0 +1,201 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# The tables as tpch_api/app/models.py declares them, but without any
+# constraint beyond NOT NULL. Single-column integer keys are serial, as
+# db.create_all() makes them, so the finished schema is the same either way.
+TABLE_DDL = {
+    "region": "r_regionkey serial NOT NULL, r_name varchar(25) NOT NULL, r_comment varchar(152)",
+    "nation": "n_nationkey serial NOT NULL, n_name varchar(25) NOT NULL, n_regionkey integer NOT NULL, n_comment varchar(152)",
+    "part": "p_partkey serial NOT NULL, p_name varchar(55) NOT NULL, p_mfgr varchar(25) NOT NULL, p_brand varchar(10) NOT NULL, "
+            "p_type varchar(25) NOT NULL, p_size integer NOT NULL, p_container varchar(10) NOT NULL, p_retailprice numeric NOT NULL, "
+            "p_comment varchar(23) NOT NULL",
+    "supplier": "s_suppkey serial NOT NULL, s_name varchar(25) NOT NULL, s_address varchar(40) NOT NULL, s_nationkey integer NOT NULL, "
+                "s_phone varchar(15) NOT NULL, s_acctbal numeric NOT NULL, s_comment varchar(101) NOT NULL",
+    "partsupp": "ps_partkey integer NOT NULL, ps_suppkey integer NOT NULL, ps_availqty integer NOT NULL, ps_supplycost numeric NOT NULL, "
+                "ps_comment varchar(199) NOT NULL",
+    "customer": "c_custkey serial NOT NULL, c_name varchar(25) NOT NULL, c_address varchar(40) NOT NULL, c_nationkey integer NOT NULL, "
+                "c_phone varchar(15) NOT NULL, c_acctbal numeric NOT NULL, c_mktsegment varchar(10) NOT NULL, c_comment varchar(117) NOT NULL",
+    "orders": "o_orderkey serial NOT NULL, o_custkey integer NOT NULL, o_orderstatus varchar(1) NOT NULL, o_totalprice numeric NOT NULL, "
+              "o_orderdate date NOT NULL, o_orderpriority varchar(15) NOT NULL, o_clerk varchar(15) NOT NULL, o_shippriority integer NOT NULL, "
+              "o_comment varchar(79) NOT NULL",
+    "lineitem": "l_orderkey integer NOT NULL, l_partkey integer NOT NULL, l_suppkey integer NOT NULL, l_linenumber integer NOT NULL, "
+                "l_quantity numeric NOT NULL, l_extendedprice numeric NOT NULL, l_discount numeric NOT NULL, l_tax numeric NOT NULL, "
+                "l_returnflag varchar(1) NOT NULL, l_linestatus varchar(1) NOT NULL, l_shipdate date NOT NULL, l_commitdate date NOT NULL, "
+                "l_receiptdate date NOT NULL, l_shipinstruct varchar(25) NOT NULL, l_shipmode varchar(10) NOT NULL, l_comment varchar(44) NOT NULL",
+}
+
+PRIMARY_KEYS = {
+    "region": ["r_regionkey"],
+    "nation": ["n_nationkey"],
+    "part": ["p_partkey"],
+    "supplier": ["s_suppkey"],
+    "partsupp": ["ps_partkey", "ps_suppkey"],
+    "customer": ["c_custkey"],
+    "orders": ["o_orderkey"],
+    "lineitem": ["l_orderkey", "l_partkey", "l_suppkey", "l_linenumber"],
+}
+
+# (table, columns, referenced table, referenced columns), named the way
+# PostgreSQL names the constraints db.create_all() leaves unnamed
+FOREIGN_KEYS = [
+    ("nation", ["n_regionkey"], "region", ["r_regionkey"]),
+    ("supplier", ["s_nationkey"], "nation", ["n_nationkey"]),
+    ("partsupp", ["ps_partkey"], "part", ["p_partkey"]),
+    ("partsupp", ["ps_suppkey"], "supplier", ["s_suppkey"]),
+    ("customer", ["c_nationkey"], "nation", ["n_nationkey"]),
+    ("orders", ["o_custkey"], "customer", ["c_custkey"]),
+    ("lineitem", ["l_orderkey"], "orders", ["o_orderkey"]),
+    ("lineitem", ["l_partkey", "l_suppkey"], "partsupp", ["ps_partkey", "ps_suppkey"]),
+]
+
+# Secondary indexes on foreign key and date columns, the ones TPC-H allows.
+# Foreign keys already covered by a primary key prefix are left out.
+SECONDARY_INDEXES = {
+    "idx_nation_n_regionkey": ("nation", ["n_regionkey"]),
+    "idx_supplier_s_nationkey": ("supplier", ["s_nationkey"]),
+    "idx_partsupp_ps_suppkey": ("partsupp", ["ps_suppkey"]),
+    "idx_customer_c_nationkey": ("customer", ["c_nationkey"]),
+    "idx_orders_o_custkey": ("orders", ["o_custkey"]),
+    "idx_orders_o_orderdate": ("orders", ["o_orderdate"]),
+    "idx_lineitem_l_partkey_l_suppkey": ("lineitem", ["l_partkey", "l_suppkey"]),
+    "idx_lineitem_l_shipdate": ("lineitem", ["l_shipdate"]),
+}
+
+# Sort memory for each index and constraint build session
+MAINTENANCE_WORK_MEM = os.environ.get("TPCH_MAINTENANCE_WORK_MEM", "512MB")
+
+
+def foreign_key_name(table_name, columns):
+    return f"{table_name}_{'_'.join(columns)}_fkey"
+
+
+def _table_exists(cursor, table_name):
+    cursor.execute("SELECT to_regclass(%s) IS NOT NULL", (table_name,))
+    return cursor.fetchone()[0]
+
+
+def prepare_bare_tables(conn, truncate=False, allow_rows=False):
+    """
+    Leaves every TPC-H table without keys or secondary indexes: missing tables
+    are created bare, existing ones (e.g. from db.create_all()) have their
+    foreign keys, primary keys and secondary indexes dropped. Refuses to go on
+    if a table has rows, unless it is truncated or allow_rows is set.
+    """
+    with conn.cursor() as cursor:
+        for table_name, columns in TABLE_DDL.items():
+            if not _table_exists(cursor, table_name):
+                cursor.execute(f"CREATE TABLE {table_name} ({columns})")
+        # Foreign keys first: a primary key can't be dropped while one references it
+        for table_name, columns, _, _ in FOREIGN_KEYS:
+            cursor.execute(f"ALTER TABLE {table_name} DROP CONSTRAINT IF EXISTS {foreign_key_name(table_name, columns)}")
+        for table_name in PRIMARY_KEYS:
+            cursor.execute(f"ALTER TABLE {table_name} DROP CONSTRAINT IF EXISTS {table_name}_pkey")
+        for index_name in SECONDARY_INDEXES:
+            cursor.execute(f"DROP INDEX IF EXISTS {index_name}")
+        if truncate:
+            cursor.execute(f"TRUNCATE {', '.join(TABLE_DDL)}")
+        elif not allow_rows:
+            for table_name in TABLE_DDL:
+                cursor.execute(f"SELECT EXISTS (SELECT 1 FROM {table_name})")
+                if cursor.fetchone()[0]:
+                    conn.rollback()
+                    raise ValueError(f"Table {table_name} already has rows; pass --truncate to empty the TPC-H tables first.")
+    conn.commit()
+
+
+def primary_key_statements():
+    return [
+        (f"{table_name}_pkey", f"ALTER TABLE {table_name} ADD CONSTRAINT {table_name}_pkey PRIMARY KEY ({', '.join(columns)})")
+        for table_name, columns in PRIMARY_KEYS.items()
+    ]
+
+
+def index_statements():
+    return [
+        (index_name, f"CREATE INDEX {index_name} ON {table_name} ({', '.join(columns)})")
+        for index_name, (table_name, columns) in SECONDARY_INDEXES.items()
+    ]
+
+
+def foreign_key_statements():
+    statements = []
+    for table_name, columns, referenced_table, referenced_columns in FOREIGN_KEYS:
+        name = foreign_key_name(table_name, columns)
+        statements.append((name, f"ALTER TABLE {table_name} ADD CONSTRAINT {name} FOREIGN KEY ({', '.join(columns)}) "
+                                 f"REFERENCES {referenced_table} ({', '.join(referenced_columns)})"))
+    return statements
+
+
+def analyze_statements():
+    return [(table_name, f"ANALYZE {table_name}") for table_name in TABLE_DDL]
+
+
+def _run_statement(connect, name, statement):
+    conn = connect()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SET maintenance_work_mem = %s", (MAINTENANCE_WORK_MEM,))
+            start = time.perf_counter()
+            cursor.execute(statement)
+        conn.commit()
+        return time.perf_counter() - start
+    finally:
+        conn.close()
+
+
+def run_parallel(connect, statements, workers):
+    """
+    Runs independent DDL statements, each in its own session, at most `workers`
+    at a time. Prints each statement's time as it finishes; raises the first
+    failure once the others are done.
+    """
+    failures = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {executor.submit(_run_statement, connect, name, statement): name for name, statement in statements}
+        for future in as_completed(futures):
+            try:
+                print(f"    {futures[future]}: {future.result():.2f}s")
+            except Exception as e:
+                print(f"    {futures[future]} failed: {e}")
+                failures.append(e)
+    if failures:
+        raise failures[0]
+
+
+def deferred_load(conn, connect, load, workers=1, truncate=False, allow_rows=False):
+    """
+    Initial load with keys and indexes built afterwards: bare tables, load()
+    into them, then primary keys, secondary indexes and foreign keys in
+    parallel sessions, and ANALYZE. Foreign keys come after the primary keys
+    they reference. Prints the time of each phase and returns load()'s result.
+    """
+    phases = [
+        ("bare tables", lambda: prepare_bare_tables(conn, truncate, allow_rows)),
+        ("load", load),
+        ("primary keys", lambda: run_parallel(connect, primary_key_statements(), workers)),
+        ("secondary indexes", lambda: run_parallel(connect, index_statements(), workers)),
+        ("foreign keys", lambda: run_parallel(connect, foreign_key_statements(), workers)),
+        ("analyze", lambda: run_parallel(connect, analyze_statements(), workers)),
+    ]
+    timings = {}
+    load_result = None
+    for name, run in phases:
+        print(f"Phase: {name}")
+        start = time.perf_counter()
+        result = run()
+        timings[name] = time.perf_counter() - start
+        if name != "load":
+            continue
+        load_result = result
+        if result:
+            # A failed load leaves the tables bare; building keys over partial data would only hide it
+            print(f"Load reported {result} failure(s); skipping the constraint and index phases.")
+            break
+
+    print(f"{'phase':<18} {'seconds':>9}")
+    for name, elapsed in timings.items():
+        print(f"{name:<18} {elapsed:>9.2f}")
+    print(f"{'total':<18} {sum(timings.values()):>9.2f}")
+    return load_result
@@ -0,0 +1,56 @@
+# Constants and key formulas from the TPC-H specification, shared by the Faker and NumPy generators
+
+# Spec (clause 4.2.3) names for the fixed-size tables; nation entries are (name, regionkey)
+REGIONS = ["AFRICA", "AMERICA", "ASIA", "EUROPE", "MIDDLE EAST"]
+NATIONS = [
+    ("ALGERIA", 0), ("ARGENTINA", 1), ("BRAZIL", 1), ("CANADA", 1), ("EGYPT", 4), ("ETHIOPIA", 0),
+    ("FRANCE", 3), ("GERMANY", 3), ("INDIA", 2), ("INDONESIA", 2), ("IRAN", 4), ("IRAQ", 4),
+    ("JAPAN", 2), ("JORDAN", 4), ("KENYA", 0), ("MOROCCO", 0), ("MOZAMBIQUE", 0), ("PERU", 1),
+    ("CHINA", 2), ("ROMANIA", 3), ("SAUDI ARABIA", 4), ("VIETNAM", 2), ("RUSSIA", 3),
+    ("UNITED KINGDOM", 3), ("UNITED STATES", 1),
+]
+SUPPLIERS_PER_PART = 4
+MAX_LINES_PER_ORDER = 7
+
+
+def table_cardinalities(scale_factor):
+    """Row counts per table at the given scale factor (clause 4.2.5). Lineitem is approximate: 1-7 lines per order."""
+    if scale_factor <= 0:
+        raise ValueError("scale factor must be positive")
+    suppliers = int(scale_factor * 10000)
+    if suppliers < SUPPLIERS_PER_PART:
+        raise ValueError(f"scale factor {scale_factor} is too small: partsupp needs at least {SUPPLIERS_PER_PART} suppliers")
+    parts = int(scale_factor * 200000)
+    orders = int(scale_factor * 1500000)
+    return {
+        "region": len(REGIONS),
+        "nation": len(NATIONS),
+        "part": parts,
+        "supplier": suppliers,
+        "partsupp": parts * SUPPLIERS_PER_PART,
+        "customer": int(scale_factor * 150000),
+        "orders": orders,
+        "lineitem": orders * (MAX_LINES_PER_ORDER + 1) // 2,
+    }
+
+
+REFRESH_SLOTS = 3
+
+
+def order_key(index, slot=0):
+    """
+    Orderkeys are sparse: only the first 8 of every 32 keys are used (clause 4.2.3),
+    leaving room for refresh inserts. Slots 1-3 are the other groups of 8 in each
+    block of 32, which RF1 fills. Works on ints and NumPy arrays alike.
+    """
+    return (index // 8) * 32 + slot * 8 + index % 8 + 1
+
+
+def refresh_set_size(scale_factor):
+    """Orders inserted by one RF1, and deleted by one RF2 (clause 2.5.2)."""
+    return max(1, int(scale_factor * 1500))
+
+
+def partsupp_suppkey(partkey, i, suppliers):
+    """The i-th (0-3) supplier of a part, from the spec's PS_SUPPKEY formula."""
+    return (partkey + i * (suppliers // 4 + (partkey - 1) // suppliers)) % suppliers + 1
@@ -0,0 +1,383 @@
+import os
+import functools
+
+import numpy as np
+
+from data_generation.spec import REGIONS, NATIONS, SUPPLIERS_PER_PART, MAX_LINES_PER_ORDER, table_cardinalities, order_key, partsupp_suppkey
+
+# Word lists of the pseudo-text grammar (clause 4.2.2.13). The spec weights the
+# lists non-uniformly; dbgen's weights aren't in the spec text, so they're uniform here.
+NOUNS = [
+    "foxes", "ideas", "theodolites", "pinto beans", "instructions", "dependencies", "excuses", "platelets",
+    "asymptotes", "courts", "dolphins", "multipliers", "sauternes", "warthogs", "frets", "dinos",
+    "attainments", "somas", "Tiresias'", "patterns", "forges", "braids", "hockey players", "frays",
+    "warhorses", "dugouts", "notornis", "epitaphs", "pearls", "tithes", "waters", "orbits",
+    "gifts", "sheaves", "depths", "sentiments", "decoys", "realms", "pains", "grouches", "escapades",
+]
+VERBS = [
+    "sleep", "wake", "are", "cajole", "haggle", "nag", "use", "boost", "affix", "detect", "integrate", "maintain",
+    "nod", "was", "lose", "sublate", "solve", "thrash", "promise", "engage", "hinder", "print", "x-ray", "breach",
+    "eat", "grow", "impress", "mold", "poach", "serve", "run", "dazzle", "snooze", "doze", "unwind", "kindle",
+    "play", "hang", "believe", "doubt",
+]
+ADJECTIVES = [
+    "furious", "sly", "careful", "blithe", "quick", "fluffy", "slow", "quiet", "ruthless", "thin", "close", "dogged",
+    "daring", "brave", "stealthy", "permanent", "enticing", "idle", "busy", "regular", "final", "ironic", "even",
+    "bold", "silent",
+]
+ADVERBS = [
+    "sometimes", "always", "never", "furiously", "slyly", "carefully", "blithely", "quickly", "fluffily", "slowly",
+    "quietly", "ruthlessly", "thinly", "closely", "doggedly", "daringly", "bravely", "stealthily", "permanently",
+    "enticingly", "idly", "busily", "regularly", "finally", "ironically", "evenly", "boldly", "silently",
+]
+PREPOSITIONS = [
+    "about", "above", "according to", "across", "after", "against", "along", "alongside of", "among", "around",
+    "at", "atop", "before", "behind", "beneath", "beside", "besides", "between", "beyond", "by", "despite",
+    "during", "except for", "from", "in place of", "inside", "instead of", "into", "near", "of", "on", "outside",
+    "over", "past", "since", "through", "throughout", "to", "toward", "under", "until", "up", "upon", "without",
+    "with", "within",
+]
+AUXILIARIES = [
+    "do", "may", "might", "shall", "will", "would", "can", "could", "should", "ought to", "must", "will have to",
+    "shall have to", "could have to", "should have to", "must have to", "need to", "try to",
+]
+TERMINATORS = [".", ";", ":", "?", "!", "--"]
+
+# Other value lists from clause 4.2.2.13 and 4.2.3
+COLORS = [
+    "almond", "antique", "aquamarine", "azure", "beige", "bisque", "black", "blanched", "blue", "blush", "brown",
+    "burlywood", "burnished", "chartreuse", "chiffon", "chocolate", "coral", "cornflower", "cornsilk", "cream",
+    "cyan", "dark", "deep", "dim", "dodger", "drab", "firebrick", "floral", "forest", "frosted", "gainsboro",
+    "ghost", "goldenrod", "green", "grey", "honeydew", "hot", "indian", "ivory", "khaki", "lace", "lavender",
+    "lawn", "lemon", "light", "lime", "linen", "magenta", "maroon", "medium", "metallic", "midnight", "mint",
+    "misty", "moccasin", "navajo", "navy", "olive", "orange", "orchid", "pale", "papaya", "peach", "peru", "pink",
+    "plum", "powder", "puff", "purple", "red", "rose", "rosy", "royal", "saddle", "salmon", "sandy", "seashell",
+    "sienna", "sky", "slate", "smoke", "snow", "spring", "steel", "tan", "thistle", "tomato", "turquoise",
+    "violet", "wheat", "white", "yellow",
+]
+TYPES = [
+    f"{a} {b} {c}"
+    for a in ["STANDARD", "SMALL", "MEDIUM", "LARGE", "ECONOMY", "PROMO"]
+    for b in ["ANODIZED", "BURNISHED", "PLATED", "POLISHED", "BRUSHED"]
+    for c in ["TIN", "NICKEL", "BRASS", "STEEL", "COPPER"]
+]
+CONTAINERS = [f"{a} {b}" for a in ["SM", "LG", "MED", "JUMBO", "WRAP"] for b in ["CASE", "BOX", "BAG", "JAR", "PKG", "PACK", "CAN", "DRUM"]]
+SEGMENTS = ["AUTOMOBILE", "BUILDING", "FURNITURE", "MACHINERY", "HOUSEHOLD"]
+PRIORITIES = ["1-URGENT", "2-HIGH", "3-MEDIUM", "4-NOT SPECIFIED", "5-LOW"]
+INSTRUCTIONS = ["DELIVER IN PERSON", "COLLECT COD", "NONE", "TAKE BACK RETURN"]
+MODES = ["REG AIR", "AIR", "RAIL", "SHIP", "TRUCK", "MAIL", "FOB"]
+VSTRING_CHARACTERS = "0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ,. "
+
+START_DATE = np.datetime64("1992-01-01")
+CURRENT_DATE = np.datetime64("1995-06-17")
+LAST_ORDER_DATE = np.datetime64("1998-12-31") - np.timedelta64(151, "D")
+
+# dbgen cuts comments from a 300 MB text; a few MB gives the same distribution at a fraction of the build time
+TEXT_POOL_SIZE = int(os.environ.get("TPCH_TEXT_POOL_SIZE", str(4 * 1024 * 1024)))
+
+
+def _noun_phrase(rng):
+    form = rng.integers(4)
+    noun = NOUNS[rng.integers(len(NOUNS))]
+    if form == 0:
+        return noun
+    adjective = ADJECTIVES[rng.integers(len(ADJECTIVES))]
+    if form == 1:
+        return f"{adjective} {noun}"
+    if form == 2:
+        return f"{adjective}, {ADJECTIVES[rng.integers(len(ADJECTIVES))]} {noun}"
+    return f"{ADVERBS[rng.integers(len(ADVERBS))]} {adjective} {noun}"
+
+
+def _verb_phrase(rng):
+    form = rng.integers(4)
+    verb = VERBS[rng.integers(len(VERBS))]
+    if form == 1 or form == 3:
+        verb = f"{AUXILIARIES[rng.integers(len(AUXILIARIES))]} {verb}"
+    if form >= 2:
+        verb = f"{verb} {ADVERBS[rng.integers(len(ADVERBS))]}"
+    return verb
+
+
+def _prepositional_phrase(rng):
+    return f"{PREPOSITIONS[rng.integers(len(PREPOSITIONS))]} the {_noun_phrase(rng)}"
+
+
+def _sentence(rng):
+    form = rng.integers(5)
+    terminator = TERMINATORS[rng.integers(len(TERMINATORS))]
+    if form == 0:
+        words = [_noun_phrase(rng), _verb_phrase(rng)]
+    elif form == 1:
+        words = [_noun_phrase(rng), _verb_phrase(rng), _prepositional_phrase(rng)]
+    elif form == 2:
+        words = [_noun_phrase(rng), _verb_phrase(rng), _noun_phrase(rng)]
+    elif form == 3:
+        words = [_noun_phrase(rng), _prepositional_phrase(rng), _verb_phrase(rng), _noun_phrase(rng)]
+    else:
+        words = [_noun_phrase(rng), _prepositional_phrase(rng), _verb_phrase(rng), _prepositional_phrase(rng)]
+    return " ".join(words) + terminator
+
+
+@functools.lru_cache(maxsize=4)
+def text_pool(seed=0, size=TEXT_POOL_SIZE):
+    """Pseudo text from the clause 4.2.2.14 grammar; comments are random substrings of it."""
+    rng = np.random.default_rng(seed)
+    sentences = []
+    length = 0
+    while length < size:
+        sentence = _sentence(rng)
+        sentences.append(sentence)
+        length += len(sentence) + 1
+    return " ".join(sentences)[:size]
+
+
+def text_column(rng, count, minimum, maximum, seed=0):
+    """text string[minimum, maximum]: substrings of the text pool at random offsets."""
+    pool = text_pool(seed)
+    lengths = rng.integers(minimum, maximum + 1, count)
+    offsets = rng.integers(0, len(pool) - maximum, count)
+    return [pool[offset:offset + length] for offset, length in zip(offsets.tolist(), lengths.tolist())]
+
+
+def vstring_column(rng, count, minimum, maximum):
+    """v-string[minimum, maximum]: random characters, with an average length of (minimum + maximum) / 2."""
+    lengths = rng.integers(minimum, maximum + 1, count)
+    characters = np.frombuffer(VSTRING_CHARACTERS.encode("ascii"), dtype=np.uint8)
+    text = characters[rng.integers(0, len(characters), int(lengths.sum()))].tobytes().decode("ascii")
+    ends = np.cumsum(lengths).tolist()
+    return [text[end - length:end] for end, length in zip(ends, lengths.tolist())]
+
+
+def choice_column(rng, values, count):
+    """Categorical column: one random code per row, mapped through the value list."""
+    return np.asarray(values, dtype=object)[rng.integers(0, len(values), count)].tolist()
+
+
+def money_column(rng, low_cents, high_cents, count):
+    return (rng.integers(low_cents, high_cents + 1, count) / 100).tolist()
+
+
+def keyed_names(prefix, keys):
+    return [f"{prefix}{key:09d}" for key in keys.tolist()]
+
+
+def phone_column(rng, nation_keys):
+    """Phone numbers per clause 4.2.2.9: the country code is the nation key + 10."""
+    count = len(nation_keys)
+    parts = zip((nation_keys + 10).tolist(), rng.integers(100, 1000, count).tolist(), rng.integers(100, 1000, count).tolist(), rng.integers(1000, 10000, count).tolist())
+    return [f"{country}-{first}-{second}-{third}" for country, first, second, third in parts]
+
+
+def date_column(days):
+    return days.astype("datetime64[D]").tolist()
+
+
+def retail_price_cents(partkeys):
+    """P_RETAILPRICE * 100, from the spec's formula on the part key."""
+    return 90000 + (partkeys // 10) % 20001 + 100 * (partkeys % 1000)
+
+
+def region_columns(cardinalities, start, stop, rng, seed):
+    keys = np.arange(start, stop)
+    return [keys.tolist(), [REGIONS[key] for key in keys.tolist()], text_column(rng, len(keys), 31, 115, seed)]
+
+
+def nation_columns(cardinalities, start, stop, rng, seed):
+    keys = np.arange(start, stop)
+    return [
+        keys.tolist(),
+        [NATIONS[key][0] for key in keys.tolist()],
+        [NATIONS[key][1] for key in keys.tolist()],
+        text_column(rng, len(keys), 31, 114, seed),
+    ]
+
+
+def part_columns(cardinalities, start, stop, rng, seed):
+    keys = np.arange(start + 1, stop + 1)
+    count = len(keys)
+    # Five distinct colors per name: the first five columns of a per-row random permutation
+    color_indexes = rng.random((count, len(COLORS))).argsort(axis=1)[:, :5]
+    colors = np.asarray(COLORS, dtype=object)[color_indexes]
+    manufacturers = rng.integers(1, 6, count)
+    brands = manufacturers * 10 + rng.integers(1, 6, count)
+    return [
+        keys.tolist(),
+        [" ".join(row) for row in colors.tolist()],
+        [f"Manufacturer#{m}" for m in manufacturers.tolist()],
+        [f"Brand#{b}" for b in brands.tolist()],
+        choice_column(rng, TYPES, count),
+        rng.integers(1, 51, count).tolist(),
+        choice_column(rng, CONTAINERS, count),
+        (retail_price_cents(keys) / 100).tolist(),
+        text_column(rng, count, 5, 22, seed),
+    ]
+
+
+def supplier_columns(cardinalities, start, stop, rng, seed):
+    keys = np.arange(start + 1, stop + 1)
+    count = len(keys)
+    nation_keys = rng.integers(0, len(NATIONS), count)
+    comments = text_column(rng, count, 25, 100, seed)
+    # About SF * 5 suppliers each get a "Customer ... Complaints" or "Customer ... Recommends" comment (used by Q16)
+    for row in np.flatnonzero(rng.random(count) < 0.001).tolist():
+        comment = comments[row]
+        insert_at = int(rng.integers(0, max(1, len(comment) - 20)))
+        marker = "Customer Complaints" if rng.random() < 0.5 else "Customer Recommends"
+        comments[row] = (comment[:insert_at] + marker + comment[insert_at + len(marker):])[:100]
+    return [
+        keys.tolist(),
+        keyed_names("Supplier#", keys),
+        vstring_column(rng, count, 10, 40),
+        nation_keys.tolist(),
+        phone_column(rng, nation_keys),
+        money_column(rng, -99999, 999999, count),
+        comments,
+    ]
+
+
+def partsupp_columns(cardinalities, start, stop, rng, seed):
+    partkeys = np.repeat(np.arange(start + 1, stop + 1), SUPPLIERS_PER_PART)
+    count = len(partkeys)
+    suppkeys = partsupp_suppkey(partkeys, np.tile(np.arange(SUPPLIERS_PER_PART), stop - start), cardinalities["supplier"])
+    return [
+        partkeys.tolist(),
+        suppkeys.tolist(),
+        rng.integers(1, 10000, count).tolist(),
+        money_column(rng, 100, 100000, count),
+        text_column(rng, count, 49, 198, seed),
+    ]
+
+
+def customer_columns(cardinalities, start, stop, rng, seed):
+    keys = np.arange(start + 1, stop + 1)
+    count = len(keys)
+    nation_keys = rng.integers(0, len(NATIONS), count)
+    return [
+        keys.tolist(),
+        keyed_names("Customer#", keys),
+        vstring_column(rng, count, 10, 40),
+        nation_keys.tolist(),
+        phone_column(rng, nation_keys),
+        money_column(rng, -99999, 999999, count),
+        choice_column(rng, SEGMENTS, count),
+        text_column(rng, count, 29, 116, seed),
+    ]
+
+
+def _orders_and_lineitems(cardinalities, start, stop, rng, seed, scale_factor, slot=0):
+    """
+    Builds an orders chunk and its lineitems together: O_ORDERSTATUS and
+    O_TOTALPRICE are aggregates of the order's lines, so both tables are
+    drawn from the same seed and the lineitem chunk recomputes the orders.
+    Refresh inserts use the same rules with orderkeys from another slot.
+    """
+    indexes = np.arange(start, stop)
+    count = len(indexes)
+    orderkeys = order_key(indexes, slot)
+    # The n-th customer key (0-based) that isn't divisible by 3 is n + n // 2 + 1
+    customers = cardinalities["customer"]
+    eligible = rng.integers(0, customers - customers // 3, count)
+    custkeys = eligible + eligible // 2 + 1
+    order_days = START_DATE + rng.integers(0, int((LAST_ORDER_DATE - START_DATE).astype(int)) + 1, count).astype("timedelta64[D]")
+
+    lines_per_order = rng.integers(1, MAX_LINES_PER_ORDER + 1, count)
+    line_count = int(lines_per_order.sum())
+    order_positions = np.repeat(np.arange(count), lines_per_order)
+    line_starts = np.cumsum(lines_per_order) - lines_per_order
+    linenumbers = np.arange(line_count) - np.repeat(line_starts, lines_per_order) + 1
+
+    partkeys = rng.integers(1, cardinalities["part"] + 1, line_count)
+    suppkeys = partsupp_suppkey(partkeys, rng.integers(0, SUPPLIERS_PER_PART, line_count), cardinalities["supplier"])
+    quantities = rng.integers(1, 51, line_count)
+    extended_cents = quantities * retail_price_cents(partkeys)
+    discounts = rng.integers(0, 11, line_count)
+    taxes = rng.integers(0, 9, line_count)
+    line_order_days = order_days[order_positions]
+    ship_days = line_order_days + rng.integers(1, 122, line_count).astype("timedelta64[D]")
+    commit_days = line_order_days + rng.integers(30, 91, line_count).astype("timedelta64[D]")
+    receipt_days = ship_days + rng.integers(1, 31, line_count).astype("timedelta64[D]")
+    returned = rng.integers(0, 2, line_count)
+    returnflags = np.where(receipt_days <= CURRENT_DATE, np.where(returned == 1, "R", "A"), "N")
+    open_lines = ship_days > CURRENT_DATE
+
+    open_per_order = np.bincount(order_positions, weights=open_lines, minlength=count)
+    statuses = np.where(open_per_order == 0, "F", np.where(open_per_order == lines_per_order, "O", "P"))
+    charges = extended_cents / 100 * (1 + taxes / 100) * (1 - discounts / 100)
+    totals = np.round(np.bincount(order_positions, weights=charges, minlength=count), 2)
+
+    orders = [
+        orderkeys.tolist(),
+        custkeys.tolist(),
+        statuses.tolist(),
+        totals.tolist(),
+        date_column(order_days),
+        choice_column(rng, PRIORITIES, count),
+        keyed_names("Clerk#", rng.integers(1, max(1, int(scale_factor * 1000)) + 1, count)),
+        [0] * count,
+        text_column(rng, count, 19, 78, seed),
+    ]
+    lineitems = [
+        orderkeys[order_positions].tolist(),
+        partkeys.tolist(),
+        suppkeys.tolist(),
+        linenumbers.tolist(),
+        quantities.tolist(),
+        (extended_cents / 100).tolist(),
+        (discounts / 100).tolist(),
+        (taxes / 100).tolist(),
+        returnflags.tolist(),
+        np.where(open_lines, "O", "F").tolist(),
+        date_column(ship_days),
+        date_column(commit_days),
+        date_column(receipt_days),
+        choice_column(rng, INSTRUCTIONS, line_count),
+        choice_column(rng, MODES, line_count),
+        text_column(rng, line_count, 10, 43, seed),
+    ]
+    return orders, lineitems
+
+
+def orders_columns(cardinalities, start, stop, rng, seed, scale_factor):
+    return _orders_and_lineitems(cardinalities, start, stop, rng, seed, scale_factor)[0]
+
+
+def lineitem_columns(cardinalities, start, stop, rng, seed, scale_factor):
+    return _orders_and_lineitems(cardinalities, start, stop, rng, seed, scale_factor)[1]
+
+
+COLUMN_GENERATORS = {
+    "region": region_columns,
+    "nation": nation_columns,
+    "part": part_columns,
+    "supplier": supplier_columns,
+    "partsupp": partsupp_columns,
+    "customer": customer_columns,
+    "orders": orders_columns,
+    "lineitem": lineitem_columns,
+}
+
+
+def generate(table_name, scale_factor, start, stop, chunk_seed, text_seed=0):
+    """
+    Generates rows [start, stop) of a table (by driving key, like the Faker
+    generators) column by column with NumPy, and yields them as row tuples.
+    """
+    rng = np.random.default_rng(chunk_seed)
+    cardinalities = table_cardinalities(scale_factor)
+    generator = COLUMN_GENERATORS[table_name]
+    if table_name in ("orders", "lineitem"):
+        columns = generator(cardinalities, start, stop, rng, text_seed, scale_factor)
+    else:
+        columns = generator(cardinalities, start, stop, rng, text_seed)
+    return zip(*columns)
+
+
+def refresh_orders(scale_factor, start, stop, slot, chunk_seed, text_seed=0):
+    """
+    New orders for RF1: orders [start, stop) of key slot `slot` (see
+    spec.order_key) and their lineitems, as two lists of row tuples.
+    """
+    rng = np.random.default_rng(chunk_seed)
+    orders, lineitems = _orders_and_lineitems(table_cardinalities(scale_factor), start, stop, rng, text_seed, scale_factor, slot)
+    return list(zip(*orders)), list(zip(*lineitems))
@@ -0,0 +1,44 @@
+import os
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from mcp_server.database_handlers import query_executor
+
+# psycopg2 blocks the calling thread, so queries run on a bounded pool of worker
+# threads and the event loop only awaits their results. There is no point having
+# more workers than pooled connections: extra threads would just queue on checkout.
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Returns the process-wide worker pool used for blocking database calls."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                max_workers = int(os.environ.get("MCP_QUERY_WORKERS", os.environ.get("MCP_POOL_MAX_SIZE", "10")))
+                _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mcp-query")
+    return _executor
+
+
+async def run_blocking(func, *args, **kwargs):
+    """Runs a blocking database function on the worker pool without stalling the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), functools.partial(func, *args, **kwargs))
+
+
+async def execute_query_prompt_async(prompt_arguments: dict) -> dict:
+    """Async counterpart of query_executor.execute_query_prompt."""
+    return await run_blocking(query_executor.execute_query_prompt, prompt_arguments)
+
+
+def shutdown_executor():
+    """Waits for in-flight queries and stops the worker pool."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
@@ -0,0 +1,68 @@
+import os
+import json
+import logging
+import threading
+
+logger = logging.getLogger("mcp_server.call_log")
+
+# Append-only JSONL log of tool calls, for replaying real traffic with
+# benchmarks/mcp_replay.py. Unset (the default) records nothing.
+RECORD_LOG = os.environ.get("MCP_RECORD_LOG")
+
+_file = None
+_lock = threading.Lock()
+_failed = False
+
+
+def enabled():
+    return bool(RECORD_LOG) and not _failed
+
+
+def _row_count(response):
+    data = response.get("data")
+    if isinstance(data, list):
+        return len(data)
+    if isinstance(data, dict):
+        # Columnar: one array per column
+        return len(next(iter(data.values()), []))
+    # Arrow payloads are opaque base64; the count isn't worth decoding them for
+    return None
+
+
+def record(tool, arguments, started_at, duration, response):
+    """
+    Appends one call: its arguments, wall-clock start (epoch seconds), server-side
+    duration, status, row count and serialized response size. Never raises; if
+    the log can't be written, recording stops with a single warning.
+    """
+    global _file, _failed
+    entry = {
+        "ts": round(started_at, 6),
+        "tool": tool,
+        "arguments": arguments,
+        "duration_ms": round(duration * 1000, 3),
+        "status": response.get("status"),
+        "rows": _row_count(response),
+        "response_bytes": len(json.dumps(response, default=str).encode("utf-8")),
+        "cached": bool(response.get("cached")),
+    }
+    line = json.dumps(entry, default=str) + "\n"
+    with _lock:
+        if _failed:
+            return
+        try:
+            if _file is None:
+                # Line-buffered, so each call reaches the file whole and in order
+                _file = open(RECORD_LOG, "a", buffering=1, encoding="utf-8")
+            _file.write(line)
+        except OSError as error:
+            _failed = True
+            logger.warning(f"Could not write the call log {RECORD_LOG}; recording stopped: {error}")
+
+
+def close():
+    global _file
+    with _lock:
+        if _file is not None:
+            _file.close()
+            _file = None
@@ -0,0 +1,264 @@
+import os
+import time
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2 import extensions
+
+logger = logging.getLogger("mcp_server.connection_pool")
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection could be checked out within the checkout timeout."""
+
+
+class PooledConnection(extensions.connection):
+    """A psycopg2 connection that remembers when it was opened and last used."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.created_at = time.monotonic()
+        self.returned_at = self.created_at
+
+
+class ConnectionPool:
+    """
+    A thread-safe, size-bounded pool of psycopg2 connections.
+
+    Connections are checked for health when borrowed and recycled once they
+    exceed their maximum lifetime or have sat idle for too long, so a database
+    restart or a network blip only costs one reconnect instead of an error.
+    """
+
+    def __init__(self, dsn, min_size=1, max_size=10, timeout=30.0, max_lifetime=1800.0, max_idle=300.0, ping_after=10.0):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError(f"Invalid pool bounds: min_size={min_size}, max_size={max_size}")
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.max_idle = max_idle
+        self.ping_after = ping_after
+
+        self._idle = deque()
+        self._size = 0  # Open connections plus connections currently being opened
+        self._in_use = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+        self._checkouts = 0
+        self._timeouts = 0
+        self._opened = 0
+        self._discarded = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+        for _ in range(min_size):
+            self._size += 1
+            try:
+                self._idle.append(self._open())
+            except Exception:
+                self._size -= 1
+                raise
+
+    def _open(self):
+        connection = psycopg2.connect(self.dsn, connection_factory=PooledConnection)
+        # Tools only read, so there is no reason to pay for a rollback round trip
+        # every time a connection goes back to the pool.
+        connection.autocommit = True
+        with self._cond:
+            self._opened += 1
+        return connection
+
+    def _discard(self, connection):
+        try:
+            if not connection.closed:
+                connection.close()
+        except Exception as error:
+            logger.warning(f"Error closing pooled connection: {error}")
+        with self._cond:
+            self._size -= 1
+            self._discarded += 1
+            self._cond.notify()
+
+    def _is_expired(self, connection, now):
+        if self.max_lifetime and now - connection.created_at > self.max_lifetime:
+            return True
+        if self.max_idle and now - connection.returned_at > self.max_idle:
+            return True
+        return False
+
+    def _is_healthy(self, connection):
+        """Health check run on borrow. Only pings connections that have been idle a while."""
+        if connection.closed:
+            return False
+        if connection.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+            return False
+        if time.monotonic() - connection.returned_at < self.ping_after:
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            return True
+        except psycopg2.Error as error:
+            logger.info(f"Discarding unhealthy pooled connection: {error}")
+            return False
+
+    def getconn(self):
+        """Borrows a connection, waiting up to `timeout` seconds for one to become free."""
+        start = time.monotonic()
+        deadline = start + self.timeout
+        while True:
+            connection = None
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise PoolTimeoutError("Connection pool is closed.")
+                    if self._idle:
+                        connection = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeoutError(f"Timed out after {self.timeout}s waiting for a database connection ({self.max_size} in use).")
+                    self._cond.wait(remaining)
+
+            if connection is None:
+                try:
+                    connection = self._open()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+            elif self._is_expired(connection, time.monotonic()) or not self._is_healthy(connection):
+                self._discard(connection)
+                continue
+
+            waited = time.monotonic() - start
+            with self._cond:
+                self._in_use += 1
+                self._checkouts += 1
+                self._total_wait += waited
+                self._max_wait = max(self._max_wait, waited)
+            return connection
+
+    def putconn(self, connection, discard=False):
+        """Returns a connection to the pool, closing it instead if it is broken, expired or `discard` is set."""
+        with self._cond:
+            self._in_use -= 1
+
+        if not discard and not connection.closed and connection.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+            try:
+                connection.rollback()
+            except psycopg2.Error:
+                discard = True
+
+        now = time.monotonic()
+        too_old = self.max_lifetime and now - connection.created_at > self.max_lifetime
+        if discard or self._closed or connection.closed or too_old:
+            self._discard(connection)
+            return
+
+        connection.returned_at = now
+        with self._cond:
+            self._idle.append(connection)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """Context manager that borrows a connection and always gives it back."""
+        connection = self.getconn()
+        try:
+            yield connection
+        except psycopg2.OperationalError:
+            # The server or the network went away; don't hand this connection out again.
+            self.putconn(connection, discard=True)
+            raise
+        except Exception:
+            self.putconn(connection)
+            raise
+        else:
+            self.putconn(connection)
+
+    def stats(self):
+        """Returns pool sizing and wait-time counters."""
+        with self._cond:
+            return {
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "size": self._size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "connections_opened": self._opened,
+                "connections_discarded": self._discarded,
+                "total_wait_ms": round(self._total_wait * 1000, 3),
+                "avg_wait_ms": round(self._total_wait * 1000 / self._checkouts, 3) if self._checkouts else 0.0,
+                "max_wait_ms": round(self._max_wait * 1000, 3),
+            }
+
+    def close(self):
+        """Closes every idle connection; borrowed connections are closed when returned."""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._cond.notify_all()
+        for connection in idle:
+            self._discard(connection)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Returns the process-wide pool, creating it from the environment on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                database_url = os.environ.get("DATABASE_URL")
+                if not database_url:
+                    raise ValueError("DATABASE_URL environment variable not set.")
+                _pool = ConnectionPool(
+                    database_url,
+                    min_size=int(os.environ.get("MCP_POOL_MIN_SIZE", "1")),
+                    max_size=int(os.environ.get("MCP_POOL_MAX_SIZE", "10")),
+                    timeout=float(os.environ.get("MCP_POOL_TIMEOUT", "30")),
+                    max_lifetime=float(os.environ.get("MCP_POOL_MAX_LIFETIME", "1800")),
+                    max_idle=float(os.environ.get("MCP_POOL_MAX_IDLE", "300")),
+                    ping_after=float(os.environ.get("MCP_POOL_PING_AFTER", "10")),
+                )
+                logger.info(f"Created connection pool (min={_pool.min_size}, max={_pool.max_size}).")
+    return _pool
+
+
+def connection():
+    """Borrows a connection from the process-wide pool for the duration of a `with` block."""
+    return get_pool().connection()
+
+
+def pool_stats():
+    """Returns the process-wide pool's counters, or an empty pool summary if it hasn't been created yet."""
+    if _pool is None:
+        return {"size": 0, "in_use": 0, "idle": 0, "checkouts": 0}
+    return _pool.stats()
+
+
+def close_pool():
+    """Closes the process-wide pool."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
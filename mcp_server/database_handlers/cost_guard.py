@@ -0,0 +1,88 @@
+import os
+import json
+
+# Thresholds are in the planner's own units: estimated result rows and total plan cost.
+GUARD_ENABLED = os.environ.get("MCP_GUARD_ENABLED", "1").lower() not in ("0", "false", "no")
+MAX_ESTIMATED_ROWS = float(os.environ.get("MCP_GUARD_MAX_ROWS", "100000"))
+MAX_ESTIMATED_COST = float(os.environ.get("MCP_GUARD_MAX_COST", "10000000"))
+# "cap" adds a LIMIT to oversized results (rejecting only if the capped plan is still too
+# expensive); "reject" refuses anything over either threshold.
+GUARD_MODE = os.environ.get("MCP_GUARD_MODE", "cap").lower()
+CAP_ROWS = int(os.environ.get("MCP_GUARD_CAP_ROWS", "10000"))
+# How query_executor.build_query ends a query with a limit
+LIMIT_CLAUSE = " LIMIT %s"
+
+
+def explain(cursor, sql, params):
+    """Runs EXPLAIN (FORMAT JSON) for sql and returns (estimate, plan)."""
+    cursor.execute("EXPLAIN (FORMAT JSON) " + sql, tuple(params))
+    result = cursor.fetchone()[0]
+    # psycopg2 decodes json columns, but be tolerant of servers that hand back text
+    if isinstance(result, str):
+        result = json.loads(result)
+    plan = result[0]["Plan"]
+    estimate = {
+        "estimated_rows": plan.get("Plan Rows"),
+        "estimated_cost": plan.get("Total Cost"),
+        "startup_cost": plan.get("Startup Cost"),
+        "node_type": plan.get("Node Type"),
+    }
+    return estimate, plan
+
+
+def _violations(estimate, check_rows):
+    reasons = []
+    if estimate["estimated_cost"] is not None and estimate["estimated_cost"] > MAX_ESTIMATED_COST:
+        reasons.append(f"estimated cost {estimate['estimated_cost']:,.0f} exceeds the limit of {MAX_ESTIMATED_COST:,.0f}")
+    if check_rows and estimate["estimated_rows"] is not None and estimate["estimated_rows"] > MAX_ESTIMATED_ROWS:
+        reasons.append(f"estimated {estimate['estimated_rows']:,.0f} rows exceeds the limit of {MAX_ESTIMATED_ROWS:,.0f}")
+    return reasons
+
+
+def thresholds():
+    return {"mode": GUARD_MODE, "max_estimated_rows": MAX_ESTIMATED_ROWS, "max_estimated_cost": MAX_ESTIMATED_COST, "cap_rows": CAP_ROWS}
+
+
+def guard(cursor, sql, params, check_rows=True, prepare=None):
+    """
+    Decides whether a query may run, based on the planner's estimates.
+
+    Returns (sql, params, verdict). verdict["action"] is "allow", "cap" (sql and
+    params have been rewritten to add a LIMIT) or "reject". Streamed queries pass
+    check_rows=False: their result size doesn't matter, only the work behind it.
+    If `prepare` is given it maps (sql, params) to the prepared-statement form;
+    the estimates then come from that statement and it is what gets returned.
+    """
+    prepare = prepare or (lambda sql, params: (sql, params))
+    run_sql, run_params = prepare(sql, params)
+    estimate, _ = explain(cursor, run_sql, run_params)
+    reasons = _violations(estimate, check_rows)
+    verdict = {"action": "allow", **estimate}
+    if not reasons:
+        return run_sql, run_params, verdict
+
+    verdict["reason"] = "; ".join(reasons)
+    if GUARD_MODE != "cap":
+        verdict["action"] = "reject"
+        return run_sql, run_params, verdict
+
+    # A LIMIT lets the planner stop early, which often brings the cost down as well. It goes on
+    # the statement itself, since wrapping it in a subquery would drop the guarantee of its ORDER BY.
+    # build_query ends a limited query with its LIMIT placeholder (raw fragments can't, their % is
+    # escaped), so that one is lowered to the cap instead
+    if sql.endswith(LIMIT_CLAUSE):
+        capped_sql, capped_params = sql, list(params[:-1]) + [min(params[-1], CAP_ROWS)]
+    else:
+        capped_sql, capped_params = sql + LIMIT_CLAUSE, list(params) + [CAP_ROWS]
+    capped_sql, capped_params = prepare(capped_sql, capped_params)
+    capped_estimate, _ = explain(cursor, capped_sql, capped_params)
+    if _violations(capped_estimate, check_rows):
+        verdict["action"] = "reject"
+        verdict["reason"] += f"; still too expensive with LIMIT {CAP_ROWS} (estimated cost {capped_estimate['estimated_cost']:,.0f})"
+        return run_sql, run_params, verdict
+
+    verdict["action"] = "cap"
+    verdict["reason"] += f"; result capped at {CAP_ROWS} rows"
+    verdict["capped_estimated_rows"] = capped_estimate["estimated_rows"]
+    verdict["capped_estimated_cost"] = capped_estimate["estimated_cost"]
+    return capped_sql, capped_params, verdict
@@ -0,0 +1,174 @@
+import os
+import re
+import json
+import hashlib
+import datetime
+import threading
+from collections import OrderedDict
+from decimal import Decimal, InvalidOperation
+
+SCHEMA_PATH = os.environ.get("MCP_SCHEMA_PATH", os.path.join(os.path.dirname(__file__), "..", "..", "schema.json"))
+PREPARED_CACHE_SIZE = int(os.environ.get("MCP_PREPARED_CACHE_SIZE", "128"))
+
+# Operators accepted in structured filters, and the SQL they compile to
+COMPARISON_OPERATORS = {"=": "=", "!=": "<>", "<>": "<>", "<": "<", "<=": "<=", ">": ">", ">=": ">="}
+PATTERN_OPERATORS = {"like": "LIKE", "not like": "NOT LIKE", "ilike": "ILIKE"}
+OPERATORS = sorted(list(COMPARISON_OPERATORS) + list(PATTERN_OPERATORS) + ["in", "not in", "between", "is null", "is not null"])
+
+# psycopg2's placeholders: %s is a parameter, %% a literal percent sign
+_PLACEHOLDER = re.compile(r"%[s%]")
+
+
+class FilterError(ValueError):
+    """Raised when a structured filter doesn't match the schema."""
+
+
+_schema = None
+
+
+def load_schema():
+    """Returns {table: {column: column_schema}} from schema.json."""
+    global _schema
+    if _schema is None:
+        with open(SCHEMA_PATH) as f:
+            document = json.load(f)
+        _schema = {table: definition["properties"] for table, definition in document["properties"].items()}
+    return _schema
+
+
+def _resolve_column(column, tables):
+    """Finds which of `tables` owns `column` (optionally written as table.column)."""
+    schema = load_schema()
+    if not isinstance(column, str) or not column:
+        raise FilterError("Each filter needs a 'column'.")
+    table, _, name = column.rpartition(".")
+    candidates = [table] if table else tables
+    for candidate in candidates:
+        if candidate in tables and name in schema.get(candidate, {}):
+            return schema[candidate][name]
+    raise FilterError(f"Unknown column '{column}' for tables {', '.join(tables)}.")
+
+
+def _coerce(value, column_schema, column):
+    """Converts a JSON value to the Python type psycopg2 should bind for the column."""
+    column_type = column_schema.get("type")
+    try:
+        if value is None:
+            raise FilterError(f"Use 'is null' rather than comparing {column} with null.")
+        if column_type == "integer":
+            if isinstance(value, bool) or not isinstance(value, (int, str)):
+                raise ValueError
+            return int(value)
+        if column_type == "number":
+            if isinstance(value, bool):
+                raise ValueError
+            return Decimal(str(value))
+        if column_schema.get("format") == "date":
+            return datetime.date.fromisoformat(str(value))
+        if not isinstance(value, str):
+            raise ValueError
+        return value
+    except (ValueError, InvalidOperation):
+        expected = "date (YYYY-MM-DD)" if column_schema.get("format") == "date" else column_type
+        raise FilterError(f"Value {value!r} for {column} is not a valid {expected}.")
+
+
+def compile_filters(filters, tables):
+    """
+    Compiles structured filters into parameterized SQL conditions.
+
+    Each filter is {"column": ..., "op": ..., "value": ...}. Columns are checked
+    against schema.json for the queried tables and values are coerced to the
+    column's type, so the SQL text depends only on the shape of the filters and
+    the values always travel as bind parameters. Returns (conditions, params).
+    """
+    conditions = []
+    params = []
+    for item in filters or []:
+        if not isinstance(item, dict):
+            raise FilterError(f"Filters must be objects with column, op and value; got {item!r}.")
+        column = item.get("column")
+        op = str(item.get("op", "=")).strip().lower()
+        column_schema = _resolve_column(column, tables)
+
+        if op in COMPARISON_OPERATORS:
+            conditions.append(f"{column} {COMPARISON_OPERATORS[op]} %s")
+            params.append(_coerce(item.get("value"), column_schema, column))
+        elif op in PATTERN_OPERATORS:
+            if column_schema.get("type") != "string" or column_schema.get("format"):
+                raise FilterError(f"'{op}' only applies to text columns, not {column}.")
+            conditions.append(f"{column} {PATTERN_OPERATORS[op]} %s")
+            params.append(_coerce(item.get("value"), column_schema, column))
+        elif op in ("in", "not in"):
+            values = item.get("value")
+            if not isinstance(values, list) or not values:
+                raise FilterError(f"'{op}' on {column} needs a non-empty list value.")
+            # = ANY(array) keeps one statement shape however many values there are
+            conditions.append(f"{column} = ANY(%s)" if op == "in" else f"NOT ({column} = ANY(%s))")
+            params.append([_coerce(value, column_schema, column) for value in values])
+        elif op == "between":
+            values = item.get("value")
+            if not isinstance(values, list) or len(values) != 2:
+                raise FilterError(f"'between' on {column} needs a [low, high] list value.")
+            conditions.append(f"{column} BETWEEN %s AND %s")
+            params.extend(_coerce(value, column_schema, column) for value in values)
+        elif op in ("is null", "is not null"):
+            conditions.append(f"{column} {op.upper()}")
+        else:
+            raise FilterError(f"Unsupported operator '{op}'. Expected one of: {', '.join(OPERATORS)}.")
+    return conditions, params
+
+
+_stats_lock = threading.Lock()
+_prepared_hits = 0
+_prepared_misses = 0
+
+
+def escape_percent(fragment):
+    """Doubles the % signs in a raw SQL fragment (c_custkey % 10, LIKE 'a%') so psycopg2 and prepare() keep them literal."""
+    return fragment.replace("%", "%%")
+
+
+def prepare(connection, cursor, sql, params):
+    """
+    Makes sure `sql` is a prepared statement on this connection.
+
+    Returns the (sql, params) to execute instead: an EXECUTE of the statement
+    for the shape of `sql`. Each pooled connection keeps its own LRU of
+    statements, so repeated query shapes skip parse and plan. `sql` is in
+    psycopg2's format: %s placeholders, with literal % signs written %%.
+    """
+    global _prepared_hits, _prepared_misses
+    statements = getattr(connection, "prepared_statements", None)
+    if statements is None:
+        statements = connection.prepared_statements = OrderedDict()
+
+    name = "mcp_" + hashlib.sha1(sql.encode("utf-8")).hexdigest()[:16]
+    if name in statements:
+        statements.move_to_end(name)
+        with _stats_lock:
+            _prepared_hits += 1
+    else:
+        numbers = iter(range(1, len(params) + 1))
+        positional = _PLACEHOLDER.sub(lambda match: "%" if match.group() == "%%" else f"${next(numbers)}", sql)
+        cursor.execute(f"PREPARE {name} AS {positional}")
+        statements[name] = sql
+        while len(statements) > PREPARED_CACHE_SIZE:
+            evicted, _ = statements.popitem(last=False)
+            cursor.execute(f"DEALLOCATE {evicted}")
+        with _stats_lock:
+            _prepared_misses += 1
+
+    if not params:
+        return f"EXECUTE {name}", []
+    return f"EXECUTE {name} ({', '.join(['%s'] * len(params))})", list(params)
+
+
+def prepared_statement_stats():
+    with _stats_lock:
+        lookups = _prepared_hits + _prepared_misses
+        return {
+            "prepared_hits": _prepared_hits,
+            "prepared_misses": _prepared_misses,
+            "prepared_hit_ratio": round(_prepared_hits / lookups, 4) if lookups else 0.0,
+        }
@@ -1,7 +1,12 @@
-import os
-import psycopg2
 from psycopg2 import Error
 import json # To parse/return JSON data
+import functools
+from mcp_server.database_handlers import connection_pool
+from mcp_server.database_handlers import result_streams
+from mcp_server.database_handlers import result_encoding
+from mcp_server.database_handlers import result_cache
+from mcp_server.database_handlers import cost_guard
+from mcp_server.database_handlers import query_builder
 
 def execute_query_prompt(prompt_arguments: dict) -> dict:
     """
@@ -15,73 +20,211 @@ def execute_query_prompt(prompt_arguments: dict) -> dict:
     limit = prompt_arguments.get("limit")
     join_tables = prompt_arguments.get("join_tables", [])
     join_conditions = prompt_arguments.get("join_conditions", [])
+    filters = prompt_arguments.get("filters", [])
+    stream = prompt_arguments.get("stream", False)
+    page_size = prompt_arguments.get("page_size")
+    continuation_token = prompt_arguments.get("continuation_token")
+    result_format = prompt_arguments.get("result_format") or "rows"
+
+    if result_format not in result_encoding.RESULT_FORMATS:
+        return {"status": "error", "message": f"Unknown result_format '{result_format}'. Expected one of: {', '.join(result_encoding.RESULT_FORMATS)}."}
+
+    if continuation_token:
+        return _fetch_next_page(continuation_token, page_size, result_format)
 
     if not table_name:
         return {"status": "error", "message": "table_name is required."}
 
-    connection = None
+    # Repeated lookups are answered from the result cache; streamed results are never cached
+    cache = None if stream else result_cache.get_cache()
+    if cache is not None:
+        cache_key = result_cache.make_key(prompt_arguments)
+        cache_tables = result_cache.tables_for(prompt_arguments)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return {**cached, "cached": True}
+        cache_generation = cache.generation(cache_tables)
+
     try:
-        database_url = os.environ.get("DATABASE_URL")
-        print(f"Attempting to connect to database with URL: {database_url}") # Debugging line
-        if not database_url:
-            return {"status": "error", "message": "DATABASE_URL environment variable not set."}
-        connection = psycopg2.connect(database_url)
-        cursor = connection.cursor()
-
-        # Build the SQL query dynamically and safely
-        columns_str = ", ".join(select_columns)
-        sql = f"SELECT {columns_str} FROM {table_name}"
-
-        for i, join_table in enumerate(join_tables):
-            if i < len(join_conditions):
-                sql += f" JOIN {join_table} ON {join_conditions[i]}"
-
-        params = []
-        if where_conditions:
-            # IMPORTANT: For real-world security, you'd parse and validate
-            # these conditions more rigorously to prevent arbitrary SQL.
-            # This example assumes conditions are simple and safe literals
-            # or uses placeholders for complex values if they came from user input.
-            sql += " WHERE " + " AND ".join(where_conditions)
-            # If where_conditions contained values, you'd add them to params list:
-            # for condition in where_conditions:
-            #     if 'value_placeholder' in condition:
-            #         params.append(actual_value_from_args)
-
-
-        if order_by:
-            sql += f" ORDER BY {order_by}" # Be careful with order_by injection! Validate input.
-
-        if limit is not None:
-            sql += " LIMIT %s"
-            params.append(limit)
-
-        print(f"MCP Server preparing SQL: {sql} with params: {params}") # For debugging
-        cursor.execute(sql, tuple(params))
-
-        # Fetch results and column names
-        column_names = [desc[0] for desc in cursor.description]
-        rows = cursor.fetchall()
-
-        # Format results into a list of dictionaries for easier consumption by clients
-        results = []
-        for row in rows:
-            results.append(dict(zip(column_names, row)))
+        pool = connection_pool.get_pool()
+    except ValueError as error:
+        return {"status": "error", "message": str(error)}
+    except (Exception, Error) as error:
+        print(f"Error creating MCP database connection pool: {error}")
+        return {"status": "error", "message": f"Database connection failed: {error}"}
 
-        return {
+    try:
+        sql, params = build_query(table_name, select_columns, where_conditions, order_by, limit, join_tables, join_conditions, filters)
+
+        if stream:
+            verdict = None
+            if cost_guard.GUARD_ENABLED:
+                with pool.connection() as connection, connection.cursor() as cursor:
+                    sql, params, verdict = cost_guard.guard(cursor, sql, params, check_rows=False)
+                if verdict["action"] == "reject":
+                    return _rejected_response(table_name, verdict)
+            print(f"MCP Server streaming SQL: {sql} with params: {params}") # For debugging
+            column_names, type_codes, rows, next_token = result_streams.open_stream(sql, params, table_name, page_size)
+            response = _page_response(table_name, column_names, type_codes, rows, next_token, result_format)
+            if verdict is not None:
+                response["cost_guard"] = verdict
+            return response
+
+        verdict = None
+        with pool.connection() as connection, connection.cursor() as cursor:
+            # Without raw where_conditions every value is a bind parameter, so the SQL
+            # text is a reusable shape worth keeping as a prepared statement
+            prepare = None if where_conditions else functools.partial(query_builder.prepare, connection, cursor)
+
+            # Check the planner's estimates before letting an agent-generated query loose
+            if cost_guard.GUARD_ENABLED:
+                sql, params, verdict = cost_guard.guard(cursor, sql, params, prepare=prepare)
+                if verdict["action"] == "reject":
+                    return _rejected_response(table_name, verdict)
+            elif prepare is not None:
+                sql, params = prepare(sql, params)
+
+            print(f"MCP Server preparing SQL: {sql} with params: {params}") # For debugging
+            cursor.execute(sql, tuple(params))
+
+            # Fetch results and column names
+            column_names = [desc[0] for desc in cursor.description]
+            type_codes = [desc[1] for desc in cursor.description]
+            rows = cursor.fetchall()
+
+        # Format results as row dictionaries (the default) or one of the compact layouts
+        response = {
             "status": "success",
-            "message": f"Successfully queried {len(results)} rows from {table_name}.",
-            "data": results,
-            "column_names": column_names
+            "message": f"Successfully queried {len(rows)} rows from {table_name}.",
+            **result_encoding.encode_result(column_names, rows, type_codes, result_format),
+            "column_names": column_names,
+            "result_format": result_format
         }
+        if verdict is not None:
+            response["cost_guard"] = verdict
+            if verdict["action"] == "cap":
+                response["message"] += f" Result capped: {verdict['reason']}."
+        if cache is not None:
+            cache.put(cache_key, response, cache_tables, cache_generation)
+        return response
 
+    except (connection_pool.PoolTimeoutError, result_streams.StreamError, ValueError) as error:
+        print(f"Error during MCP database query: {error}")
+        return {"status": "error", "message": str(error)}
     except (Exception, Error) as error:
         print(f"Error during MCP database query: {error}")
         return {"status": "error", "message": f"Database query failed: {error}"}
-    finally:
-        if connection:
-            cursor.close()
-            connection.close()
+
+def _rejected_response(table_name, verdict):
+    return {
+        "status": "error",
+        "message": f"Query on {table_name} rejected by the cost guard: {verdict['reason']}. Add filters or a limit.",
+        "cost_guard": verdict
+    }
+
+def explain_query_prompt(prompt_arguments: dict) -> dict:
+    """
+    Returns the planner's estimates for the query described by the prompt
+    arguments, and what the cost guard would do with it, without running it.
+    """
+    table_name = prompt_arguments.get("table_name")
+    if not table_name:
+        return {"status": "error", "message": "table_name is required."}
+
+    try:
+        sql, params = build_query(
+            table_name,
+            prompt_arguments.get("select_columns", ["*"]),
+            prompt_arguments.get("where_conditions", []),
+            prompt_arguments.get("order_by"),
+            prompt_arguments.get("limit"),
+            prompt_arguments.get("join_tables", []),
+            prompt_arguments.get("join_conditions", []),
+            prompt_arguments.get("filters", []),
+        )
+        with connection_pool.connection() as connection, connection.cursor() as cursor:
+            estimate, plan = cost_guard.explain(cursor, sql, params)
+            _, _, verdict = cost_guard.guard(cursor, sql, params)
+        return {
+            "status": "success",
+            "message": f"Estimated {estimate['estimated_rows']} rows at cost {estimate['estimated_cost']}; the cost guard would {verdict['action']} this query.",
+            "sql": sql,
+            "params": params,
+            "estimate": estimate,
+            "cost_guard": {**verdict, "enabled": cost_guard.GUARD_ENABLED, "thresholds": cost_guard.thresholds()},
+            "plan": plan
+        }
+    except (connection_pool.PoolTimeoutError, ValueError) as error:
+        return {"status": "error", "message": str(error)}
+    except (Exception, Error) as error:
+        print(f"Error during MCP explain: {error}")
+        return {"status": "error", "message": f"EXPLAIN failed: {error}"}
+
+def _fetch_next_page(continuation_token, page_size, result_format):
+    """Returns the next page of a streamed result."""
+    try:
+        column_names, type_codes, rows, next_token, table_name = result_streams.fetch_next_page(continuation_token, page_size)
+        return _page_response(table_name, column_names, type_codes, rows, next_token, result_format)
+    except (result_streams.StreamError, ValueError) as error:
+        return {"status": "error", "message": str(error)}
+    except (Exception, Error) as error:
+        print(f"Error during MCP database stream fetch: {error}")
+        result_streams.close_stream(continuation_token)
+        return {"status": "error", "message": f"Database query failed: {error}"}
+
+def _page_response(table_name, column_names, type_codes, rows, next_token, result_format):
+    """Formats one page of a streamed result. A null continuation_token means the result is exhausted."""
+    return {
+        "status": "success",
+        "message": f"Streamed {len(rows)} rows from {table_name}." + (" More rows available." if next_token else " End of results."),
+        **result_encoding.encode_result(column_names, rows, type_codes, result_format),
+        "column_names": column_names,
+        "result_format": result_format,
+        "continuation_token": next_token,
+        "has_more": next_token is not None
+    }
+
+def build_query(table_name, select_columns, where_conditions, order_by, limit, join_tables, join_conditions, filters=None):
+    """Builds the SELECT statement for the given prompt arguments. Returns (sql, params)."""
+    # Structured filters are validated against schema.json and bound as parameters
+    filter_conditions, params = query_builder.compile_filters(filters, [table_name] + list(join_tables))
+
+    # Raw fragments are SQL text, so their % signs are escaped from psycopg2's placeholders
+    escape = query_builder.escape_percent
+    select_columns = [escape(column) for column in select_columns]
+    where_conditions = [escape(condition) for condition in where_conditions]
+    join_conditions = [escape(condition) for condition in join_conditions]
+    order_by = escape(order_by) if order_by else order_by
+
+    # Build the SQL query dynamically and safely
+    columns_str = ", ".join(select_columns)
+    sql = f"SELECT {columns_str} FROM {table_name}"
+
+    for i, join_table in enumerate(join_tables):
+        if i < len(join_conditions):
+            sql += f" JOIN {join_table} ON {join_conditions[i]}"
+
+    conditions = list(where_conditions) + filter_conditions
+    if conditions:
+        # IMPORTANT: For real-world security, you'd parse and validate
+        # these conditions more rigorously to prevent arbitrary SQL.
+        # This example assumes conditions are simple and safe literals
+        # or uses placeholders for complex values if they came from user input.
+        sql += " WHERE " + " AND ".join(conditions)
+        # If where_conditions contained values, you'd add them to params list:
+        # for condition in where_conditions:
+        #     if 'value_placeholder' in condition:
+        #         params.append(actual_value_from_args)
+
+
+    if order_by:
+        sql += f" ORDER BY {order_by}" # Be careful with order_by injection! Validate input.
+
+    if limit is not None:
+        sql += " LIMIT %s"
+        params.append(limit)
+
+    return sql, params
 
 # This function would be called by the MCP server's core logic
 # if __name__ == "__main__":
@@ -0,0 +1,244 @@
+import os
+import json
+import time
+import select
+import logging
+import threading
+from collections import OrderedDict
+
+import psycopg2
+
+logger = logging.getLogger("mcp_server.result_cache")
+
+# The Flask API publishes the name of every table it writes on this channel
+# (see tpch_api/app/cache_invalidation.py). "*" means "everything".
+INVALIDATION_CHANNEL = "tpch_table_changed"
+
+DEFAULT_TABLE_TTLS = "region=3600,nation=3600,supplier=600,part=600,partsupp=120,customer=120,orders=30,lineitem=30"
+
+
+def _parse_table_ttls(value):
+    ttls = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        table, _, seconds = item.partition("=")
+        ttls[table.strip().lower()] = float(seconds)
+    return ttls
+
+
+def make_key(prompt_arguments):
+    """
+    Normalizes query_database arguments into a cache key.
+
+    Identifiers are case-folded and whitespace-trimmed, and WHERE conditions are
+    sorted since they are ANDed together, so trivially different spellings of
+    the same request share an entry.
+    """
+    def clean(value):
+        return " ".join(value.split()) if isinstance(value, str) else value
+
+    normalized = {
+        "table_name": clean(prompt_arguments.get("table_name") or "").lower(),
+        "select_columns": [clean(column) for column in prompt_arguments.get("select_columns") or ["*"]],
+        "where_conditions": sorted(clean(condition) for condition in prompt_arguments.get("where_conditions") or []),
+        "order_by": clean(prompt_arguments.get("order_by")),
+        "limit": prompt_arguments.get("limit"),
+        "join_tables": [clean(table).lower() for table in prompt_arguments.get("join_tables") or []],
+        "join_conditions": [clean(condition) for condition in prompt_arguments.get("join_conditions") or []],
+        "filters": sorted(json.dumps(item, sort_keys=True, default=str) for item in prompt_arguments.get("filters") or []),
+        "result_format": prompt_arguments.get("result_format") or "rows",
+    }
+    return json.dumps(normalized, sort_keys=True, default=str)
+
+
+def tables_for(prompt_arguments):
+    """The tables a query reads from, used for TTLs and invalidation."""
+    tables = [prompt_arguments.get("table_name") or ""] + list(prompt_arguments.get("join_tables") or [])
+    return frozenset(table.strip().lower() for table in tables if table)
+
+
+class _Entry:
+    __slots__ = ("value", "size", "expires_at", "tables")
+
+    def __init__(self, value, size, expires_at, tables):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+        self.tables = tables
+
+
+class ResultCache:
+    """
+    A memory-bounded LRU cache of query_database responses with per-table TTLs.
+
+    Each table carries a generation counter that invalidation bumps; a result is
+    only stored if none of its tables changed while the query was running, so a
+    write racing a slow read can't leave a stale entry behind.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, default_ttl=60.0, table_ttls=None, max_entry_bytes=None):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes or max_bytes // 8
+        self.default_ttl = default_ttl
+        self.table_ttls = table_ttls or {}
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def ttl_for(self, tables):
+        return min((self.table_ttls.get(table, self.default_ttl) for table in tables), default=self.default_ttl)
+
+    def generation(self, tables):
+        """Snapshot to pass back to put() so results computed across an invalidation are dropped."""
+        with self._lock:
+            return self._generation(tables)
+
+    def _generation(self, tables):
+        return tuple(self._generations.get(table, 0) for table in ["*"] + sorted(tables))
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at <= now:
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def put(self, key, value, tables, generation):
+        ttl = self.ttl_for(tables)
+        if ttl <= 0:
+            return False
+        size = len(json.dumps(value, default=str))
+        if size > self.max_entry_bytes:
+            return False
+        with self._lock:
+            if self._generation(tables) != generation:
+                return False
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(value, size, time.monotonic() + ttl, tables)
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+        return True
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def invalidate_table(self, table):
+        """Drops every entry that read from `table` ("*" drops everything)."""
+        table = table.strip().lower()
+        with self._lock:
+            self._generations[table] = self._generations.get(table, 0) + 1
+            if table == "*":
+                stale = list(self._entries)
+            else:
+                stale = [key for key, entry in self._entries.items() if table in entry.tables]
+            for key in stale:
+                self._remove(key)
+            self.invalidations += len(stale)
+        return len(stale)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidated_entries": self.invalidations,
+            }
+
+
+class InvalidationListener(threading.Thread):
+    """Background thread that LISTENs for table-change notifications and invalidates the cache."""
+
+    def __init__(self, dsn, cache):
+        super().__init__(name="mcp-cache-invalidation", daemon=True)
+        self.dsn = dsn
+        self.cache = cache
+        self._stop_event = threading.Event()
+
+    def run(self):
+        backoff = 1.0
+        while not self._stop_event.is_set():
+            connection = None
+            try:
+                connection = psycopg2.connect(self.dsn)
+                connection.autocommit = True
+                with connection.cursor() as cursor:
+                    cursor.execute(f"LISTEN {INVALIDATION_CHANNEL}")
+                # Anything written while we were disconnected was missed
+                self.cache.invalidate_table("*")
+                logger.info(f"Listening for cache invalidations on '{INVALIDATION_CHANNEL}'.")
+                backoff = 1.0
+                while not self._stop_event.is_set():
+                    if select.select([connection], [], [], 5.0) == ([], [], []):
+                        continue
+                    connection.poll()
+                    while connection.notifies:
+                        notification = connection.notifies.pop(0)
+                        dropped = self.cache.invalidate_table(notification.payload or "*")
+                        logger.info(f"Invalidated {dropped} cached results for table '{notification.payload}'.")
+            except Exception as error:
+                logger.warning(f"Cache invalidation listener error: {error}; retrying in {backoff:.0f}s.")
+                self._stop_event.wait(backoff)
+                backoff = min(backoff * 2, 60.0)
+            finally:
+                if connection is not None:
+                    connection.close()
+
+    def stop(self):
+        self._stop_event.set()
+
+
+_cache = None
+_listener = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Returns the process-wide cache, or None if caching is disabled (MCP_CACHE_ENABLED=0)."""
+    global _cache, _listener
+    if os.environ.get("MCP_CACHE_ENABLED", "1").lower() in ("0", "false", "no"):
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                cache = ResultCache(
+                    max_bytes=int(os.environ.get("MCP_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+                    default_ttl=float(os.environ.get("MCP_CACHE_TTL", "60")),
+                    table_ttls=_parse_table_ttls(os.environ.get("MCP_CACHE_TABLE_TTLS", DEFAULT_TABLE_TTLS)),
+                )
+                database_url = os.environ.get("DATABASE_URL")
+                if database_url:
+                    _listener = InvalidationListener(database_url, cache)
+                    _listener.start()
+                _cache = cache
+    return _cache
+
+
+def cache_stats():
+    if _cache is None:
+        return {"entries": 0, "hits": 0, "misses": 0, "hit_ratio": 0.0}
+    return _cache.stats()
+
+
+def stop_listener():
+    if _listener is not None:
+        _listener.stop()
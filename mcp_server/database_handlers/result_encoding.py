@@ -0,0 +1,76 @@
+import base64
+
+RESULT_FORMATS = ("rows", "columnar", "arrow")
+
+# PostgreSQL type OIDs (cursor.description type_code) we know how to label
+_TYPE_NAMES = {
+    16: "boolean",
+    20: "integer", 21: "integer", 23: "integer",
+    700: "float", 701: "float",
+    1700: "decimal",
+    1082: "date",
+    1114: "timestamp", 1184: "timestamp",
+    18: "string", 25: "string", 1042: "string", 1043: "string",
+}
+
+
+def column_types(type_codes):
+    """Maps cursor.description type codes to the type names reported alongside columnar results."""
+    return [_TYPE_NAMES.get(type_code, "other") for type_code in type_codes]
+
+
+def _json_column(values, type_name):
+    """Converts one column to JSON-native values: decimals and dates become strings (exact decimal text, ISO-8601)."""
+    if type_name == "decimal":
+        # A float would round money columns; the string keeps every digit, as the rows format does
+        return [str(value) if value is not None else None for value in values]
+    if type_name in ("date", "timestamp"):
+        return [value.isoformat() if value is not None else None for value in values]
+    if type_name == "other":
+        return [value if value is None or isinstance(value, (str, int, float, bool)) else str(value) for value in values]
+    return list(values)
+
+
+def encode_rows(column_names, rows):
+    """The original layout: one dict per row."""
+    return [dict(zip(column_names, row)) for row in rows]
+
+
+def encode_columnar(column_names, rows, types):
+    """Column names once, then one array per column in the same order as column_names."""
+    if not rows:
+        return [[] for _ in column_names]
+    return [_json_column(values, type_name) for values, type_name in zip(zip(*rows), types)]
+
+
+def encode_arrow(column_names, rows):
+    """Encodes the result as an Arrow IPC stream, base64'd so it fits in a JSON tool response."""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ValueError("result_format 'arrow' requires the pyarrow package.")
+
+    columns = list(zip(*rows)) if rows else [() for _ in column_names]
+    # pyarrow infers decimal128 and date32 from the Python values, so nothing is stringified
+    table = pa.table([pa.array(list(values)) for values in columns], names=column_names)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return base64.b64encode(sink.getvalue().to_pybytes()).decode("ascii")
+
+
+def encode_result(column_names, rows, type_codes, result_format="rows"):
+    """
+    Encodes fetched rows in the requested result_format.
+
+    Returns the fields to merge into the tool response: "data" plus, for the
+    compact formats, the column types or the payload encoding.
+    """
+    if result_format in (None, "rows"):
+        return {"data": encode_rows(column_names, rows)}
+    if result_format == "columnar":
+        types = column_types(type_codes)
+        return {"data": encode_columnar(column_names, rows, types), "column_types": types}
+    if result_format == "arrow":
+        return {"data": encode_arrow(column_names, rows), "encoding": "arrow-ipc-stream+base64"}
+    raise ValueError(f"Unknown result_format '{result_format}'. Expected one of: {', '.join(RESULT_FORMATS)}.")
@@ -0,0 +1,183 @@
+import os
+import time
+import logging
+import secrets
+import threading
+
+from mcp_server.database_handlers import connection_pool
+
+logger = logging.getLogger("mcp_server.result_streams")
+
+# Every open stream pins a pooled connection inside an open transaction, so both
+# the number of streams and how long an abandoned one may linger are bounded.
+MAX_OPEN_STREAMS = int(os.environ.get("MCP_STREAM_MAX_OPEN", "4"))
+STREAM_IDLE_TIMEOUT = float(os.environ.get("MCP_STREAM_IDLE_TIMEOUT", "300"))
+DEFAULT_PAGE_SIZE = int(os.environ.get("MCP_STREAM_PAGE_SIZE", "1000"))
+MAX_PAGE_SIZE = int(os.environ.get("MCP_STREAM_MAX_PAGE_SIZE", "10000"))
+FETCH_BATCH_SIZE = int(os.environ.get("MCP_STREAM_FETCH_BATCH", "500"))
+
+
+class StreamError(Exception):
+    """Raised when a stream can't be opened or a continuation token is unknown."""
+
+
+class ResultStream:
+    """A named server-side cursor held open between query_database calls."""
+
+    def __init__(self, token, pool, connection, cursor, table_name):
+        self.token = token
+        self.pool = pool
+        self.connection = connection
+        self.cursor = cursor
+        self.table_name = table_name
+        self.column_names = None  # Named cursors only have a description after the first fetch
+        self.type_codes = None
+        self.rows_sent = 0
+        self.last_used = time.monotonic()
+        self.lock = threading.Lock()
+        self.closed = False
+
+    def fetch_page(self, page_size):
+        """Fetches up to page_size rows in fetchmany batches. Returns (rows, exhausted)."""
+        rows = []
+        exhausted = False
+        while len(rows) < page_size:
+            wanted = min(FETCH_BATCH_SIZE, page_size - len(rows))
+            batch = self.cursor.fetchmany(wanted)
+            if self.column_names is None:
+                self.column_names = [desc[0] for desc in self.cursor.description]
+                self.type_codes = [desc[1] for desc in self.cursor.description]
+            rows.extend(batch)
+            if len(batch) < wanted:
+                exhausted = True
+                break
+        self.rows_sent += len(rows)
+        return rows, exhausted
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        discard = False
+        try:
+            self.cursor.close()
+            self.connection.rollback()
+            self.connection.autocommit = True
+        except Exception as error:
+            logger.warning(f"Error closing result stream {self.token}: {error}")
+            discard = True
+        self.pool.putconn(self.connection, discard=discard)
+
+
+_streams = {}
+_streams_lock = threading.Lock()
+
+
+def _reap_expired():
+    """Closes streams nobody has asked for a page from within the idle timeout."""
+    now = time.monotonic()
+    with _streams_lock:
+        expired = [stream for stream in _streams.values() if stream is not None and now - stream.last_used > STREAM_IDLE_TIMEOUT]
+        for stream in expired:
+            del _streams[stream.token]
+    for stream in expired:
+        logger.info(f"Closing idle result stream {stream.token} after {stream.rows_sent} rows.")
+        with stream.lock:
+            stream.close()
+
+
+def clamp_page_size(page_size):
+    if page_size is None:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(int(page_size), MAX_PAGE_SIZE))
+
+
+def open_stream(sql, params, table_name, page_size=None):
+    """
+    Declares a server-side cursor for `sql` and returns its first page.
+
+    Returns (column_names, type_codes, rows, continuation_token); the token is None once the
+    result is exhausted, in which case the stream has already been closed.
+    """
+    _reap_expired()
+    with _streams_lock:
+        if len(_streams) >= MAX_OPEN_STREAMS:
+            raise StreamError(f"Too many open result streams ({MAX_OPEN_STREAMS}); finish or abandon one first.")
+        token = secrets.token_urlsafe(16)
+        # Reserve the slot before the (slow) checkout so concurrent opens respect the limit
+        _streams[token] = None
+
+    pool = connection_pool.get_pool()
+    try:
+        connection = pool.getconn()
+    except Exception:
+        with _streams_lock:
+            del _streams[token]
+        raise
+
+    try:
+        # A named cursor only streams inside a transaction; in autocommit mode it
+        # would need WITH HOLD, which materializes the whole result up front.
+        connection.autocommit = False
+        cursor = connection.cursor(name=f"mcp_stream_{secrets.token_hex(8)}")
+        cursor.execute(sql, tuple(params))
+        stream = ResultStream(token, pool, connection, cursor, table_name)
+        with stream.lock:
+            rows, exhausted = stream.fetch_page(clamp_page_size(page_size))
+    except Exception:
+        with _streams_lock:
+            del _streams[token]
+        try:
+            connection.rollback()
+            connection.autocommit = True
+            pool.putconn(connection)
+        except Exception:
+            pool.putconn(connection, discard=True)
+        raise
+
+    with _streams_lock:
+        _streams[token] = stream
+    with stream.lock:
+        return _finish_page(stream, rows, exhausted)
+
+
+def fetch_next_page(token, page_size=None):
+    """Returns (column_names, type_codes, rows, continuation_token, table_name) for the next page of an open stream."""
+    _reap_expired()
+    with _streams_lock:
+        stream = _streams.get(token)
+    if stream is None:
+        raise StreamError("Unknown or expired continuation_token.")
+    with stream.lock:
+        if stream.closed:
+            raise StreamError("Unknown or expired continuation_token.")
+        rows, exhausted = stream.fetch_page(clamp_page_size(page_size))
+        return _finish_page(stream, rows, exhausted) + (stream.table_name,)
+
+
+def close_stream(token):
+    """Closes a stream early, releasing its connection. Returns False if the token was unknown."""
+    with _streams_lock:
+        stream = _streams.get(token)
+        if stream is None:
+            return False
+        del _streams[token]
+    with stream.lock:
+        stream.close()
+    return True
+
+
+def _finish_page(stream, rows, exhausted):
+    """Must be called with stream.lock held."""
+    stream.last_used = time.monotonic()
+    if exhausted:
+        with _streams_lock:
+            _streams.pop(stream.token, None)
+        stream.close()
+        return stream.column_names, stream.type_codes, rows, None
+    return stream.column_names, stream.type_codes, rows, stream.token
+
+
+def stream_stats():
+    with _streams_lock:
+        return {"open_streams": sum(1 for stream in _streams.values() if stream is not None), "max_open_streams": MAX_OPEN_STREAMS}
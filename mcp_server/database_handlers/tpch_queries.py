@@ -0,0 +1,670 @@
+import re
+import datetime
+from decimal import Decimal, InvalidOperation
+
+from psycopg2 import Error
+
+from mcp_server.database_handlers import connection_pool
+from mcp_server.database_handlers import query_builder
+from mcp_server.database_handlers import result_encoding
+
+# The 22 TPC-H queries (spec clause 2.4) with their substitution parameters.
+# Parameters are written %(name)s and bound at execution time, so each query is
+# prepared once per pooled connection. Literal '%' never appears in the SQL, since
+# the prepared text is sent without interpolation: LIKE patterns are bound as
+# parameters built in `derive`. Q15's view is expressed as a CTE.
+
+REGIONS = ["AFRICA", "AMERICA", "ASIA", "EUROPE", "MIDDLE EAST"]
+NATIONS = [
+    "ALGERIA", "ARGENTINA", "BRAZIL", "CANADA", "EGYPT", "ETHIOPIA", "FRANCE", "GERMANY", "INDIA", "INDONESIA",
+    "IRAN", "IRAQ", "JAPAN", "JORDAN", "KENYA", "MOROCCO", "MOZAMBIQUE", "PERU", "CHINA", "ROMANIA",
+    "SAUDI ARABIA", "VIETNAM", "RUSSIA", "UNITED KINGDOM", "UNITED STATES",
+]
+SEGMENTS = ["AUTOMOBILE", "BUILDING", "FURNITURE", "MACHINERY", "HOUSEHOLD"]
+SHIPMODES = ["REG AIR", "AIR", "RAIL", "SHIP", "TRUCK", "MAIL", "FOB"]
+CONTAINER_SIZES = ["SM", "LG", "MED", "JUMBO", "WRAP"]
+CONTAINER_TYPES = ["CASE", "BOX", "BAG", "JAR", "PKG", "PACK", "CAN", "DRUM"]
+TYPE_SYLLABLES_1 = ["STANDARD", "SMALL", "MEDIUM", "LARGE", "ECONOMY", "PROMO"]
+TYPE_SYLLABLES_2 = ["ANODIZED", "BURNISHED", "PLATED", "POLISHED", "BRUSHED"]
+TYPE_SYLLABLES_3 = ["TIN", "NICKEL", "BRASS", "STEEL", "COPPER"]
+COLORS = [
+    "almond", "antique", "aquamarine", "azure", "beige", "bisque", "black", "blanched", "blue", "blush", "brown",
+    "burlywood", "burnished", "chartreuse", "chiffon", "chocolate", "coral", "cornflower", "cornsilk", "cream",
+    "cyan", "dark", "deep", "dim", "dodger", "drab", "firebrick", "floral", "forest", "frosted", "gainsboro",
+    "ghost", "goldenrod", "green", "grey", "honeydew", "hot", "indian", "ivory", "khaki", "lace", "lavender",
+    "lawn", "lemon", "light", "lime", "linen", "magenta", "maroon", "medium", "metallic", "midnight", "mint",
+    "misty", "moccasin", "navajo", "navy", "olive", "orange", "orchid", "pale", "papaya", "peach", "peru", "pink",
+    "plum", "powder", "puff", "purple", "red", "rose", "rosy", "royal", "saddle", "salmon", "sandy", "seashell",
+    "sienna", "sky", "slate", "smoke", "snow", "spring", "steel", "tan", "thistle", "tomato", "turquoise",
+    "violet", "wheat", "white", "yellow",
+]
+PART_TYPES = [f"{a} {b} {c}" for a in TYPE_SYLLABLES_1 for b in TYPE_SYLLABLES_2 for c in TYPE_SYLLABLES_3]
+PART_TYPE_PREFIXES = [f"{a} {b}" for a in TYPE_SYLLABLES_1 for b in TYPE_SYLLABLES_2]
+BRANDS = [f"Brand#{m}{n}" for m in range(1, 6) for n in range(1, 6)]
+COUNTRY_CODES = [str(code) for code in range(10, 35)]
+
+
+class TPCHParameterError(ValueError):
+    """Raised when a substitution parameter is outside the range the spec allows."""
+
+
+class Param:
+    """A typed substitution parameter with its spec default and allowed values."""
+
+    def __init__(self, kind, default, choices=None, minimum=None, maximum=None, length=None, description=""):
+        self.kind = kind  # int, decimal, date, text, text_list or int_list
+        self.default = default
+        self.choices = choices
+        self.minimum = minimum
+        self.maximum = maximum
+        self.length = length
+        self.description = description
+
+    def _scalar(self, name, value, kind):
+        try:
+            if kind == "int":
+                if isinstance(value, bool):
+                    raise ValueError
+                value = int(value)
+            elif kind == "decimal":
+                value = Decimal(str(value))
+            elif kind == "date":
+                value = value if isinstance(value, datetime.date) else datetime.date.fromisoformat(str(value))
+            elif not isinstance(value, str):
+                raise ValueError
+        except (ValueError, InvalidOperation):
+            raise TPCHParameterError(f"{name}: {value!r} is not a valid {kind}.")
+        if self.choices is not None and value not in self.choices:
+            raise TPCHParameterError(f"{name}: {value!r} is not one of the values the spec allows.")
+        if self.minimum is not None and value < self.minimum:
+            raise TPCHParameterError(f"{name}: {value} is below the minimum {self.minimum}.")
+        if self.maximum is not None and value > self.maximum:
+            raise TPCHParameterError(f"{name}: {value} is above the maximum {self.maximum}.")
+        return value
+
+    def validate(self, name, value):
+        if value is None:
+            value = self.default
+        if self.kind.endswith("_list"):
+            if not isinstance(value, (list, tuple)):
+                raise TPCHParameterError(f"{name} must be a list.")
+            if self.length is not None and len(value) != self.length:
+                raise TPCHParameterError(f"{name} must have exactly {self.length} values.")
+            if len(set(value)) != len(value):
+                raise TPCHParameterError(f"{name} values must be distinct.")
+            return [self._scalar(name, item, self.kind[:-5]) for item in value]
+        return self._scalar(name, value, self.kind)
+
+
+def _date(text):
+    return datetime.date.fromisoformat(text)
+
+
+QUERIES = {
+    "Q1": {
+        "title": "Pricing Summary Report",
+        "tables": ["lineitem"],
+        "params": {"delta": Param("int", 90, minimum=60, maximum=120, description="Days before 1998-12-01 to cut off shipments.")},
+        "sql": """
+            SELECT l_returnflag, l_linestatus,
+                   sum(l_quantity) AS sum_qty,
+                   sum(l_extendedprice) AS sum_base_price,
+                   sum(l_extendedprice * (1 - l_discount)) AS sum_disc_price,
+                   sum(l_extendedprice * (1 - l_discount) * (1 + l_tax)) AS sum_charge,
+                   avg(l_quantity) AS avg_qty,
+                   avg(l_extendedprice) AS avg_price,
+                   avg(l_discount) AS avg_disc,
+                   count(*) AS count_order
+            FROM lineitem
+            WHERE l_shipdate <= date '1998-12-01' - %(delta)s::int * interval '1 day'
+            GROUP BY l_returnflag, l_linestatus
+            ORDER BY l_returnflag, l_linestatus
+        """,
+    },
+    "Q2": {
+        "title": "Minimum Cost Supplier",
+        "tables": ["part", "supplier", "partsupp", "nation", "region"],
+        "params": {
+            "size": Param("int", 15, minimum=1, maximum=50, description="Part size."),
+            "type": Param("text", "BRASS", choices=TYPE_SYLLABLES_3, description="Last syllable of the part type."),
+            "region": Param("text", "EUROPE", choices=REGIONS, description="Supplier region."),
+        },
+        "derive": lambda p: {"type_pattern": "%" + p["type"]},
+        "sql": """
+            SELECT s_acctbal, s_name, n_name, p_partkey, p_mfgr, s_address, s_phone, s_comment
+            FROM part, supplier, partsupp, nation, region
+            WHERE p_partkey = ps_partkey
+              AND s_suppkey = ps_suppkey
+              AND p_size = %(size)s::int
+              AND p_type LIKE %(type_pattern)s
+              AND s_nationkey = n_nationkey
+              AND n_regionkey = r_regionkey
+              AND r_name = %(region)s
+              AND ps_supplycost = (
+                  SELECT min(ps_supplycost)
+                  FROM partsupp, supplier, nation, region
+                  WHERE p_partkey = ps_partkey
+                    AND s_suppkey = ps_suppkey
+                    AND s_nationkey = n_nationkey
+                    AND n_regionkey = r_regionkey
+                    AND r_name = %(region)s
+              )
+            ORDER BY s_acctbal DESC, n_name, s_name, p_partkey
+            LIMIT 100
+        """,
+    },
+    "Q3": {
+        "title": "Shipping Priority",
+        "tables": ["customer", "orders", "lineitem"],
+        "params": {
+            "segment": Param("text", "BUILDING", choices=SEGMENTS, description="Customer market segment."),
+            "date": Param("date", _date("1995-03-15"), minimum=_date("1995-03-01"), maximum=_date("1995-03-31"), description="Order/ship cut-off date in March 1995."),
+        },
+        "sql": """
+            SELECT l_orderkey, sum(l_extendedprice * (1 - l_discount)) AS revenue, o_orderdate, o_shippriority
+            FROM customer, orders, lineitem
+            WHERE c_mktsegment = %(segment)s
+              AND c_custkey = o_custkey
+              AND l_orderkey = o_orderkey
+              AND o_orderdate < %(date)s::date
+              AND l_shipdate > %(date)s::date
+            GROUP BY l_orderkey, o_orderdate, o_shippriority
+            ORDER BY revenue DESC, o_orderdate
+            LIMIT 10
+        """,
+    },
+    "Q4": {
+        "title": "Order Priority Checking",
+        "tables": ["orders", "lineitem"],
+        "params": {"date": Param("date", _date("1993-07-01"), minimum=_date("1993-01-01"), maximum=_date("1997-10-01"), description="First day of the quarter (a month between 1993-01 and 1997-10).")},
+        "sql": """
+            SELECT o_orderpriority, count(*) AS order_count
+            FROM orders
+            WHERE o_orderdate >= %(date)s::date
+              AND o_orderdate < %(date)s::date + interval '3 month'
+              AND EXISTS (
+                  SELECT * FROM lineitem
+                  WHERE l_orderkey = o_orderkey AND l_commitdate < l_receiptdate
+              )
+            GROUP BY o_orderpriority
+            ORDER BY o_orderpriority
+        """,
+    },
+    "Q5": {
+        "title": "Local Supplier Volume",
+        "tables": ["customer", "orders", "lineitem", "supplier", "nation", "region"],
+        "params": {
+            "region": Param("text", "ASIA", choices=REGIONS, description="Region of customers and suppliers."),
+            "date": Param("date", _date("1994-01-01"), minimum=_date("1993-01-01"), maximum=_date("1997-01-01"), description="January 1st of a year between 1993 and 1997."),
+        },
+        "sql": """
+            SELECT n_name, sum(l_extendedprice * (1 - l_discount)) AS revenue
+            FROM customer, orders, lineitem, supplier, nation, region
+            WHERE c_custkey = o_custkey
+              AND l_orderkey = o_orderkey
+              AND l_suppkey = s_suppkey
+              AND c_nationkey = s_nationkey
+              AND s_nationkey = n_nationkey
+              AND n_regionkey = r_regionkey
+              AND r_name = %(region)s
+              AND o_orderdate >= %(date)s::date
+              AND o_orderdate < %(date)s::date + interval '1 year'
+            GROUP BY n_name
+            ORDER BY revenue DESC
+        """,
+    },
+    "Q6": {
+        "title": "Forecasting Revenue Change",
+        "tables": ["lineitem"],
+        "params": {
+            "date": Param("date", _date("1994-01-01"), minimum=_date("1993-01-01"), maximum=_date("1997-01-01"), description="January 1st of a year between 1993 and 1997."),
+            "discount": Param("decimal", Decimal("0.06"), minimum=Decimal("0.02"), maximum=Decimal("0.09"), description="Discount, 0.02 to 0.09."),
+            "quantity": Param("int", 24, minimum=24, maximum=25, description="Quantity threshold, 24 or 25."),
+        },
+        "sql": """
+            SELECT sum(l_extendedprice * l_discount) AS revenue
+            FROM lineitem
+            WHERE l_shipdate >= %(date)s::date
+              AND l_shipdate < %(date)s::date + interval '1 year'
+              AND l_discount BETWEEN %(discount)s::numeric - 0.01 AND %(discount)s::numeric + 0.01
+              AND l_quantity < %(quantity)s::int
+        """,
+    },
+    "Q7": {
+        "title": "Volume Shipping",
+        "tables": ["supplier", "lineitem", "orders", "customer", "nation"],
+        "params": {
+            "nation1": Param("text", "FRANCE", choices=NATIONS, description="First nation."),
+            "nation2": Param("text", "GERMANY", choices=NATIONS, description="Second nation, different from the first."),
+        },
+        "sql": """
+            SELECT supp_nation, cust_nation, l_year, sum(volume) AS revenue
+            FROM (
+                SELECT n1.n_name AS supp_nation, n2.n_name AS cust_nation,
+                       extract(year FROM l_shipdate) AS l_year,
+                       l_extendedprice * (1 - l_discount) AS volume
+                FROM supplier, lineitem, orders, customer, nation n1, nation n2
+                WHERE s_suppkey = l_suppkey
+                  AND o_orderkey = l_orderkey
+                  AND c_custkey = o_custkey
+                  AND s_nationkey = n1.n_nationkey
+                  AND c_nationkey = n2.n_nationkey
+                  AND ((n1.n_name = %(nation1)s AND n2.n_name = %(nation2)s)
+                    OR (n1.n_name = %(nation2)s AND n2.n_name = %(nation1)s))
+                  AND l_shipdate BETWEEN date '1995-01-01' AND date '1996-12-31'
+            ) AS shipping
+            GROUP BY supp_nation, cust_nation, l_year
+            ORDER BY supp_nation, cust_nation, l_year
+        """,
+    },
+    "Q8": {
+        "title": "National Market Share",
+        "tables": ["part", "supplier", "lineitem", "orders", "customer", "nation", "region"],
+        "params": {
+            "nation": Param("text", "BRAZIL", choices=NATIONS, description="Nation whose market share is measured."),
+            "region": Param("text", "AMERICA", choices=REGIONS, description="Region the nation belongs to."),
+            "type": Param("text", "ECONOMY ANODIZED STEEL", choices=PART_TYPES, description="Full three-syllable part type."),
+        },
+        "sql": """
+            SELECT o_year,
+                   sum(CASE WHEN nation = %(nation)s THEN volume ELSE 0 END) / sum(volume) AS mkt_share
+            FROM (
+                SELECT extract(year FROM o_orderdate) AS o_year,
+                       l_extendedprice * (1 - l_discount) AS volume,
+                       n2.n_name AS nation
+                FROM part, supplier, lineitem, orders, customer, nation n1, nation n2, region
+                WHERE p_partkey = l_partkey
+                  AND s_suppkey = l_suppkey
+                  AND l_orderkey = o_orderkey
+                  AND o_custkey = c_custkey
+                  AND c_nationkey = n1.n_nationkey
+                  AND n1.n_regionkey = r_regionkey
+                  AND r_name = %(region)s
+                  AND s_nationkey = n2.n_nationkey
+                  AND o_orderdate BETWEEN date '1995-01-01' AND date '1996-12-31'
+                  AND p_type = %(type)s
+            ) AS all_nations
+            GROUP BY o_year
+            ORDER BY o_year
+        """,
+    },
+    "Q9": {
+        "title": "Product Type Profit Measure",
+        "tables": ["part", "supplier", "lineitem", "partsupp", "orders", "nation"],
+        "params": {"color": Param("text", "green", choices=COLORS, description="Color word in the part name.")},
+        "derive": lambda p: {"color_pattern": "%" + p["color"] + "%"},
+        "sql": """
+            SELECT nation, o_year, sum(amount) AS sum_profit
+            FROM (
+                SELECT n_name AS nation,
+                       extract(year FROM o_orderdate) AS o_year,
+                       l_extendedprice * (1 - l_discount) - ps_supplycost * l_quantity AS amount
+                FROM part, supplier, lineitem, partsupp, orders, nation
+                WHERE s_suppkey = l_suppkey
+                  AND ps_suppkey = l_suppkey
+                  AND ps_partkey = l_partkey
+                  AND p_partkey = l_partkey
+                  AND o_orderkey = l_orderkey
+                  AND s_nationkey = n_nationkey
+                  AND p_name LIKE %(color_pattern)s
+            ) AS profit
+            GROUP BY nation, o_year
+            ORDER BY nation, o_year DESC
+        """,
+    },
+    "Q10": {
+        "title": "Returned Item Reporting",
+        "tables": ["customer", "orders", "lineitem", "nation"],
+        "params": {"date": Param("date", _date("1993-10-01"), minimum=_date("1993-02-01"), maximum=_date("1995-01-01"), description="First day of a month between 1993-02 and 1995-01.")},
+        "sql": """
+            SELECT c_custkey, c_name, sum(l_extendedprice * (1 - l_discount)) AS revenue,
+                   c_acctbal, n_name, c_address, c_phone, c_comment
+            FROM customer, orders, lineitem, nation
+            WHERE c_custkey = o_custkey
+              AND l_orderkey = o_orderkey
+              AND o_orderdate >= %(date)s::date
+              AND o_orderdate < %(date)s::date + interval '3 month'
+              AND l_returnflag = 'R'
+              AND c_nationkey = n_nationkey
+            GROUP BY c_custkey, c_name, c_acctbal, c_phone, n_name, c_address, c_comment
+            ORDER BY revenue DESC
+            LIMIT 20
+        """,
+    },
+    "Q11": {
+        "title": "Important Stock Identification",
+        "tables": ["partsupp", "supplier", "nation"],
+        "params": {
+            "nation": Param("text", "GERMANY", choices=NATIONS, description="Supplier nation."),
+            "fraction": Param("decimal", Decimal("0.0001"), minimum=Decimal("0"), maximum=Decimal("1"), description="0.0001 divided by the scale factor."),
+        },
+        "sql": """
+            SELECT ps_partkey, sum(ps_supplycost * ps_availqty) AS value
+            FROM partsupp, supplier, nation
+            WHERE ps_suppkey = s_suppkey
+              AND s_nationkey = n_nationkey
+              AND n_name = %(nation)s
+            GROUP BY ps_partkey
+            HAVING sum(ps_supplycost * ps_availqty) > (
+                SELECT sum(ps_supplycost * ps_availqty) * %(fraction)s::numeric
+                FROM partsupp, supplier, nation
+                WHERE ps_suppkey = s_suppkey
+                  AND s_nationkey = n_nationkey
+                  AND n_name = %(nation)s
+            )
+            ORDER BY value DESC
+        """,
+    },
+    "Q12": {
+        "title": "Shipping Modes and Order Priority",
+        "tables": ["orders", "lineitem"],
+        "params": {
+            "shipmodes": Param("text_list", ["MAIL", "SHIP"], choices=SHIPMODES, length=2, description="Two different ship modes."),
+            "date": Param("date", _date("1994-01-01"), minimum=_date("1993-01-01"), maximum=_date("1997-01-01"), description="January 1st of a year between 1993 and 1997."),
+        },
+        "sql": """
+            SELECT l_shipmode,
+                   sum(CASE WHEN o_orderpriority = '1-URGENT' OR o_orderpriority = '2-HIGH' THEN 1 ELSE 0 END) AS high_line_count,
+                   sum(CASE WHEN o_orderpriority <> '1-URGENT' AND o_orderpriority <> '2-HIGH' THEN 1 ELSE 0 END) AS low_line_count
+            FROM orders, lineitem
+            WHERE o_orderkey = l_orderkey
+              AND l_shipmode = ANY(%(shipmodes)s::text[])
+              AND l_commitdate < l_receiptdate
+              AND l_shipdate < l_commitdate
+              AND l_receiptdate >= %(date)s::date
+              AND l_receiptdate < %(date)s::date + interval '1 year'
+            GROUP BY l_shipmode
+            ORDER BY l_shipmode
+        """,
+    },
+    "Q13": {
+        "title": "Customer Distribution",
+        "tables": ["customer", "orders"],
+        "params": {
+            "word1": Param("text", "special", choices=["special", "pending", "unusual", "express"], description="First comment word."),
+            "word2": Param("text", "requests", choices=["packages", "requests", "accounts", "deposits"], description="Second comment word."),
+        },
+        "derive": lambda p: {"comment_pattern": "%" + p["word1"] + "%" + p["word2"] + "%"},
+        "sql": """
+            SELECT c_count, count(*) AS custdist
+            FROM (
+                SELECT c_custkey, count(o_orderkey) AS c_count
+                FROM customer LEFT OUTER JOIN orders
+                  ON c_custkey = o_custkey AND o_comment NOT LIKE %(comment_pattern)s
+                GROUP BY c_custkey
+            ) AS c_orders
+            GROUP BY c_count
+            ORDER BY custdist DESC, c_count DESC
+        """,
+    },
+    "Q14": {
+        "title": "Promotion Effect",
+        "tables": ["lineitem", "part"],
+        "params": {"date": Param("date", _date("1995-09-01"), minimum=_date("1993-01-01"), maximum=_date("1997-12-01"), description="First day of a month between 1993 and 1997.")},
+        "derive": lambda p: {"promo_pattern": "PROMO%"},
+        "sql": """
+            SELECT 100.00 * sum(CASE WHEN p_type LIKE %(promo_pattern)s THEN l_extendedprice * (1 - l_discount) ELSE 0 END)
+                   / sum(l_extendedprice * (1 - l_discount)) AS promo_revenue
+            FROM lineitem, part
+            WHERE l_partkey = p_partkey
+              AND l_shipdate >= %(date)s::date
+              AND l_shipdate < %(date)s::date + interval '1 month'
+        """,
+    },
+    "Q15": {
+        "title": "Top Supplier",
+        "tables": ["supplier", "lineitem"],
+        "params": {"date": Param("date", _date("1996-01-01"), minimum=_date("1993-01-01"), maximum=_date("1997-10-01"), description="First day of the quarter (a month between 1993-01 and 1997-10).")},
+        "sql": """
+            WITH revenue AS (
+                SELECT l_suppkey AS supplier_no, sum(l_extendedprice * (1 - l_discount)) AS total_revenue
+                FROM lineitem
+                WHERE l_shipdate >= %(date)s::date
+                  AND l_shipdate < %(date)s::date + interval '3 month'
+                GROUP BY l_suppkey
+            )
+            SELECT s_suppkey, s_name, s_address, s_phone, total_revenue
+            FROM supplier, revenue
+            WHERE s_suppkey = supplier_no
+              AND total_revenue = (SELECT max(total_revenue) FROM revenue)
+            ORDER BY s_suppkey
+        """,
+    },
+    "Q16": {
+        "title": "Parts/Supplier Relationship",
+        "tables": ["partsupp", "part", "supplier"],
+        "params": {
+            "brand": Param("text", "Brand#45", choices=BRANDS, description="Excluded brand, Brand#MN."),
+            "type": Param("text", "MEDIUM POLISHED", choices=PART_TYPE_PREFIXES, description="Excluded first two syllables of the part type."),
+            "sizes": Param("int_list", [49, 14, 23, 45, 19, 3, 36, 9], minimum=1, maximum=50, length=8, description="Eight different sizes between 1 and 50."),
+        },
+        "derive": lambda p: {"type_pattern": p["type"] + "%", "complaints_pattern": "%Customer%Complaints%"},
+        "sql": """
+            SELECT p_brand, p_type, p_size, count(DISTINCT ps_suppkey) AS supplier_cnt
+            FROM partsupp, part
+            WHERE p_partkey = ps_partkey
+              AND p_brand <> %(brand)s
+              AND p_type NOT LIKE %(type_pattern)s
+              AND p_size = ANY(%(sizes)s::int[])
+              AND ps_suppkey NOT IN (
+                  SELECT s_suppkey FROM supplier
+                  WHERE s_comment LIKE %(complaints_pattern)s
+              )
+            GROUP BY p_brand, p_type, p_size
+            ORDER BY supplier_cnt DESC, p_brand, p_type, p_size
+        """,
+    },
+    "Q17": {
+        "title": "Small-Quantity-Order Revenue",
+        "tables": ["lineitem", "part"],
+        "params": {
+            "brand": Param("text", "Brand#23", choices=BRANDS, description="Part brand, Brand#MN."),
+            "container": Param("text", "MED BOX", choices=[f"{size} {kind}" for size in CONTAINER_SIZES for kind in CONTAINER_TYPES], description="Part container."),
+        },
+        "sql": """
+            SELECT sum(l_extendedprice) / 7.0 AS avg_yearly
+            FROM lineitem, part
+            WHERE p_partkey = l_partkey
+              AND p_brand = %(brand)s
+              AND p_container = %(container)s
+              AND l_quantity < (
+                  SELECT 0.2 * avg(l_quantity) FROM lineitem WHERE l_partkey = p_partkey
+              )
+        """,
+    },
+    "Q18": {
+        "title": "Large Volume Customer",
+        "tables": ["customer", "orders", "lineitem"],
+        "params": {"quantity": Param("int", 300, minimum=300, maximum=315, description="Total order quantity threshold, 312 to 315 (300 for validation).")},
+        "sql": """
+            SELECT c_name, c_custkey, o_orderkey, o_orderdate, o_totalprice, sum(l_quantity)
+            FROM customer, orders, lineitem
+            WHERE o_orderkey IN (
+                  SELECT l_orderkey FROM lineitem
+                  GROUP BY l_orderkey HAVING sum(l_quantity) > %(quantity)s::int
+              )
+              AND c_custkey = o_custkey
+              AND o_orderkey = l_orderkey
+            GROUP BY c_name, c_custkey, o_orderkey, o_orderdate, o_totalprice
+            ORDER BY o_totalprice DESC, o_orderdate
+            LIMIT 100
+        """,
+    },
+    "Q19": {
+        "title": "Discounted Revenue",
+        "tables": ["lineitem", "part"],
+        "params": {
+            "quantity1": Param("int", 1, minimum=1, maximum=10, description="Quantity for the first brand, 1 to 10."),
+            "quantity2": Param("int", 10, minimum=10, maximum=20, description="Quantity for the second brand, 10 to 20."),
+            "quantity3": Param("int", 20, minimum=20, maximum=30, description="Quantity for the third brand, 20 to 30."),
+            "brand1": Param("text", "Brand#12", choices=BRANDS, description="First brand."),
+            "brand2": Param("text", "Brand#23", choices=BRANDS, description="Second brand."),
+            "brand3": Param("text", "Brand#34", choices=BRANDS, description="Third brand."),
+        },
+        "sql": """
+            SELECT sum(l_extendedprice * (1 - l_discount)) AS revenue
+            FROM lineitem, part
+            WHERE (
+                    p_partkey = l_partkey
+                AND p_brand = %(brand1)s
+                AND p_container IN ('SM CASE', 'SM BOX', 'SM PACK', 'SM PKG')
+                AND l_quantity >= %(quantity1)s::int AND l_quantity <= %(quantity1)s::int + 10
+                AND p_size BETWEEN 1 AND 5
+                AND l_shipmode IN ('AIR', 'AIR REG')
+                AND l_shipinstruct = 'DELIVER IN PERSON'
+            ) OR (
+                    p_partkey = l_partkey
+                AND p_brand = %(brand2)s
+                AND p_container IN ('MED BAG', 'MED BOX', 'MED PKG', 'MED PACK')
+                AND l_quantity >= %(quantity2)s::int AND l_quantity <= %(quantity2)s::int + 10
+                AND p_size BETWEEN 1 AND 10
+                AND l_shipmode IN ('AIR', 'AIR REG')
+                AND l_shipinstruct = 'DELIVER IN PERSON'
+            ) OR (
+                    p_partkey = l_partkey
+                AND p_brand = %(brand3)s
+                AND p_container IN ('LG CASE', 'LG BOX', 'LG PACK', 'LG PKG')
+                AND l_quantity >= %(quantity3)s::int AND l_quantity <= %(quantity3)s::int + 10
+                AND p_size BETWEEN 1 AND 15
+                AND l_shipmode IN ('AIR', 'AIR REG')
+                AND l_shipinstruct = 'DELIVER IN PERSON'
+            )
+        """,
+    },
+    "Q20": {
+        "title": "Potential Part Promotion",
+        "tables": ["supplier", "nation", "partsupp", "part", "lineitem"],
+        "params": {
+            "color": Param("text", "forest", choices=COLORS, description="Color the part name starts with."),
+            "date": Param("date", _date("1994-01-01"), minimum=_date("1993-01-01"), maximum=_date("1997-01-01"), description="January 1st of a year between 1993 and 1997."),
+            "nation": Param("text", "CANADA", choices=NATIONS, description="Supplier nation."),
+        },
+        "derive": lambda p: {"color_pattern": p["color"] + "%"},
+        "sql": """
+            SELECT s_name, s_address
+            FROM supplier, nation
+            WHERE s_suppkey IN (
+                  SELECT ps_suppkey FROM partsupp
+                  WHERE ps_partkey IN (SELECT p_partkey FROM part WHERE p_name LIKE %(color_pattern)s)
+                    AND ps_availqty > (
+                        SELECT 0.5 * sum(l_quantity) FROM lineitem
+                        WHERE l_partkey = ps_partkey
+                          AND l_suppkey = ps_suppkey
+                          AND l_shipdate >= %(date)s::date
+                          AND l_shipdate < %(date)s::date + interval '1 year'
+                    )
+              )
+              AND s_nationkey = n_nationkey
+              AND n_name = %(nation)s
+            ORDER BY s_name
+        """,
+    },
+    "Q21": {
+        "title": "Suppliers Who Kept Orders Waiting",
+        "tables": ["supplier", "lineitem", "orders", "nation"],
+        "params": {"nation": Param("text", "SAUDI ARABIA", choices=NATIONS, description="Supplier nation.")},
+        "sql": """
+            SELECT s_name, count(*) AS numwait
+            FROM supplier, lineitem l1, orders, nation
+            WHERE s_suppkey = l1.l_suppkey
+              AND o_orderkey = l1.l_orderkey
+              AND o_orderstatus = 'F'
+              AND l1.l_receiptdate > l1.l_commitdate
+              AND EXISTS (
+                  SELECT * FROM lineitem l2
+                  WHERE l2.l_orderkey = l1.l_orderkey AND l2.l_suppkey <> l1.l_suppkey
+              )
+              AND NOT EXISTS (
+                  SELECT * FROM lineitem l3
+                  WHERE l3.l_orderkey = l1.l_orderkey
+                    AND l3.l_suppkey <> l1.l_suppkey
+                    AND l3.l_receiptdate > l3.l_commitdate
+              )
+              AND s_nationkey = n_nationkey
+              AND n_name = %(nation)s
+            GROUP BY s_name
+            ORDER BY numwait DESC, s_name
+            LIMIT 100
+        """,
+    },
+    "Q22": {
+        "title": "Global Sales Opportunity",
+        "tables": ["customer", "orders"],
+        "params": {"country_codes": Param("text_list", ["13", "31", "23", "29", "30", "18", "17"], choices=COUNTRY_CODES, length=7, description="Seven distinct phone country codes, 10 to 34.")},
+        "sql": """
+            SELECT cntrycode, count(*) AS numcust, sum(c_acctbal) AS totacctbal
+            FROM (
+                SELECT substring(c_phone FROM 1 FOR 2) AS cntrycode, c_acctbal
+                FROM customer
+                WHERE substring(c_phone FROM 1 FOR 2) = ANY(%(country_codes)s::text[])
+                  AND c_acctbal > (
+                      SELECT avg(c_acctbal) FROM customer
+                      WHERE c_acctbal > 0.00
+                        AND substring(c_phone FROM 1 FOR 2) = ANY(%(country_codes)s::text[])
+                  )
+                  AND NOT EXISTS (SELECT * FROM orders WHERE o_custkey = c_custkey)
+            ) AS custsale
+            GROUP BY cntrycode
+            ORDER BY cntrycode
+        """,
+    },
+}
+
+_NAMED_PARAMETER = re.compile(r"%\((\w+)\)s")
+
+
+def bind(query_id, arguments=None):
+    """
+    Validates a query's substitution parameters and returns (sql, params) with
+    positional %s placeholders, ready for query_builder.prepare. Missing
+    arguments take the spec's validation defaults.
+    """
+    definition = QUERIES.get(query_id)
+    if definition is None:
+        raise TPCHParameterError(f"Unknown TPC-H query '{query_id}'.")
+    arguments = dict(arguments or {})
+    unknown = set(arguments) - set(definition["params"])
+    if unknown:
+        raise TPCHParameterError(f"{query_id} has no parameter(s): {', '.join(sorted(unknown))}.")
+
+    values = {name: spec.validate(name, arguments.get(name)) for name, spec in definition["params"].items()}
+    if query_id == "Q7" and values["nation1"] == values["nation2"]:
+        raise TPCHParameterError("nation1 and nation2 must be different.")
+    if "derive" in definition:
+        values.update(definition["derive"](values))
+
+    params = []
+
+    def positional(match):
+        params.append(values[match.group(1)])
+        return "%s"
+
+    sql = _NAMED_PARAMETER.sub(positional, " ".join(definition["sql"].split()))
+    return sql, params
+
+
+def execute_tpch_query(query_id, arguments=None):
+    """Runs one of the TPC-H queries as a prepared statement on a pooled connection."""
+    try:
+        sql, params = bind(query_id, arguments)
+    except TPCHParameterError as error:
+        return {"status": "error", "message": str(error)}
+
+    try:
+        with connection_pool.connection() as connection, connection.cursor() as cursor:
+            run_sql, run_params = query_builder.prepare(connection, cursor, sql, params)
+            cursor.execute(run_sql, tuple(run_params))
+            column_names = [desc[0] for desc in cursor.description]
+            rows = cursor.fetchall()
+    except (connection_pool.PoolTimeoutError, ValueError) as error:
+        return {"status": "error", "message": str(error)}
+    except (Exception, Error) as error:
+        print(f"Error during TPC-H {query_id}: {error}")
+        return {"status": "error", "message": f"TPC-H {query_id} failed: {error}"}
+
+    return {
+        "status": "success",
+        "message": f"TPC-H {query_id} ({QUERIES[query_id]['title']}) returned {len(rows)} rows.",
+        "data": result_encoding.encode_rows(column_names, rows),
+        "column_names": column_names,
+    }
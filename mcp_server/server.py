@@ -1,6 +1,15 @@
+import os
+import time
 from fastmcp import FastMCP
 import logging
 from mcp_server.database_handlers import query_executor # Import the query_executor
+from mcp_server.database_handlers import connection_pool
+from mcp_server.database_handlers import async_executor
+from mcp_server.database_handlers import result_streams
+from mcp_server.database_handlers import result_cache
+from mcp_server.database_handlers import query_builder
+from mcp_server.database_handlers import call_log
+from mcp_server.tpch_tools import register_tpch_tools
 import uvicorn
 
 logging.basicConfig(level=logging.INFO)
@@ -25,6 +34,36 @@ def get_tpch_schema() -> dict:
         ]
     }
 
+# Expose connection pool counters so the pool can be sized from real traffic
+@mcp.resource("metrics://pool")
+def get_pool_metrics() -> dict:
+    """Reports connection pool size, in-use and idle counts, checkout wait times, open result streams and prepared statement reuse."""
+    return {**connection_pool.pool_stats(), **result_streams.stream_stats(), **query_builder.prepared_statement_stats()}
+
+# Expose result cache counters to judge whether the TTLs and memory budget fit the traffic
+@mcp.resource("metrics://cache")
+def get_cache_metrics() -> dict:
+    """Reports result cache size, hit/miss counters, hit ratio, evictions and invalidations."""
+    return result_cache.cache_stats()
+
+# Expose the server's memory use so load tests can watch it over time
+@mcp.resource("metrics://process")
+def get_process_metrics() -> dict:
+    """Reports the server process's resident memory (current and peak) and thread count, from /proc/self/status."""
+    fields = {"VmRSS": "rss_bytes", "VmHWM": "peak_rss_bytes", "Threads": "threads"}
+    metrics = {"pid": os.getpid()}
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                name, _, value = line.partition(":")
+                if name in fields:
+                    amount = int(value.split()[0])
+                    # Memory lines are in kB; Threads is a plain count
+                    metrics[fields[name]] = amount * 1024 if value.strip().endswith("kB") else amount
+    except OSError:
+        logger.warning("/proc/self/status is not available; process metrics are limited to the pid.")
+    return metrics
+
 # Define the prompt for the LLM to convert NL to MCP tool requests
 @mcp.prompt("nl_to_mcp_tool_prompt")
 def nl_to_mcp_tool_prompt(natural_language_question: str) -> str:
@@ -108,7 +147,7 @@ def summarize_query_results_prompt(query_results: str) -> str:
 # Register the database query tool
 @mcp.tool(name="query_database")
 
-def query_database_tool(table_name: str, select_columns: list = None, where_conditions: list = None, order_by: str = None, limit: int = None, join_tables: list = None, join_conditions: list = None) -> dict:
+async def query_database_tool(table_name: str, select_columns: list = None, where_conditions: list = None, order_by: str = None, limit: int = None, join_tables: list = None, join_conditions: list = None, filters: list = None, stream: bool = False, page_size: int = None, continuation_token: str = None, result_format: str = "rows") -> dict:
     """Executes a SQL SELECT query on the TPC-H database and returns the results.
 
     Args:
@@ -117,9 +156,21 @@ def query_database_tool(table_name: str, select_columns: list = None, where_cond
         where_conditions (list, optional): A list of SQL WHERE clause conditions (e.g., 'c_custkey = 1', 'o_totalprice > 100.00'). Be careful with SQL injection!
         order_by (str, optional): The column to order the results by, optionally with 'ASC' or 'DESC' (e.g., 'c_name ASC', 'o_orderdate DESC').
         limit (int, optional): The maximum number of rows to return.
+        filters (list, optional): Structured conditions, preferred over where_conditions. Each is an object
+            {"column": "o_totalprice", "op": ">", "value": 100}; op is one of =, !=, <, <=, >, >=, like, not like,
+            ilike, in, not in (list value), between ([low, high] value), is null, is not null. Columns are checked
+            against the schema and values are sent as bind parameters, so repeated query shapes reuse their plan.
+        stream (bool, optional): Return the result one page at a time from a server-side cursor instead of all at once. Use this for large results.
+        page_size (int, optional): Rows per page when streaming. Defaults to 1000.
+        continuation_token (str, optional): Token from a previous streamed response; fetches the next page of that result and ignores the other query arguments.
+        result_format (str, optional): Layout of "data". "rows" (default) is a list of row objects; "columnar" is one array per
+            column in column_names order, with column_types (decimals are exact strings, dates ISO-8601); "arrow" is a base64-encoded Arrow IPC stream.
 
     Returns:
-        dict: The result of the query, including status, message, and data.
+        dict: The result of the query, including status, message, and data. Streamed responses also
+        include continuation_token and has_more; continuation_token is null on the last page.
+        Queries the planner expects to be too large are capped or rejected; cost_guard carries
+        the estimate and the reason. Use explain_query to check a query first.
     """
     prompt_arguments = {
         "table_name": table_name,
@@ -128,13 +179,69 @@ def query_database_tool(table_name: str, select_columns: list = None, where_cond
         "order_by": order_by,
         "limit": limit,
         "join_tables": join_tables if join_tables is not None else [],
-        "join_conditions": join_conditions if join_conditions is not None else []
+        "join_conditions": join_conditions if join_conditions is not None else [],
+        "filters": filters if filters is not None else [],
+        "stream": stream,
+        "page_size": page_size,
+        "continuation_token": continuation_token,
+        "result_format": result_format
     }
-    return query_executor.execute_query_prompt(prompt_arguments)
+    started_at, start = time.time(), time.perf_counter()
+    # Run the blocking query on the worker pool so slow scans don't stall other sessions
+    response = await async_executor.execute_query_prompt_async(prompt_arguments)
+    if call_log.enabled():
+        call_log.record("query_database", prompt_arguments, started_at, time.perf_counter() - start, response)
+    return response
+
+# Let agents check a query's plan before running it
+@mcp.tool(name="explain_query")
+async def explain_query_tool(table_name: str, select_columns: list = None, where_conditions: list = None, order_by: str = None, limit: int = None, join_tables: list = None, join_conditions: list = None, filters: list = None) -> dict:
+    """Shows the PostgreSQL planner's estimates for a query_database request without running it.
+
+    Takes the same query arguments as query_database. Use it to check whether a join or scan is
+    cheap enough before querying; query_database rejects or caps queries whose estimated rows or
+    cost exceed the server's limits.
+
+    Returns:
+        dict: The generated SQL, the estimated rows and cost, the cost guard's verdict and the full JSON plan.
+    """
+    prompt_arguments = {
+        "table_name": table_name,
+        "select_columns": select_columns if select_columns is not None else ["*"],
+        "where_conditions": where_conditions if where_conditions is not None else [],
+        "order_by": order_by,
+        "limit": limit,
+        "join_tables": join_tables if join_tables is not None else [],
+        "join_conditions": join_conditions if join_conditions is not None else [],
+        "filters": filters if filters is not None else []
+    }
+    return await async_executor.run_blocking(query_executor.explain_query_prompt, prompt_arguments)
+
+# Let agents release a streamed result they no longer need instead of waiting for it to expire
+@mcp.tool(name="close_result_stream")
+async def close_result_stream_tool(continuation_token: str) -> dict:
+    """Closes a streamed query_database result early and frees its database connection.
+
+    Args:
+        continuation_token (str): The continuation_token of the stream to close.
+
+    Returns:
+        dict: The status of the request.
+    """
+    closed = await async_executor.run_blocking(result_streams.close_stream, continuation_token)
+    if not closed:
+        return {"status": "error", "message": "Unknown or expired continuation_token."}
+    return {"status": "success", "message": "Result stream closed."}
+
+register_tpch_tools(mcp)
 
 if __name__ == "__main__":
     logger.info("Starting MCP Database Server...")
     app = mcp.http_app()
     logger.info("Starting Uvicorn server...")
     uvicorn.run(app, host="0.0.0.0", port=8001)
+    result_cache.stop_listener()
+    call_log.close()
+    async_executor.shutdown_executor()
+    connection_pool.close_pool()
     logger.info("MCP Database Server stopped.")
@@ -0,0 +1,235 @@
+from mcp_server.database_handlers import async_executor
+from mcp_server.database_handlers import tpch_queries
+
+# One MCP tool per TPC-H query. Arguments are the spec's substitution parameters;
+# anything left out takes the spec's validation default. Results use the same
+# {status, message, data, column_names} shape as query_database.
+
+
+async def _run(query_id, **arguments):
+    arguments = {name: value for name, value in arguments.items() if value is not None}
+    return await async_executor.run_blocking(tpch_queries.execute_tpch_query, query_id, arguments)
+
+
+def register_tpch_tools(mcp):
+    """Registers the tpch_q1 ... tpch_q22 tools on the given FastMCP server."""
+
+    @mcp.tool(name="tpch_q1")
+    async def tpch_q1(delta: int = None) -> dict:
+        """TPC-H Q1, Pricing Summary Report: quantity, price, discount and tax totals by return flag and line status.
+
+        Args:
+            delta (int, optional): Days before 1998-12-01 that shipments must precede, 60 to 120. Default 90.
+        """
+        return await _run("Q1", delta=delta)
+
+    @mcp.tool(name="tpch_q2")
+    async def tpch_q2(size: int = None, type: str = None, region: str = None) -> dict:
+        """TPC-H Q2, Minimum Cost Supplier: which supplier in a region offers a part of a given size and type at the lowest cost.
+
+        Args:
+            size (int, optional): Part size, 1 to 50. Default 15.
+            type (str, optional): Last syllable of the part type: TIN, NICKEL, BRASS, STEEL or COPPER. Default BRASS.
+            region (str, optional): Region name, e.g. EUROPE. Default EUROPE.
+        """
+        return await _run("Q2", size=size, type=type, region=region)
+
+    @mcp.tool(name="tpch_q3")
+    async def tpch_q3(segment: str = None, date: str = None) -> dict:
+        """TPC-H Q3, Shipping Priority: the 10 unshipped orders with the highest revenue for a market segment.
+
+        Args:
+            segment (str, optional): Market segment, e.g. BUILDING. Default BUILDING.
+            date (str, optional): Cut-off date in March 1995 (YYYY-MM-DD). Default 1995-03-15.
+        """
+        return await _run("Q3", segment=segment, date=date)
+
+    @mcp.tool(name="tpch_q4")
+    async def tpch_q4(date: str = None) -> dict:
+        """TPC-H Q4, Order Priority Checking: orders per priority in a quarter with at least one late line item.
+
+        Args:
+            date (str, optional): First day of the quarter, a month between 1993-01 and 1997-10 (YYYY-MM-DD). Default 1993-07-01.
+        """
+        return await _run("Q4", date=date)
+
+    @mcp.tool(name="tpch_q5")
+    async def tpch_q5(region: str = None, date: str = None) -> dict:
+        """TPC-H Q5, Local Supplier Volume: revenue per nation from customers buying from suppliers in the same nation.
+
+        Args:
+            region (str, optional): Region name, e.g. ASIA. Default ASIA.
+            date (str, optional): January 1st of a year between 1993 and 1997. Default 1994-01-01.
+        """
+        return await _run("Q5", region=region, date=date)
+
+    @mcp.tool(name="tpch_q6")
+    async def tpch_q6(date: str = None, discount: float = None, quantity: int = None) -> dict:
+        """TPC-H Q6, Forecasting Revenue Change: revenue gained by eliminating a band of discounts in a year.
+
+        Args:
+            date (str, optional): January 1st of a year between 1993 and 1997. Default 1994-01-01.
+            discount (float, optional): Discount, 0.02 to 0.09. Default 0.06.
+            quantity (int, optional): Quantity threshold, 24 or 25. Default 24.
+        """
+        return await _run("Q6", date=date, discount=discount, quantity=quantity)
+
+    @mcp.tool(name="tpch_q7")
+    async def tpch_q7(nation1: str = None, nation2: str = None) -> dict:
+        """TPC-H Q7, Volume Shipping: value of goods shipped between two nations in 1995 and 1996.
+
+        Args:
+            nation1 (str, optional): First nation. Default FRANCE.
+            nation2 (str, optional): Second nation, different from the first. Default GERMANY.
+        """
+        return await _run("Q7", nation1=nation1, nation2=nation2)
+
+    @mcp.tool(name="tpch_q8")
+    async def tpch_q8(nation: str = None, region: str = None, type: str = None) -> dict:
+        """TPC-H Q8, National Market Share: a nation's share of its region's revenue for a part type in 1995 and 1996.
+
+        Args:
+            nation (str, optional): Nation name. Default BRAZIL.
+            region (str, optional): Region the nation belongs to. Default AMERICA.
+            type (str, optional): Full part type, e.g. ECONOMY ANODIZED STEEL. Default ECONOMY ANODIZED STEEL.
+        """
+        return await _run("Q8", nation=nation, region=region, type=type)
+
+    @mcp.tool(name="tpch_q9")
+    async def tpch_q9(color: str = None) -> dict:
+        """TPC-H Q9, Product Type Profit Measure: profit per nation and year on parts whose name contains a color.
+
+        Args:
+            color (str, optional): Color word, e.g. green. Default green.
+        """
+        return await _run("Q9", color=color)
+
+    @mcp.tool(name="tpch_q10")
+    async def tpch_q10(date: str = None) -> dict:
+        """TPC-H Q10, Returned Item Reporting: the 20 customers who lost the most revenue to returns in a quarter.
+
+        Args:
+            date (str, optional): First day of a month between 1993-02 and 1995-01. Default 1993-10-01.
+        """
+        return await _run("Q10", date=date)
+
+    @mcp.tool(name="tpch_q11")
+    async def tpch_q11(nation: str = None, fraction: float = None) -> dict:
+        """TPC-H Q11, Important Stock Identification: the parts making up a significant share of a nation's stock value.
+
+        Args:
+            nation (str, optional): Supplier nation. Default GERMANY.
+            fraction (float, optional): 0.0001 divided by the scale factor. Default 0.0001.
+        """
+        return await _run("Q11", nation=nation, fraction=fraction)
+
+    @mcp.tool(name="tpch_q12")
+    async def tpch_q12(shipmodes: list = None, date: str = None) -> dict:
+        """TPC-H Q12, Shipping Modes and Order Priority: late line items per ship mode, split by order priority.
+
+        Args:
+            shipmodes (list, optional): Two different ship modes, e.g. ["MAIL", "SHIP"]. Default ["MAIL", "SHIP"].
+            date (str, optional): January 1st of a year between 1993 and 1997. Default 1994-01-01.
+        """
+        return await _run("Q12", shipmodes=shipmodes, date=date)
+
+    @mcp.tool(name="tpch_q13")
+    async def tpch_q13(word1: str = None, word2: str = None) -> dict:
+        """TPC-H Q13, Customer Distribution: how many customers have placed 0, 1, 2, ... orders, ignoring special orders.
+
+        Args:
+            word1 (str, optional): special, pending, unusual or express. Default special.
+            word2 (str, optional): packages, requests, accounts or deposits. Default requests.
+        """
+        return await _run("Q13", word1=word1, word2=word2)
+
+    @mcp.tool(name="tpch_q14")
+    async def tpch_q14(date: str = None) -> dict:
+        """TPC-H Q14, Promotion Effect: percentage of a month's revenue that came from promotional parts.
+
+        Args:
+            date (str, optional): First day of a month between 1993 and 1997. Default 1995-09-01.
+        """
+        return await _run("Q14", date=date)
+
+    @mcp.tool(name="tpch_q15")
+    async def tpch_q15(date: str = None) -> dict:
+        """TPC-H Q15, Top Supplier: the supplier(s) with the highest revenue in a quarter.
+
+        Args:
+            date (str, optional): First day of the quarter, a month between 1993-01 and 1997-10. Default 1996-01-01.
+        """
+        return await _run("Q15", date=date)
+
+    @mcp.tool(name="tpch_q16")
+    async def tpch_q16(brand: str = None, type: str = None, sizes: list = None) -> dict:
+        """TPC-H Q16, Parts/Supplier Relationship: suppliers able to supply parts outside a brand, type and size set.
+
+        Args:
+            brand (str, optional): Excluded brand, Brand#MN with M and N 1 to 5. Default Brand#45.
+            type (str, optional): Excluded type prefix, e.g. MEDIUM POLISHED. Default MEDIUM POLISHED.
+            sizes (list, optional): Eight different sizes, 1 to 50. Default [49, 14, 23, 45, 19, 3, 36, 9].
+        """
+        return await _run("Q16", brand=brand, type=type, sizes=sizes)
+
+    @mcp.tool(name="tpch_q17")
+    async def tpch_q17(brand: str = None, container: str = None) -> dict:
+        """TPC-H Q17, Small-Quantity-Order Revenue: yearly revenue lost if small orders of a part were not filled.
+
+        Args:
+            brand (str, optional): Brand#MN with M and N 1 to 5. Default Brand#23.
+            container (str, optional): Container, e.g. MED BOX. Default MED BOX.
+        """
+        return await _run("Q17", brand=brand, container=container)
+
+    @mcp.tool(name="tpch_q18")
+    async def tpch_q18(quantity: int = None) -> dict:
+        """TPC-H Q18, Large Volume Customer: the top 100 customers by orders above a total quantity.
+
+        Args:
+            quantity (int, optional): Total order quantity threshold, 312 to 315 (300 for validation). Default 300.
+        """
+        return await _run("Q18", quantity=quantity)
+
+    @mcp.tool(name="tpch_q19")
+    async def tpch_q19(quantity1: int = None, quantity2: int = None, quantity3: int = None, brand1: str = None, brand2: str = None, brand3: str = None) -> dict:
+        """TPC-H Q19, Discounted Revenue: gross discounted revenue for three brand, container and quantity combinations.
+
+        Args:
+            quantity1 (int, optional): 1 to 10. Default 1.
+            quantity2 (int, optional): 10 to 20. Default 10.
+            quantity3 (int, optional): 20 to 30. Default 20.
+            brand1 (str, optional): Default Brand#12.
+            brand2 (str, optional): Default Brand#23.
+            brand3 (str, optional): Default Brand#34.
+        """
+        return await _run("Q19", quantity1=quantity1, quantity2=quantity2, quantity3=quantity3, brand1=brand1, brand2=brand2, brand3=brand3)
+
+    @mcp.tool(name="tpch_q20")
+    async def tpch_q20(color: str = None, date: str = None, nation: str = None) -> dict:
+        """TPC-H Q20, Potential Part Promotion: suppliers in a nation with excess stock of parts named after a color.
+
+        Args:
+            color (str, optional): Color the part name starts with. Default forest.
+            date (str, optional): January 1st of a year between 1993 and 1997. Default 1994-01-01.
+            nation (str, optional): Supplier nation. Default CANADA.
+        """
+        return await _run("Q20", color=color, date=date, nation=nation)
+
+    @mcp.tool(name="tpch_q21")
+    async def tpch_q21(nation: str = None) -> dict:
+        """TPC-H Q21, Suppliers Who Kept Orders Waiting: suppliers who were the only late supplier on multi-supplier orders.
+
+        Args:
+            nation (str, optional): Supplier nation. Default SAUDI ARABIA.
+        """
+        return await _run("Q21", nation=nation)
+
+    @mcp.tool(name="tpch_q22")
+    async def tpch_q22(country_codes: list = None) -> dict:
+        """TPC-H Q22, Global Sales Opportunity: customers in given country codes with above-average balances and no orders.
+
+        Args:
+            country_codes (list, optional): Seven distinct phone country codes, "10" to "34". Default ["13", "31", "23", "29", "30", "18", "17"].
+        """
+        return await _run("Q22", country_codes=country_codes)
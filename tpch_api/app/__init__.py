@@ -8,8 +8,23 @@ def create_app():
     app.config.from_object('config.Config')
     db.init_app(app)
 
+    # orjson for every jsonify and get_json; compression negotiated per request
+    from .serialization import OrjsonProvider
+    from .compression import compress_response
+    app.json = OrjsonProvider(app)
+    if app.config['COMPRESS_RESPONSES']:
+        app.after_request(compress_response)
+
+    # Tell the MCP server's result cache which tables each commit wrote to
+    from . import cache_invalidation
+    cache_invalidation.register(db)
+
+    # Cache GETs on small tables in process; commits above drop what they wrote
+    from . import table_cache
+    table_cache.init_app(app)
+
     with app.app_context():
-        from .routes import region, nation, part, supplier, partsupp, customer, orders, lineitem
+        from .routes import region, nation, part, supplier, partsupp, customer, orders, lineitem, metrics
         app.register_blueprint(region.bp)
         app.register_blueprint(nation.bp)
         app.register_blueprint(part.bp)
@@ -18,6 +33,7 @@ def create_app():
         app.register_blueprint(customer.bp)
         app.register_blueprint(orders.bp)
         app.register_blueprint(lineitem.bp)
+        app.register_blueprint(metrics.bp)
         
         db.create_all()
 
@@ -0,0 +1,279 @@
+import datetime
+import decimal
+import io
+import math
+
+import orjson
+import psycopg2
+from flask import current_app, jsonify, request
+from sqlalchemy import column as sql_column, inspect, select, table as sql_table
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import DBAPIError
+
+from . import db
+from .cache_invalidation import notify_table_written
+
+BULK_MODES = ('upsert', 'insert')
+
+# Rows are validated straight into COPY text fields, so a value is checked and
+# formatted in one step and never becomes a Python object the database driver
+# has to format again.
+COPY_NULL = '\\N'
+
+
+def _int_field(value):
+    if type(value) is int:
+        return str(value)
+    if isinstance(value, bool):
+        raise ValueError("expected an integer")
+    if isinstance(value, float):
+        if not value.is_integer():
+            raise ValueError("expected an integer")
+        return str(int(value))
+    return str(int(value))
+
+
+def _decimal_field(value):
+    if type(value) is int:
+        return str(value)
+    if type(value) is float:
+        if not math.isfinite(value):
+            raise ValueError("expected a finite number")
+        return repr(value)
+    if not isinstance(value, str):
+        raise ValueError("expected a number")
+    try:
+        number = decimal.Decimal(value)
+    except decimal.InvalidOperation:
+        raise ValueError("expected a number")
+    if not number.is_finite():
+        raise ValueError("expected a finite number")
+    return str(number)
+
+
+def _date_field(value):
+    if not isinstance(value, str):
+        raise ValueError("expected an ISO date (YYYY-MM-DD)")
+    return datetime.date.fromisoformat(value).isoformat()
+
+
+def _string_field(length):
+    def to_field(value):
+        if not isinstance(value, str):
+            raise ValueError("expected a string")
+        if length is not None and len(value) > length:
+            raise ValueError(f"longer than {length} characters")
+        if '\\' in value or '\t' in value or '\n' in value or '\r' in value:
+            value = value.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+        return value
+    return to_field
+
+
+def _field_converter(column):
+    python_type = column.type.python_type
+    if python_type is int:
+        return _int_field
+    if python_type is decimal.Decimal:
+        return _decimal_field
+    if python_type is datetime.date:
+        return _date_field
+    return _string_field(getattr(column.type, 'length', None))
+
+
+_validators = {}
+
+
+def _validator(model):
+    """((column, converter, required) in table order, primary key positions, column names), built once per model."""
+    if model not in _validators:
+        columns = list(model.__table__.columns)
+        names = [column.key for column in columns]
+        _validators[model] = (
+            [(column.key, _field_converter(column), not column.nullable) for column in columns],
+            [names.index(column.key) for column in inspect(model).primary_key],
+            frozenset(names),
+        )
+    return _validators[model]
+
+
+def validate_row(model, row):
+    """The row as COPY text fields in table column order. Raises ValueError naming the bad column."""
+    fields_spec, _, names = _validator(model)
+    if not isinstance(row, dict):
+        raise ValueError("expected an object")
+    unknown = row.keys() - names
+    if unknown:
+        raise ValueError(f"unknown column(s): {', '.join(sorted(unknown))}")
+    fields = []
+    for name, convert, required in fields_spec:
+        value = row.get(name)
+        if value is None:
+            if required:
+                raise ValueError(f"missing required column {name}")
+            # A nullable column left out is NULL; for an upsert that overwrites it
+            fields.append(COPY_NULL)
+            continue
+        try:
+            fields.append(convert(value))
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"{name}: {e}")
+    return fields
+
+
+def read_rows():
+    """The request body's rows, from a JSON array or NDJSON (one object per line). NDJSON lines that don't parse come back as ValueErrors."""
+    if request.mimetype == 'application/x-ndjson':
+        rows = []
+        for line in request.get_data(as_text=True).splitlines():
+            if not line.strip():
+                continue
+            try:
+                rows.append(orjson.loads(line))
+            except ValueError as e:
+                rows.append(ValueError(f"invalid JSON: {e}"))
+        return rows
+    rows = request.get_json(silent=True)
+    if not isinstance(rows, list):
+        raise ValueError("Expected a JSON array of rows or an application/x-ndjson body.")
+    return rows
+
+
+def _db_error(error):
+    original = getattr(error, 'orig', error)
+    diag = getattr(original, 'diag', None)
+    if diag is not None and diag.message_primary:
+        return diag.message_primary + (f" ({diag.message_detail})" if diag.message_detail else "")
+    return str(original).splitlines()[0]
+
+
+class _CopyWriter:
+    """
+    Writes batches of COPY lines. Inserts are COPYed straight into the table. Upserts
+    are COPYed into a temporary staging table and moved into the table with one
+    INSERT ... SELECT ... ON CONFLICT DO UPDATE; the staging table is dropped when the
+    transaction ends.
+    """
+
+    def __init__(self, model, mode):
+        table = model.__table__
+        fields_spec, key_positions, _ = _validator(model)
+        self.names = [name for name, _, _ in fields_spec]
+        self.target = table.name
+        self.move = None
+        if mode == 'upsert':
+            key = [self.names[position] for position in key_positions]
+            self.target = f'bulk_{table.name}'
+            db.session.connection().exec_driver_sql(f'CREATE TEMP TABLE IF NOT EXISTS {self.target} (LIKE {table.name} INCLUDING DEFAULTS) ON COMMIT DROP')
+            staging = sql_table(self.target, *(sql_column(name) for name in self.names))
+            move = insert(table).from_select(self.names, select(staging))
+            self.move = move.on_conflict_do_update(
+                index_elements=key,
+                set_={name: move.excluded[name] for name in self.names if name not in key},
+            )
+
+    def write(self, lines):
+        # Asked for inside the batch's begin_nested(), so the SAVEPOINT is emitted before the COPY
+        connection = db.session.connection()
+        cursor = connection.connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY {self.target} ({', '.join(self.names)}) FROM STDIN", io.StringIO(''.join(lines)))
+        finally:
+            cursor.close()
+        if self.move is not None:
+            connection.execute(self.move)
+            connection.exec_driver_sql(f'TRUNCATE {self.target}')
+
+
+def bulk_write(model):
+    """
+    Writes a JSON array or NDJSON body of rows to `model`'s table in one transaction.
+    ?mode=upsert (default) updates rows whose primary key exists; ?mode=insert makes
+    that an error. Rows are validated against the model first; the valid ones are
+    written BULK_BATCH_SIZE at a time through COPY, each batch under a savepoint. A
+    batch the database rejects is retried row by row to find the offending rows, the
+    rest are kept. ?atomic=1 rolls the whole request back if any row fails.
+
+    Responds 201 when every row was written, 207 when some were rejected and 422 when
+    none were written, with per-batch counts and the rejected rows' errors.
+    """
+    mode = request.args.get('mode', 'upsert')
+    if mode not in BULK_MODES:
+        return jsonify({'message': f"mode must be one of {', '.join(BULK_MODES)}"}), 400
+    atomic = request.args.get('atomic', '').lower() in ('1', 'true', 'yes')
+    try:
+        rows = read_rows()
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+    _, key_positions, _ = _validator(model)
+    errors = []
+    valid = []
+    seen = {}
+    for index, row in enumerate(rows):
+        try:
+            if isinstance(row, ValueError):
+                raise row
+            fields = validate_row(model, row)
+            # Two rows with one key can't go in the same INSERT ... ON CONFLICT
+            row_key = tuple(fields[position] for position in key_positions)
+            if row_key in seen:
+                raise ValueError(f"duplicate primary key; same as row {seen[row_key]}")
+            seen[row_key] = index
+            valid.append((index, '\t'.join(fields) + '\n'))
+        except ValueError as e:
+            errors.append({'row': index, 'error': str(e)})
+
+    batches = []
+    written = 0
+    if valid and not (atomic and errors):
+        batch_size = current_app.config['BULK_BATCH_SIZE']
+        notify_table_written(db.session, model.__tablename__)
+        writer = _CopyWriter(model, mode)
+        for start in range(0, len(valid), batch_size):
+            batch = valid[start:start + batch_size]
+            batch_errors = []
+            try:
+                with db.session.begin_nested():
+                    writer.write([line for _, line in batch])
+            except (DBAPIError, psycopg2.Error):
+                # An atomic request is rolled back anyway, so the first bad row is enough to report
+                batch_errors = _find_bad_rows(writer, batch, stop_at_first=atomic)
+            errors.extend(batch_errors)
+            batches.append({'batch': len(batches), 'rows': len(batch), 'written': len(batch) - len(batch_errors), 'errors': len(batch_errors)})
+            written += len(batch) - len(batch_errors)
+            if atomic and batch_errors:
+                break
+
+    if atomic and errors:
+        db.session.rollback()
+        written = 0
+    else:
+        db.session.commit()
+
+    errors.sort(key=lambda error: error['row'])
+    max_errors = current_app.config['BULK_MAX_ERRORS']
+    status = 201 if not errors else 207 if written else 422
+    return jsonify({
+        'table': model.__tablename__,
+        'mode': mode,
+        'received': len(rows),
+        'written': written,
+        'rejected': len(rows) - written,
+        'batches': batches,
+        'errors': errors[:max_errors],
+        'errors_truncated': len(errors) > max_errors,
+    }), status
+
+
+def _find_bad_rows(writer, batch, stop_at_first=False):
+    """Writes a rejected batch one row at a time, each under its own savepoint, and returns the rows the database refused."""
+    errors = []
+    for index, line in batch:
+        try:
+            with db.session.begin_nested():
+                writer.write([line])
+        except (DBAPIError, psycopg2.Error) as e:
+            errors.append({'row': index, 'error': _db_error(e)})
+            if stop_at_first:
+                break
+    return errors
@@ -0,0 +1,59 @@
+from itertools import chain
+
+from sqlalchemy import event, text
+
+# Must match INVALIDATION_CHANNEL in mcp_server/database_handlers/result_cache.py
+INVALIDATION_CHANNEL = 'tpch_table_changed'
+
+# Tables written in the current transaction, kept in session.info
+WRITTEN_TABLES_KEY = 'tpch_written_tables'
+
+# Called with the set of tables a transaction wrote, after it commits
+_commit_listeners = []
+
+
+def on_tables_committed(callback):
+    """Registers `callback(tables)` to run after every commit that wrote to `tables`."""
+    _commit_listeners.append(callback)
+
+
+def notify_table_written(session, table_name):
+    """
+    Records that `table_name` was written in the session's current transaction.
+
+    On PostgreSQL this also queues a NOTIFY for the MCP server's result cache.
+    NOTIFY is transactional, so it is only delivered if the transaction commits,
+    and repeats of the same table within one transaction are collapsed.
+    """
+    written = session.info.setdefault(WRITTEN_TABLES_KEY, set())
+    if table_name in written:
+        return
+    written.add(table_name)
+    connection = session.connection()
+    if connection.dialect.name == 'postgresql':
+        connection.execute(text('SELECT pg_notify(:channel, :table)'), {'channel': INVALIDATION_CHANNEL, 'table': table_name})
+
+
+def _after_flush(session, flush_context):
+    for instance in chain(session.new, session.dirty, session.deleted):
+        table = getattr(instance, '__table__', None)
+        if table is not None:
+            notify_table_written(session, table.name)
+
+
+def _after_commit(session):
+    written = session.info.pop(WRITTEN_TABLES_KEY, None)
+    if written:
+        for callback in _commit_listeners:
+            callback(written)
+
+
+def _end_transaction(session, *args):
+    session.info.pop(WRITTEN_TABLES_KEY, None)
+
+
+def register(db):
+    """Hooks the session so every ORM write publishes the tables it touched."""
+    event.listen(db.session, 'after_flush', _after_flush)
+    event.listen(db.session, 'after_commit', _after_commit)
+    event.listen(db.session, 'after_rollback', _end_transaction)
@@ -0,0 +1,99 @@
+import zlib
+
+from flask import current_app, request
+
+# Compressible response types; anything else (or already encoded) is left alone
+COMPRESSIBLE_MIMETYPES = {'application/json', 'application/x-ndjson', 'text/csv', 'text/plain', 'text/html'}
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+
+def available_encodings():
+    """Content-Encodings the server can produce, in order of preference."""
+    return ['zstd', 'gzip'] if _zstd() is not None else ['gzip']
+
+
+class _GzipCompressor:
+    def __init__(self, level):
+        # wbits 31: gzip container rather than a raw zlib stream
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self.compressor.compress(data)
+
+    def flush_block(self):
+        return self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self.compressor.flush(zlib.Z_FINISH)
+
+
+class _ZstdCompressor:
+    def __init__(self, level):
+        zstandard = _zstd()
+        self.flush_mode = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        self.compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data):
+        return self.compressor.compress(data)
+
+    def flush_block(self):
+        return self.compressor.flush(self.flush_mode)
+
+    def finish(self):
+        return self.compressor.flush()
+
+
+def _compressor(encoding):
+    if encoding == 'zstd':
+        return _ZstdCompressor(current_app.config['ZSTD_LEVEL'])
+    return _GzipCompressor(current_app.config['GZIP_LEVEL'])
+
+
+def _compress_stream(chunks, compressor):
+    # Each chunk is flushed as it is compressed, so a streamed export keeps its early first byte
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        data = compressor.compress(chunk) + compressor.flush_block()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+def compress_response(response):
+    """
+    after_request hook: compresses the body with the best encoding the client
+    accepts (zstd, then gzip). Small bodies, error responses, incompressible types
+    and bodies already encoded are sent as they are. Streamed responses are
+    compressed chunk by chunk.
+    """
+    response.vary.add('Accept-Encoding')
+    if (response.status_code not in (200, 201, 207) or response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or 'Content-Encoding' in response.headers or request.method == 'HEAD'):
+        return response
+    encoding = request.accept_encodings.best_match(available_encodings())
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        response.response = _compress_stream(response.response, _compressor(encoding))
+        response.headers.pop('Content-Length', None)
+    else:
+        body = response.get_data()
+        if len(body) < current_app.config['COMPRESS_MIN_SIZE']:
+            return response
+        compressor = _compressor(encoding)
+        response.set_data(compressor.compress(body) + compressor.finish())
+    response.headers['Content-Encoding'] = encoding
+    # A strong ETag names exact bytes, and these aren't the bytes it was computed on; weaken it, as nginx does
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
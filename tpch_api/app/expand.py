@@ -0,0 +1,120 @@
+from flask import current_app, request
+from sqlalchemy import inspect, select, tuple_
+from sqlalchemy.orm import joinedload
+from sqlalchemy.orm.attributes import set_committed_value
+
+from . import db
+from .serialization import row_serializer
+
+# Deepest ?expand= path accepted, e.g. lineitem?expand=order.customer.nation
+MAX_EXPAND_DEPTH = 3
+
+
+class ExpandError(ValueError):
+    pass
+
+
+def requested_expansions(model):
+    """
+    The relationships named in ?expand= (comma-separated, dotted for nested ones,
+    such as ?expand=customer,lineitems.partsupp) as a tree: {'lineitems': {'partsupp': {}}}.
+    A path may go through at most one collection, so a response holds at most one
+    level of lists and its size stays a multiple of the page.
+    """
+    tree = {}
+    expand = request.args.get('expand')
+    if not expand:
+        return tree
+    for path in expand.split(','):
+        names = path.strip().split('.')
+        if len(names) > MAX_EXPAND_DEPTH:
+            raise ExpandError(f"expand paths are at most {MAX_EXPAND_DEPTH} relationships deep, got {path!r}")
+        node, node_model = tree, model
+        collections = 0
+        for name in names:
+            relationships = inspect(node_model).relationships
+            if name not in relationships:
+                raise ExpandError(f"Unknown relationship {name!r}; {node_model.__tablename__} has: {', '.join(relationships.keys())}")
+            collections += relationships[name].uselist
+            if collections > 1:
+                raise ExpandError(f"expand paths may go through one list relationship, got {path!r}; use the nested endpoints for deeper lists")
+            node = node.setdefault(name, {})
+            node_model = relationships[name].mapper.class_
+    return tree
+
+
+def loader_options(model, tree):
+    """
+    Joined eager loads for the many-to-one relationships in an expansion tree, so
+    they come back in the statement that loads their parent. Collections are left
+    to load_collections().
+    """
+    options = []
+    for name, subtree in tree.items():
+        relationship = inspect(model).relationships[name]
+        if relationship.uselist:
+            continue
+        # TPC-H foreign keys are NOT NULL, so the join can be an inner one
+        loader = joinedload(getattr(model, name), innerjoin=not any(column.nullable for column in relationship.local_columns))
+        suboptions = loader_options(relationship.mapper.class_, subtree)
+        if suboptions:
+            loader = loader.options(*suboptions)
+        options.append(loader)
+    return options
+
+
+def load_collections(model, instances, tree, budget=None):
+    """
+    Loads the collections in an expansion tree for `instances`: one SELECT per
+    collection for all of its parents at once, with the many-to-one relationships
+    below it joined in. At most EXPAND_MAX_ROWS related rows are loaded per
+    response; past that it raises ExpandError before reading the rest. Returns the
+    budget left.
+    """
+    if budget is None:
+        budget = current_app.config['EXPAND_MAX_ROWS']
+    for name, subtree in tree.items():
+        relationship = inspect(model).relationships[name]
+        if not relationship.uselist:
+            targets = {getattr(instance, name) for instance in instances} - {None}
+            budget = load_collections(relationship.mapper.class_, targets, subtree, budget)
+            continue
+        child = relationship.mapper.class_
+        parent_columns = [local.key for local, _ in relationship.local_remote_pairs]
+        child_columns = [getattr(child, remote.key) for _, remote in relationship.local_remote_pairs]
+        groups = {tuple(getattr(instance, column) for column in parent_columns): [] for instance in instances}
+        if groups:
+            if len(child_columns) == 1:
+                condition = child_columns[0].in_([key for key, in groups])
+            else:
+                condition = tuple_(*child_columns).in_(list(groups))
+            query = select(child).where(condition).options(*loader_options(child, subtree))
+            # One row past the budget tells that the response would be too large
+            children = db.session.scalars(query.order_by(*child_columns, *(relationship.order_by or ())).limit(budget + 1)).all()
+            if len(children) > budget:
+                raise ExpandError(f"expand would return more than {current_app.config['EXPAND_MAX_ROWS']} related rows; "
+                                  f"ask for a smaller page or use the nested endpoint for {name}")
+            budget -= len(children)
+            for row in children:
+                groups[tuple(getattr(row, column.key) for column in child_columns)].append(row)
+        for instance in instances:
+            set_committed_value(instance, name, groups[tuple(getattr(instance, column) for column in parent_columns)])
+    return budget
+
+
+def foreign_key_columns(model, tree):
+    """Columns of `model` its expanded relationships are matched on; they must be loaded even when ?fields= leaves them out."""
+    relationships = inspect(model).relationships
+    return [column for name in tree for column in relationships[name].local_columns]
+
+
+def expanded_row(instance, tree, names=None):
+    """row_dict() of `instance` (or just its `names` columns) with each expanded relationship nested under its name."""
+    row = row_serializer(type(instance), names)(instance)
+    for name, subtree in tree.items():
+        value = getattr(instance, name)
+        if isinstance(value, list):
+            row[name] = [expanded_row(child, subtree) for child in value]
+        else:
+            row[name] = expanded_row(value, subtree) if value is not None else None
+    return row
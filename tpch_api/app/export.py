@@ -0,0 +1,69 @@
+import csv
+import io
+
+from flask import Response, current_app, jsonify, request, stream_with_context
+from sqlalchemy import select
+
+from . import db
+from .filters import requested_columns, requested_filters
+from .serialization import dumps
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+def requested_format():
+    """'ndjson' or 'csv' when the request asks for an export (?format= or Accept), else None."""
+    export_format = request.args.get('format')
+    if export_format in EXPORT_FORMATS:
+        return export_format
+    accepted = request.accept_mimetypes.best_match(['application/json', *EXPORT_FORMATS.values()], default='application/json')
+    return next((name for name, mimetype in EXPORT_FORMATS.items() if mimetype == accepted), None)
+
+
+def _ndjson_chunk(names, rows):
+    # Encoded like the JSON endpoints: ISO dates, Decimals as strings
+    return b''.join(dumps(dict(zip(names, row))) + b'\n' for row in rows)
+
+
+def _csv_chunk(names, rows):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
+
+def export(model, export_format, conditions=()):
+    """
+    Streams the rows of `model` as NDJSON (one object per line) or CSV (with a
+    header row), in no particular order. Rows come from a server-side cursor
+    EXPORT_BATCH_SIZE at a time and each batch is written as soon as it is
+    fetched, so memory stays flat however large the table is. ?fields= and filter
+    parameters narrow the export the same way they narrow a page, as does
+    `conditions` (the nested endpoints pass their parent).
+    """
+    if request.args.get('expand'):
+        # NDJSON and CSV rows are flat; related rows come from their own export
+        return jsonify({'message': "expand isn't supported with exports"}), 400
+    try:
+        columns = requested_columns(model)
+        conditions = [*conditions, *requested_filters(model)]
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    names = [column.key for column in columns]
+    batch_size = current_app.config['EXPORT_BATCH_SIZE']
+    write_chunk = _ndjson_chunk if export_format == 'ndjson' else _csv_chunk
+
+    def generate():
+        if export_format == 'csv':
+            yield _csv_chunk(names, [names])
+        # yield_per fetches through a named (server-side) cursor instead of buffering the result
+        result = db.session.execute(select(*columns).where(*conditions).execution_options(yield_per=batch_size))
+        for rows in result.partitions():
+            yield write_chunk(names, rows)
+
+    response = Response(stream_with_context(generate()), mimetype=EXPORT_FORMATS[export_format])
+    if export_format == 'csv':
+        response.headers['Content-Disposition'] = f'attachment; filename={model.__tablename__}.csv'
+    return response
@@ -0,0 +1,83 @@
+import datetime
+import decimal
+
+from flask import request
+
+# Query parameters the list endpoints use themselves; every other one is a filter
+RESERVED_PARAMS = {'limit', 'after', 'format', 'fields', 'expand'}
+
+# column=value is eq; column.<op>=value for the rest. `in` takes comma-separated values.
+FILTER_OPERATORS = {
+    'eq': lambda column, value: column == value,
+    'ne': lambda column, value: column != value,
+    'lt': lambda column, value: column < value,
+    'lte': lambda column, value: column <= value,
+    'gt': lambda column, value: column > value,
+    'gte': lambda column, value: column >= value,
+    'in': lambda column, values: column.in_(values),
+}
+
+
+class FilterError(ValueError):
+    pass
+
+
+def _parse_value(column, text):
+    python_type = column.type.python_type
+    try:
+        if python_type is int:
+            return int(text)
+        if python_type is decimal.Decimal:
+            value = decimal.Decimal(text)
+            if not value.is_finite():
+                raise ValueError
+            return value
+        if python_type is datetime.date:
+            return datetime.date.fromisoformat(text)
+    except (ValueError, decimal.InvalidOperation):
+        expected = {int: 'an integer', decimal.Decimal: 'a number', datetime.date: 'an ISO date (YYYY-MM-DD)'}[python_type]
+        raise FilterError(f"{column.key}: expected {expected}, got {text!r}")
+    return text
+
+
+def requested_columns(model):
+    """The columns named in ?fields= (comma-separated, in that order), or every column of `model`."""
+    table_columns = model.__table__.columns
+    fields = request.args.get('fields')
+    if not fields:
+        return list(table_columns)
+    columns = []
+    for name in fields.split(','):
+        name = name.strip()
+        if name not in table_columns:
+            raise FilterError(f"Unknown field {name!r}; {model.__tablename__} has: {', '.join(table_columns.keys())}")
+        if table_columns[name] not in columns:
+            columns.append(table_columns[name])
+    return columns
+
+
+def requested_filters(model):
+    """
+    WHERE conditions for the request's filter parameters, such as
+    ?o_orderstatus=F&o_orderdate.gte=1995-01-01. Values are parsed to the column's
+    type, so a malformed one is a FilterError rather than a database error, and
+    repeated parameters are ANDed.
+    """
+    table_columns = model.__table__.columns
+    conditions = []
+    for param, text in request.args.items(multi=True):
+        if param in RESERVED_PARAMS:
+            continue
+        name, _, op = param.partition('.')
+        if name not in table_columns:
+            raise FilterError(f"Unknown filter column {name!r}; {model.__tablename__} has: {', '.join(table_columns.keys())}")
+        op = op or 'eq'
+        if op not in FILTER_OPERATORS:
+            raise FilterError(f"Unknown filter operator {op!r}; use one of {', '.join(FILTER_OPERATORS)}")
+        column = table_columns[name]
+        if op == 'in':
+            value = [_parse_value(column, part) for part in text.split(',')]
+        else:
+            value = _parse_value(column, text)
+        conditions.append(FILTER_OPERATORS[op](column, value))
+    return conditions
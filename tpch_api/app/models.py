@@ -1,15 +1,24 @@
 from . import db
 
+# Relationships back the nested endpoints and ?expand=. They never load lazily
+# (lazy='raise'): a request says up front what it needs and gets it in one
+# statement per relationship (see expand.py). passive_deletes='all' leaves
+# deleting a parent with children to the database's foreign keys, as before.
+
 class Region(db.Model):
     r_regionkey = db.Column(db.Integer, primary_key=True)
     r_name = db.Column(db.String(25), nullable=False)
     r_comment = db.Column(db.String(152))
+    nations = db.relationship('Nation', back_populates='region', order_by='Nation.n_nationkey', lazy='raise', passive_deletes='all')
 
 class Nation(db.Model):
     n_nationkey = db.Column(db.Integer, primary_key=True)
     n_name = db.Column(db.String(25), nullable=False)
     n_regionkey = db.Column(db.Integer, db.ForeignKey('region.r_regionkey'), nullable=False)
     n_comment = db.Column(db.String(152))
+    region = db.relationship('Region', back_populates='nations', lazy='raise')
+    suppliers = db.relationship('Supplier', back_populates='nation', order_by='Supplier.s_suppkey', lazy='raise', passive_deletes='all')
+    customers = db.relationship('Customer', back_populates='nation', order_by='Customer.c_custkey', lazy='raise', passive_deletes='all')
 
 class Part(db.Model):
     p_partkey = db.Column(db.Integer, primary_key=True)
@@ -21,6 +30,7 @@ class Part(db.Model):
     p_container = db.Column(db.String(10), nullable=False)
     p_retailprice = db.Column(db.Numeric, nullable=False)
     p_comment = db.Column(db.String(23), nullable=False)
+    partsupp = db.relationship('Partsupp', back_populates='part', order_by='Partsupp.ps_suppkey', lazy='raise', passive_deletes='all')
 
 class Supplier(db.Model):
     s_suppkey = db.Column(db.Integer, primary_key=True)
@@ -30,6 +40,8 @@ class Supplier(db.Model):
     s_phone = db.Column(db.String(15), nullable=False)
     s_acctbal = db.Column(db.Numeric, nullable=False)
     s_comment = db.Column(db.String(101), nullable=False)
+    nation = db.relationship('Nation', back_populates='suppliers', lazy='raise')
+    partsupp = db.relationship('Partsupp', back_populates='supplier', order_by='Partsupp.ps_partkey', lazy='raise', passive_deletes='all')
 
 class Partsupp(db.Model):
     ps_partkey = db.Column(db.Integer, db.ForeignKey('part.p_partkey'), primary_key=True)
@@ -37,6 +49,9 @@ class Partsupp(db.Model):
     ps_availqty = db.Column(db.Integer, nullable=False)
     ps_supplycost = db.Column(db.Numeric, nullable=False)
     ps_comment = db.Column(db.String(199), nullable=False)
+    part = db.relationship('Part', back_populates='partsupp', lazy='raise')
+    supplier = db.relationship('Supplier', back_populates='partsupp', lazy='raise')
+    lineitems = db.relationship('Lineitem', back_populates='partsupp', order_by='[Lineitem.l_orderkey, Lineitem.l_linenumber]', lazy='raise', passive_deletes='all')
 
 class Customer(db.Model):
     c_custkey = db.Column(db.Integer, primary_key=True)
@@ -47,6 +62,8 @@ class Customer(db.Model):
     c_acctbal = db.Column(db.Numeric, nullable=False)
     c_mktsegment = db.Column(db.String(10), nullable=False)
     c_comment = db.Column(db.String(117), nullable=False)
+    nation = db.relationship('Nation', back_populates='customers', lazy='raise')
+    orders = db.relationship('Orders', back_populates='customer', order_by='Orders.o_orderkey', lazy='raise', passive_deletes='all')
 
 class Orders(db.Model):
     o_orderkey = db.Column(db.Integer, primary_key=True)
@@ -58,6 +75,8 @@ class Orders(db.Model):
     o_clerk = db.Column(db.String(15), nullable=False)
     o_shippriority = db.Column(db.Integer, nullable=False)
     o_comment = db.Column(db.String(79), nullable=False)
+    customer = db.relationship('Customer', back_populates='orders', lazy='raise')
+    lineitems = db.relationship('Lineitem', back_populates='order', order_by='Lineitem.l_linenumber', lazy='raise', passive_deletes='all')
 
 class Lineitem(db.Model):
     l_orderkey = db.Column(db.Integer, db.ForeignKey('orders.o_orderkey'), primary_key=True)
@@ -77,3 +96,5 @@ class Lineitem(db.Model):
     l_shipmode = db.Column(db.String(10), nullable=False)
     l_comment = db.Column(db.String(44), nullable=False)
     __table_args__ = (db.ForeignKeyConstraint([l_partkey, l_suppkey], [Partsupp.ps_partkey, Partsupp.ps_suppkey]), {})
+    order = db.relationship('Orders', back_populates='lineitems', lazy='raise')
+    partsupp = db.relationship('Partsupp', back_populates='lineitems', lazy='raise')
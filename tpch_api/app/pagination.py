@@ -0,0 +1,99 @@
+from flask import current_app, jsonify, request, url_for
+from sqlalchemy import inspect, select, tuple_
+from sqlalchemy.orm import load_only
+
+from . import db
+from .expand import expanded_row, foreign_key_columns, load_collections, loader_options, requested_expansions
+from .filters import requested_columns, requested_filters
+
+# Cursors are the primary key values of a page's last row, comma-separated:
+# "after=1200" for orders, "after=1200,37,5,2" for lineitem.
+CURSOR_SEPARATOR = ','
+
+
+class PaginationError(ValueError):
+    pass
+
+
+def page_size():
+    """The requested ?limit=, defaulting to PAGE_SIZE_DEFAULT and capped at PAGE_SIZE_MAX."""
+    limit = request.args.get('limit')
+    if limit is None:
+        return current_app.config['PAGE_SIZE_DEFAULT']
+    try:
+        limit = int(limit)
+    except ValueError:
+        raise PaginationError(f"limit must be an integer, got {limit!r}")
+    if limit < 1:
+        raise PaginationError("limit must be at least 1")
+    return min(limit, current_app.config['PAGE_SIZE_MAX'])
+
+
+def encode_cursor(values):
+    return CURSOR_SEPARATOR.join(str(value) for value in values)
+
+
+def decode_cursor(cursor, columns):
+    parts = cursor.split(CURSOR_SEPARATOR)
+    if len(parts) != len(columns):
+        raise PaginationError(f"after must have {len(columns)} value(s): {', '.join(column.key for column in columns)}")
+    try:
+        return [column.type.python_type(part) for column, part in zip(columns, parts)]
+    except ValueError:
+        raise PaginationError(f"Invalid cursor {cursor!r}")
+
+
+def paginate(model, conditions=()):
+    """
+    Returns one page of `model` in primary key order as a JSON list, for ?limit= rows
+    after the ?after= cursor. The query seeks to the cursor through the primary key
+    index, so every page costs the same however deep it is. When more rows follow,
+    the response carries the next cursor in X-Next-Cursor and a rel="next" Link.
+
+    ?fields= and filter parameters (see filters.py) are compiled into the SELECT
+    list and the WHERE clause, so only the requested columns and rows are read.
+    `conditions` narrows the rows further (the nested endpoints pass their parent).
+    ?expand= nests related rows in each one (see expand.py).
+    """
+    key = list(inspect(model).primary_key)
+    try:
+        limit = page_size()
+        columns = requested_columns(model)
+        tree = requested_expansions(model)
+        conditions = [*conditions, *requested_filters(model)]
+        after = request.args.get('after')
+        if after:
+            conditions.append(tuple_(*key) > tuple_(*decode_cursor(after, key)))
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+    names = [column.key for column in columns]
+    if tree:
+        # Expansions need instances; load_only keeps the SELECT list to what's asked for
+        # plus the keys the eager loads join on
+        loaded = columns + [column for column in foreign_key_columns(model, tree) if column not in columns]
+        query = select(model).options(load_only(*(getattr(model, column.key) for column in loaded)), *loader_options(model, tree))
+        # One extra row tells whether there is a next page without another query
+        rows = db.session.scalars(query.where(*conditions).order_by(*key).limit(limit + 1)).all()
+        try:
+            load_collections(model, rows[:limit], tree)
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
+        names = tuple(names)
+        response = jsonify([expanded_row(row, tree, names) for row in rows[:limit]])
+        cursor = encode_cursor(inspect(rows[limit - 1]).identity) if len(rows) > limit else None
+    else:
+        # Key columns left out of ?fields= are still selected, after the requested ones, for the cursor
+        selected = columns + [column for column in key if column not in columns]
+        key_positions = [selected.index(column) for column in key]
+        query = select(*selected).where(*conditions).order_by(*key)
+        rows = db.session.execute(query.limit(limit + 1)).all()
+        width = len(names)
+        response = jsonify([dict(zip(names, row[:width])) for row in rows[:limit]])
+        cursor = encode_cursor(rows[limit - 1][position] for position in key_positions) if len(rows) > limit else None
+
+    if cursor is not None:
+        next_url = url_for(request.endpoint, **{**request.args.to_dict(flat=False), **(request.view_args or {}), 'limit': limit, 'after': cursor}, _external=True)
+        response.headers['X-Next-Cursor'] = cursor
+        response.headers['Link'] = f'<{next_url}>; rel="next"'
+    return response
@@ -0,0 +1,52 @@
+from flask import abort, jsonify
+from sqlalchemy import inspect, select
+from sqlalchemy.orm import with_parent
+
+from . import db
+from .expand import expanded_row, load_collections, loader_options, requested_expansions
+from .export import export, requested_format
+from .pagination import paginate
+
+
+def _lookup(model, ident, options=()):
+    # A dict of column values looks the row up by a unique key other than the primary key
+    if isinstance(ident, dict):
+        return db.session.scalars(select(model).filter_by(**ident).options(*options)).one_or_none()
+    return db.session.get(model, ident, options=options)
+
+
+def get_row(model, ident):
+    """
+    One row of `model` by primary key (or a dict of unique key values), with any
+    ?expand= relationships nested in it, plus one statement per expanded collection.
+    404 if there is no such row.
+    """
+    try:
+        tree = requested_expansions(model)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    instance = _lookup(model, ident, loader_options(model, tree))
+    if instance is None:
+        abort(404)
+    try:
+        load_collections(model, [instance], tree)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    return jsonify(expanded_row(instance, tree))
+
+
+def related(model, ident, name):
+    """
+    The `name` collection of one `model` row (/customer/<id>/orders), served like the
+    related table's own list endpoint: paged, projected, filtered, expanded or
+    exported. Costs a primary key lookup of the parent, then the page's statement(s).
+    """
+    parent = db.session.get(model, ident)
+    if parent is None:
+        abort(404)
+    child = inspect(model).relationships[name].mapper.class_
+    conditions = [with_parent(parent, getattr(model, name))]
+    export_format = requested_format()
+    if export_format:
+        return export(child, export_format, conditions)
+    return paginate(child, conditions)
@@ -1,6 +1,10 @@
 from flask import Blueprint, request, jsonify
 from .. import db
+from ..bulk import bulk_write
+from ..export import export, requested_format
 from ..models import Customer
+from ..pagination import paginate
+from ..related import get_row, related
 
 bp = Blueprint('customer', __name__, url_prefix='/customer')
 
@@ -12,15 +16,24 @@ def create_customer():
     db.session.commit()
     return jsonify({'message': 'Customer created successfully'}), 201
 
+@bp.route('/bulk', methods=['POST'])
+def bulk_customers():
+    return bulk_write(Customer)
+
 @bp.route('/', methods=['GET'])
 def get_customers():
-    customers = Customer.query.all()
-    return jsonify([c.__dict__ for c in customers])
+    export_format = requested_format()
+    if export_format:
+        return export(Customer, export_format)
+    return paginate(Customer)
 
 @bp.route('/<int:cust_key>', methods=['GET'])
 def get_customer(cust_key):
-    customer = Customer.query.get_or_404(cust_key)
-    return jsonify(customer.__dict__)
+    return get_row(Customer, cust_key)
+
+@bp.route('/<int:cust_key>/orders', methods=['GET'])
+def get_customer_orders(cust_key):
+    return related(Customer, cust_key, 'orders')
 
 @bp.route('/<int:cust_key>', methods=['PUT'])
 def update_customer(cust_key):
@@ -1,6 +1,10 @@
 from flask import Blueprint, request, jsonify
 from .. import db
+from ..bulk import bulk_write
+from ..export import export, requested_format
 from ..models import Lineitem
+from ..pagination import paginate
+from ..related import get_row
 
 bp = Blueprint('lineitem', __name__, url_prefix='/lineitem')
 
@@ -12,20 +16,26 @@ def create_lineitem():
     db.session.commit()
     return jsonify({'message': 'Lineitem created successfully'}), 201
 
+@bp.route('/bulk', methods=['POST'])
+def bulk_lineitems():
+    return bulk_write(Lineitem)
+
 @bp.route('/', methods=['GET'])
 def get_lineitems():
-    lineitems = Lineitem.query.all()
-    return jsonify([li.__dict__ for li in lineitems])
+    export_format = requested_format()
+    if export_format:
+        return export(Lineitem, export_format)
+    return paginate(Lineitem)
 
 @bp.route('/<int:order_key>/<int:line_number>', methods=['GET'])
 def get_lineitem(order_key, line_number):
-    lineitem = Lineitem.query.get_or_404((order_key, line_number))
-    return jsonify(lineitem.__dict__)
+    # The primary key also has l_partkey and l_suppkey, but (order, line number) is unique in TPC-H
+    return get_row(Lineitem, {'l_orderkey': order_key, 'l_linenumber': line_number})
 
 @bp.route('/<int:order_key>/<int:line_number>', methods=['PUT'])
 def update_lineitem(order_key, line_number):
     data = request.get_json()
-    lineitem = Lineitem.query.get_or_404((order_key, line_number))
+    lineitem = Lineitem.query.filter_by(l_orderkey=order_key, l_linenumber=line_number).one_or_404()
     for key, value in data.items():
         setattr(lineitem, key, value)
     db.session.commit()
@@ -33,7 +43,7 @@ def update_lineitem(order_key, line_number):
 
 @bp.route('/<int:order_key>/<int:line_number>', methods=['DELETE'])
 def delete_lineitem(order_key, line_number):
-    lineitem = Lineitem.query.get_or_404((order_key, line_number))
+    lineitem = Lineitem.query.filter_by(l_orderkey=order_key, l_linenumber=line_number).one_or_404()
     db.session.delete(lineitem)
     db.session.commit()
     return jsonify({'message': 'Lineitem deleted successfully'})
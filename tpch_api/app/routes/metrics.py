@@ -0,0 +1,8 @@
+from flask import Blueprint, jsonify
+from ..table_cache import cache_stats
+
+bp = Blueprint('metrics', __name__, url_prefix='/metrics')
+
+@bp.route('/cache', methods=['GET'])
+def get_cache_metrics():
+    return jsonify(cache_stats())
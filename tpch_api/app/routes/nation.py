@@ -1,6 +1,11 @@
 from flask import Blueprint, request, jsonify
 from .. import db
+from ..bulk import bulk_write
+from ..export import export, requested_format
 from ..models import Nation
+from ..pagination import paginate
+from ..related import get_row, related
+from ..table_cache import cached
 
 bp = Blueprint('nation', __name__, url_prefix='/nation')
 
@@ -17,15 +22,30 @@ def create_nation():
     db.session.commit()
     return jsonify({'message': 'Nation created successfully'}), 201
 
+@bp.route('/bulk', methods=['POST'])
+def bulk_nations():
+    return bulk_write(Nation)
+
 @bp.route('/', methods=['GET'])
+@cached('nation')
 def get_nations():
-    nations = Nation.query.all()
-    return jsonify([{'n_nationkey': n.n_nationkey, 'n_name': n.n_name, 'n_regionkey': n.n_regionkey, 'n_comment': n.n_comment} for n in nations])
+    export_format = requested_format()
+    if export_format:
+        return export(Nation, export_format)
+    return paginate(Nation)
 
 @bp.route('/<int:nation_key>', methods=['GET'])
+@cached('nation')
 def get_nation(nation_key):
-    nation = Nation.query.get_or_404(nation_key)
-    return jsonify({'n_nationkey': nation.n_nationkey, 'n_name': nation.n_name, 'n_regionkey': nation.n_regionkey, 'n_comment': nation.n_comment})
+    return get_row(Nation, nation_key)
+
+@bp.route('/<int:nation_key>/suppliers', methods=['GET'])
+def get_nation_suppliers(nation_key):
+    return related(Nation, nation_key, 'suppliers')
+
+@bp.route('/<int:nation_key>/customers', methods=['GET'])
+def get_nation_customers(nation_key):
+    return related(Nation, nation_key, 'customers')
 
 @bp.route('/<int:nation_key>', methods=['PUT'])
 def update_nation(nation_key):
@@ -1,6 +1,10 @@
 from flask import Blueprint, request, jsonify
 from .. import db
+from ..bulk import bulk_write
+from ..export import export, requested_format
 from ..models import Orders
+from ..pagination import paginate
+from ..related import get_row, related
 
 bp = Blueprint('orders', __name__, url_prefix='/orders')
 
@@ -12,15 +16,24 @@ def create_order():
     db.session.commit()
     return jsonify({'message': 'Order created successfully'}), 201
 
+@bp.route('/bulk', methods=['POST'])
+def bulk_orders():
+    return bulk_write(Orders)
+
 @bp.route('/', methods=['GET'])
 def get_orders():
-    orders = Orders.query.all()
-    return jsonify([o.__dict__ for o in orders])
+    export_format = requested_format()
+    if export_format:
+        return export(Orders, export_format)
+    return paginate(Orders)
 
 @bp.route('/<int:order_key>', methods=['GET'])
 def get_order(order_key):
-    order = Orders.query.get_or_404(order_key)
-    return jsonify(order.__dict__)
+    return get_row(Orders, order_key)
+
+@bp.route('/<int:order_key>/lineitems', methods=['GET'])
+def get_order_lineitems(order_key):
+    return related(Orders, order_key, 'lineitems')
 
 @bp.route('/<int:order_key>', methods=['PUT'])
 def update_order(order_key):
@@ -1,6 +1,11 @@
 from flask import Blueprint, request, jsonify
 from .. import db
+from ..bulk import bulk_write
+from ..export import export, requested_format
 from ..models import Part
+from ..pagination import paginate
+from ..related import get_row, related
+from ..table_cache import cached
 
 bp = Blueprint('part', __name__, url_prefix='/part')
 
@@ -12,15 +17,26 @@ def create_part():
     db.session.commit()
     return jsonify({'message': 'Part created successfully'}), 201
 
+@bp.route('/bulk', methods=['POST'])
+def bulk_parts():
+    return bulk_write(Part)
+
 @bp.route('/', methods=['GET'])
+@cached('part')
 def get_parts():
-    parts = Part.query.all()
-    return jsonify([p.__dict__ for p in parts])
+    export_format = requested_format()
+    if export_format:
+        return export(Part, export_format)
+    return paginate(Part)
 
 @bp.route('/<int:part_key>', methods=['GET'])
+@cached('part')
 def get_part(part_key):
-    part = Part.query.get_or_404(part_key)
-    return jsonify(part.__dict__)
+    return get_row(Part, part_key)
+
+@bp.route('/<int:part_key>/partsupp', methods=['GET'])
+def get_part_partsupp(part_key):
+    return related(Part, part_key, 'partsupp')
 
 @bp.route('/<int:part_key>', methods=['PUT'])
 def update_part(part_key):
@@ -1,6 +1,10 @@
 from flask import Blueprint, request, jsonify
 from .. import db
+from ..bulk import bulk_write
+from ..export import export, requested_format
 from ..models import Partsupp
+from ..pagination import paginate
+from ..related import get_row, related
 
 bp = Blueprint('partsupp', __name__, url_prefix='/partsupp')
 
@@ -12,15 +16,24 @@ def create_partsupp():
     db.session.commit()
     return jsonify({'message': 'Partsupp created successfully'}), 201
 
+@bp.route('/bulk', methods=['POST'])
+def bulk_partsupps():
+    return bulk_write(Partsupp)
+
 @bp.route('/', methods=['GET'])
 def get_partsupps():
-    partsupps = Partsupp.query.all()
-    return jsonify([ps.__dict__ for ps in partsupps])
+    export_format = requested_format()
+    if export_format:
+        return export(Partsupp, export_format)
+    return paginate(Partsupp)
 
 @bp.route('/<int:part_key>/<int:supp_key>', methods=['GET'])
 def get_partsupp(part_key, supp_key):
-    partsupp = Partsupp.query.get_or_404((part_key, supp_key))
-    return jsonify(partsupp.__dict__)
+    return get_row(Partsupp, (part_key, supp_key))
+
+@bp.route('/<int:part_key>/<int:supp_key>/lineitems', methods=['GET'])
+def get_partsupp_lineitems(part_key, supp_key):
+    return related(Partsupp, (part_key, supp_key), 'lineitems')
 
 @bp.route('/<int:part_key>/<int:supp_key>', methods=['PUT'])
 def update_partsupp(part_key, supp_key):
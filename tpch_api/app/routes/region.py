@@ -1,6 +1,11 @@
 from flask import Blueprint, request, jsonify
 from .. import db
+from ..bulk import bulk_write
+from ..export import export, requested_format
 from ..models import Region
+from ..pagination import paginate
+from ..related import get_row, related
+from ..table_cache import cached
 
 bp = Blueprint('region', __name__, url_prefix='/region')
 
@@ -16,15 +21,26 @@ def create_region():
     db.session.commit()
     return jsonify({'message': 'Region created successfully'}), 201
 
+@bp.route('/bulk', methods=['POST'])
+def bulk_regions():
+    return bulk_write(Region)
+
 @bp.route('/', methods=['GET'])
+@cached('region')
 def get_regions():
-    regions = Region.query.all()
-    return jsonify([{'r_regionkey': r.r_regionkey, 'r_name': r.r_name, 'r_comment': r.r_comment} for r in regions])
+    export_format = requested_format()
+    if export_format:
+        return export(Region, export_format)
+    return paginate(Region)
 
 @bp.route('/<int:region_key>', methods=['GET'])
+@cached('region')
 def get_region(region_key):
-    region = Region.query.get_or_404(region_key)
-    return jsonify({'r_regionkey': region.r_regionkey, 'r_name': region.r_name, 'r_comment': region.r_comment})
+    return get_row(Region, region_key)
+
+@bp.route('/<int:region_key>/nations', methods=['GET'])
+def get_region_nations(region_key):
+    return related(Region, region_key, 'nations')
 
 @bp.route('/<int:region_key>', methods=['PUT'])
 def update_region(region_key):
@@ -1,6 +1,11 @@
 from flask import Blueprint, request, jsonify
 from .. import db
+from ..bulk import bulk_write
+from ..export import export, requested_format
 from ..models import Supplier
+from ..pagination import paginate
+from ..related import get_row, related
+from ..table_cache import cached
 
 bp = Blueprint('supplier', __name__, url_prefix='/supplier')
 
@@ -12,15 +17,26 @@ def create_supplier():
     db.session.commit()
     return jsonify({'message': 'Supplier created successfully'}), 201
 
+@bp.route('/bulk', methods=['POST'])
+def bulk_suppliers():
+    return bulk_write(Supplier)
+
 @bp.route('/', methods=['GET'])
+@cached('supplier')
 def get_suppliers():
-    suppliers = Supplier.query.all()
-    return jsonify([s.__dict__ for s in suppliers])
+    export_format = requested_format()
+    if export_format:
+        return export(Supplier, export_format)
+    return paginate(Supplier)
 
 @bp.route('/<int:supp_key>', methods=['GET'])
+@cached('supplier')
 def get_supplier(supp_key):
-    supplier = Supplier.query.get_or_404(supp_key)
-    return jsonify(supplier.__dict__)
+    return get_row(Supplier, supp_key)
+
+@bp.route('/<int:supp_key>/partsupp', methods=['GET'])
+def get_supplier_partsupp(supp_key):
+    return related(Supplier, supp_key, 'partsupp')
 
 @bp.route('/<int:supp_key>', methods=['PUT'])
 def update_supplier(supp_key):
@@ -0,0 +1,164 @@
+import functools
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, request
+
+from .cache_invalidation import on_tables_committed
+from .export import requested_format
+
+# Headers that describe the body and are replayed with it; the rest (Content-Length,
+# Date, ...) are recomputed for every response.
+REPLAYED_HEADERS = ('Content-Type', 'Link', 'X-Next-Cursor')
+
+
+class _Entry:
+    __slots__ = ('body', 'etag', 'headers', 'expires_at')
+
+    def __init__(self, body, etag, headers, expires_at):
+        self.body = body
+        self.etag = etag
+        self.headers = headers
+        self.expires_at = expires_at
+
+
+class TableCache:
+    """
+    A memory-bounded LRU of GET response bodies for small, rarely written tables,
+    keyed by table, path and query string. Entries expire after `ttl` seconds and
+    are dropped as soon as a commit in this process writes their table.
+    """
+
+    def __init__(self, max_bytes, ttl):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._bytes = 0
+        # Bumped on every invalidation, so a response built across a write isn't stored
+        self._generations = {}
+        self._lock = threading.Lock()
+        self.hits = {}
+        self.misses = {}
+        self.invalidations = 0
+
+    def generation(self, table):
+        return self._generations.get(table, 0)
+
+    def get(self, table, key):
+        with self._lock:
+            entry = self._entries.get((table, key))
+            if entry is not None and entry.expires_at <= time.monotonic():
+                self._remove((table, key))
+                entry = None
+            if entry is None:
+                self.misses[table] = self.misses.get(table, 0) + 1
+                return None
+            self._entries.move_to_end((table, key))
+            self.hits[table] = self.hits.get(table, 0) + 1
+            return entry
+
+    def put(self, table, key, body, headers, generation):
+        """Stores a response body and returns its ETag; nothing is stored if `table` was written since `generation`."""
+        etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+        if len(body) > self.max_bytes:
+            return etag
+        with self._lock:
+            if self._generations.get(table, 0) != generation:
+                return etag
+            self._remove((table, key))
+            self._entries[(table, key)] = _Entry(body, etag, headers, time.monotonic() + self.ttl)
+            self._bytes += len(body)
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+        return etag
+
+    def _remove(self, full_key):
+        entry = self._entries.pop(full_key, None)
+        if entry is not None:
+            self._bytes -= len(entry.body)
+
+    def invalidate_tables(self, tables):
+        with self._lock:
+            for table in tables:
+                self._generations[table] = self._generations.get(table, 0) + 1
+            stale = [full_key for full_key in self._entries if full_key[0] in tables]
+            for full_key in stale:
+                self._remove(full_key)
+            self.invalidations += len(stale)
+
+    def stats(self):
+        with self._lock:
+            tables = sorted(set(self.hits) | set(self.misses))
+            per_table = {}
+            for table in tables:
+                hits, misses = self.hits.get(table, 0), self.misses.get(table, 0)
+                per_table[table] = {'hits': hits, 'misses': misses, 'hit_ratio': round(hits / (hits + misses), 4)}
+            hits, misses = sum(self.hits.values()), sum(self.misses.values())
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': hits,
+                'misses': misses,
+                'hit_ratio': round(hits / (hits + misses), 4) if hits + misses else 0.0,
+                'invalidated_entries': self.invalidations,
+                'tables': per_table,
+            }
+
+
+_cache = None
+
+
+def init_app(app):
+    """Creates the process-wide cache and drops a table's entries whenever a commit writes it."""
+    global _cache
+    _cache = TableCache(app.config['TABLE_CACHE_MAX_BYTES'], app.config['TABLE_CACHE_TTL'])
+    on_tables_committed(_cache.invalidate_tables)
+
+
+def cache_stats():
+    return _cache.stats() if _cache is not None else {'entries': 0, 'hits': 0, 'misses': 0, 'hit_ratio': 0.0}
+
+
+def _not_modified(etag):
+    response = current_app.response_class(status=304)
+    response.set_etag(etag)
+    return response
+
+
+def cached(table):
+    """
+    Caches a GET view's JSON response while `table` is listed in CACHED_TABLES, and
+    answers If-None-Match with 304 Not Modified. Responses carry a strong ETag of
+    the body. Exports, ?expand= requests, error responses and streamed responses
+    are passed through.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            # Expanded responses hold rows of other tables, whose writes wouldn't invalidate them
+            if (_cache is None or table not in current_app.config['CACHED_TABLES'] or requested_format()
+                    or 'expand' in request.args):
+                return view(*args, **kwargs)
+            key = (request.path, request.query_string)
+            entry = _cache.get(table, key)
+            if entry is None:
+                generation = _cache.generation(table)
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200 or response.is_streamed:
+                    return response
+                headers = [(name, response.headers[name]) for name in REPLAYED_HEADERS if name in response.headers]
+                etag = _cache.put(table, key, response.get_data(), headers, generation)
+            else:
+                etag = entry.etag
+                response = None
+            if request.if_none_match.contains_weak(etag):
+                return _not_modified(etag)
+            if response is None:
+                response = current_app.response_class(entry.body, headers=entry.headers)
+            response.set_etag(etag)
+            return response
+        return wrapper
+    return decorator
@@ -3,3 +3,24 @@ import os
 class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Rows per page on the list endpoints: the default, and the most ?limit= can ask for
+    PAGE_SIZE_DEFAULT = int(os.environ.get('API_PAGE_SIZE', 100))
+    PAGE_SIZE_MAX = int(os.environ.get('API_MAX_PAGE_SIZE', 1000))
+    # Rows fetched per round trip when streaming a table as NDJSON or CSV
+    EXPORT_BATCH_SIZE = int(os.environ.get('API_EXPORT_BATCH_SIZE', 5000))
+    # Most related rows one ?expand= response may nest, across all its expanded lists
+    EXPAND_MAX_ROWS = int(os.environ.get('API_EXPAND_MAX_ROWS', 10000))
+    # Rows per COPY batch (one savepoint each) in the bulk endpoints, and how many row errors a response lists
+    BULK_BATCH_SIZE = int(os.environ.get('API_BULK_BATCH_SIZE', 5000))
+    BULK_MAX_ERRORS = int(os.environ.get('API_BULK_MAX_ERRORS', 1000))
+    # Compress responses with zstd or gzip when the client's Accept-Encoding allows; bodies under COMPRESS_MIN_SIZE bytes go as they are
+    COMPRESS_RESPONSES = os.environ.get('API_COMPRESS', '1') != '0'
+    COMPRESS_MIN_SIZE = int(os.environ.get('API_COMPRESS_MIN_SIZE', 1024))
+    GZIP_LEVEL = int(os.environ.get('API_GZIP_LEVEL', 5))
+    ZSTD_LEVEL = int(os.environ.get('API_ZSTD_LEVEL', 3))
+    # Tables whose GET responses are cached in process (a comma-separated list; supplier and part are candidates too).
+    # Entries are dropped when this process commits a write to the table and expire after TABLE_CACHE_TTL seconds,
+    # which bounds how stale they get when another process writes it.
+    CACHED_TABLES = {table.strip() for table in os.environ.get('API_CACHED_TABLES', 'region,nation').split(',') if table.strip()}
+    TABLE_CACHE_TTL = float(os.environ.get('API_TABLE_CACHE_TTL', 300))
+    TABLE_CACHE_MAX_BYTES = int(os.environ.get('API_TABLE_CACHE_MAX_BYTES', 32 * 1024 * 1024))